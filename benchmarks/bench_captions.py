@@ -0,0 +1,160 @@
+"""
+Micro-benchmark for caption parsing on multi-hour caption files.
+
+Compares the single-pass CueTable parser against the previous multi-regex implementation
+of captions_to_plaintext / captions_to_segments, and times the views built on the table
+(plaintext, segments, token chunks) plus cache serialization.
+
+    python benchmarks/bench_captions.py --hours 6 --repeat 5
+"""
+import argparse
+import json
+import re
+import statistics
+import time
+import zlib
+from typing import Callable, Dict, List, Optional, Tuple
+
+from yt_notetaker.chunking import chunk_cues
+from yt_notetaker.transcript_utils import CueTable, parse_captions
+
+
+WORDS = (
+    "so today we are going to look at how gradient descent works in practice and why the "
+    "learning rate matters more than you might expect when training larger models"
+).split()
+
+
+def _ts(seconds: float) -> str:
+    ms = int(seconds * 1000)
+    return f"{ms // 3600000:02d}:{ms // 60000 % 60:02d}:{ms // 1000 % 60:02d}.{ms % 1000:03d}"
+
+
+def synthetic_vtt(hours: float, cue_seconds: float = 2.5) -> str:
+    """
+    Auto-caption style WebVTT with inline <c> timing tags and positioning settings.
+    """
+    lines = ["WEBVTT", "Kind: captions", "Language: en", ""]
+    t = 0.0
+    i = 0
+    while t < hours * 3600:
+        words = [WORDS[(i + k) % len(WORDS)] for k in range(8)]
+        tagged = words[0] + "".join(f"<{_ts(t + k * 0.3)}><c> {w}</c>" for k, w in enumerate(words[1:]))
+        lines.append(f"{_ts(t)} --> {_ts(t + cue_seconds)} align:start position:0%")
+        lines.append(tagged)
+        lines.append("")
+        t += cue_seconds
+        i += 1
+    return "\n".join(lines)
+
+
+def synthetic_json3(hours: float, cue_seconds: float = 2.5) -> str:
+    events = []
+    t = 0
+    i = 0
+    while t < hours * 3600 * 1000:
+        words = [WORDS[(i + k) % len(WORDS)] for k in range(8)]
+        events.append({
+            "tStartMs": t,
+            "dDurationMs": int(cue_seconds * 1000),
+            "segs": [{"utf8": words[0]}] + [{"utf8": " " + w, "tOffsetMs": k * 300} for k, w in enumerate(words[1:])],
+        })
+        t += int(cue_seconds * 1000)
+        i += 1
+    return json.dumps({"events": events})
+
+
+# The implementation that CueTable replaced, kept here as the baseline.
+
+def legacy_plaintext(captions_text: str) -> str:
+    text = captions_text
+    text = re.sub(r"^WEBVTT.*$", "", text, flags=re.MULTILINE)
+    text = re.sub(r"^\s*\d+\s*$", "", text, flags=re.MULTILINE)
+    text = re.sub(r"^\s*\d{1,2}:\d{2}:\d{2}[\.,]\d{1,3}\s+-->.*$", "", text, flags=re.MULTILINE)
+    text = re.sub(r"^\s*\d{1,2}:\d{2}[\.,]\d{1,3}\s+-->.*$", "", text, flags=re.MULTILINE)
+    text = re.sub(r"^\s*NOTE.*$", "", text, flags=re.MULTILINE)
+    text = re.sub(r"<[^>]+>", "", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    return text
+
+
+def _legacy_ts(ts: str) -> Optional[float]:
+    ts = ts.strip()
+    m = re.match(r"^(\d{2}):(\d{2}):(\d{2})[\.,](\d{1,3})$", ts)
+    if m:
+        h, mnt, s, ms = m.groups()
+        return int(h) * 3600 + int(mnt) * 60 + int(s) + int(ms) / 1000.0
+    m = re.match(r"^(\d{2}):(\d{2})[\.,](\d{1,3})$", ts)
+    if m:
+        mnt, s, ms = m.groups()
+        return int(mnt) * 60 + int(s) + int(ms) / 1000.0
+    return None
+
+
+def legacy_segments(captions_text: str, segment_seconds: int = 1800) -> List[Tuple[int, int, str]]:
+    current_start: Optional[float] = None
+    buckets: Dict[int, List[str]] = {}
+    for line in captions_text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if '-->' in line:
+            start_s = _legacy_ts(line.split('-->')[0])
+            if start_s is not None:
+                current_start = start_s
+                continue
+        if current_start is None:
+            continue
+        buckets.setdefault(int(current_start // segment_seconds), []).append(re.sub(r"<[^>]+>", "", line))
+    return [
+        (idx, idx * segment_seconds, re.sub(r"\s+", " ", " ".join(buckets[idx])).strip())
+        for idx in sorted(buckets)
+    ]
+
+
+def _views(table: CueTable) -> None:
+    table.plaintext()
+    table.segments(1800)
+
+
+def bench(label: str, func: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    print(f"  {label:<38} best {best * 1000:9.1f} ms   median {statistics.median(timings) * 1000:9.1f} ms")
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hours", type=float, default=6.0, help="Length of the synthetic caption file.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    vtt = synthetic_vtt(args.hours)
+    json3 = synthetic_json3(args.hours)
+    table = parse_captions(vtt)
+    print(f"{args.hours:g} h of captions: {len(table)} cues, VTT {len(vtt) / 1e6:.1f} MB, json3 {len(json3) / 1e6:.1f} MB")
+
+    print("baseline (multi-pass regex)")
+    legacy = bench("plaintext + segments", lambda: (legacy_plaintext(vtt), legacy_segments(vtt)), args.repeat)
+
+    print("CueTable")
+    bench("parse_captions (VTT)", lambda: parse_captions(vtt), args.repeat)
+    bench("parse_captions (json3)", lambda: parse_captions(json3), args.repeat)
+    bench("plaintext view", table.plaintext, args.repeat)
+    bench("segments(1800) view", lambda: table.segments(1800), args.repeat)
+    bench("chunk_cues(8000 tokens)", lambda: chunk_cues(table, max_tokens=8000), args.repeat)
+    blob = zlib.compress(table.to_bytes())
+    bench("cache encode (to_bytes + zlib)", lambda: zlib.compress(table.to_bytes()), args.repeat)
+    bench("cache decode (zlib + from_bytes)", lambda: CueTable.from_bytes(zlib.decompress(blob)), args.repeat)
+    print(f"cache entry: {len(blob) / 1e3:.0f} kB compressed")
+    current = bench("parse + plaintext + segments", lambda: _views(parse_captions(vtt)), args.repeat)
+    print(f"speedup vs baseline: {legacy / current:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark for rendering large playlist documents.
+
+Renders the same synthetic playlist (videos x sections x subsections x bullets) with the
+python-docx path (add_heading / add_paragraph + Document.save) and with DocxStreamWriter,
+reports wall time and peak RSS growth (measured in a forked child) for each, and checks that
+both produce the same word/document.xml and package parts.
+
+    python benchmarks/bench_docx.py --videos 100 --bullets 6
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+import zipfile
+from typing import Callable, List, Tuple
+
+from docx import Document
+
+from yt_notetaker.docx_stream import DocxStreamWriter
+from yt_notetaker.notetaker import write_outline_to_docx
+from yt_notetaker.schemas import BulletSubsection, OutlineResponse, Section
+
+
+WORDS = (
+    "gradient descent updates each weight against the slope of the loss, so a learning rate "
+    "that is too large overshoots & diverges while one that is too small <stalls> training"
+).split()
+
+
+def synthetic_playlist(videos: int, sections: int, subsections: int, bullets: int) -> List[Tuple[str, OutlineResponse]]:
+    playlist = []
+    w = 0
+    for v in range(videos):
+        outline_sections = []
+        for s in range(sections):
+            subs = []
+            for u in range(subsections):
+                items = []
+                for _ in range(bullets):
+                    items.append(" ".join(WORDS[(w + k) % len(WORDS)] for k in range(14)))
+                    w += 3
+                subs.append(BulletSubsection(title=f"Subsection {s + 1}.{u + 1}", bullets=items))
+            outline_sections.append(Section(title=f"Section {s + 1}: {WORDS[(v + s) % len(WORDS)]}", subsections=subs))
+        playlist.append((f"Video {v + 1} — {WORDS[v % len(WORDS)]}", OutlineResponse(sections=outline_sections)))
+    return playlist
+
+
+def render_python_docx(path: str, playlist: List[Tuple[str, OutlineResponse]]) -> None:
+    document = Document()
+    document.add_heading("Benchmark playlist", level=1)
+    for title, outline in playlist:
+        document.add_heading(title, level=2)
+        write_outline_to_docx(document, outline)
+    document.save(path)
+
+
+def render_stream(path: str, playlist: List[Tuple[str, OutlineResponse]]) -> None:
+    with DocxStreamWriter(path) as writer:
+        writer.heading("Benchmark playlist", 1)
+        for title, outline in playlist:
+            writer.heading(title, 2)
+            writer.outline(outline)
+
+
+def _peak_rss_growth(render, path, playlist, queue) -> None:
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    render(path, playlist)
+    queue.put(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before)
+
+
+def measure(render: Callable[[str, List[Tuple[str, OutlineResponse]]], None], path: str, playlist, repeat: int) -> Tuple[float, float]:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render(path, playlist)
+        best = min(best, time.perf_counter() - start)
+    # lxml allocates outside the Python heap, so memory is taken from the OS counters of a
+    # forked child (ru_maxrss is in KiB on Linux).
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+    child = context.Process(target=_peak_rss_growth, args=(render, path, playlist, queue))
+    child.start()
+    growth_kb = queue.get()
+    child.join()
+    return (best, growth_kb / 1024)
+
+
+def parts(path: str):
+    with zipfile.ZipFile(path) as archive:
+        return {name: archive.read(name) for name in archive.namelist()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--videos", type=int, default=100)
+    parser.add_argument("--sections", type=int, default=4)
+    parser.add_argument("--subsections", type=int, default=3)
+    parser.add_argument("--bullets", type=int, default=6)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    playlist = synthetic_playlist(args.videos, args.sections, args.subsections, args.bullets)
+    bullets = args.videos * args.sections * args.subsections * args.bullets
+    print(f"{args.videos} videos, {bullets} bullets")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        baseline_path = os.path.join(tmp, "python_docx.docx")
+        stream_path = os.path.join(tmp, "stream.docx")
+        rows = []
+        for name, render, path in (
+            ("python-docx", render_python_docx, baseline_path),
+            ("DocxStreamWriter", render_stream, stream_path),
+        ):
+            seconds, peak_mb = measure(render, path, playlist, args.repeat)
+            rows.append((name, seconds, peak_mb, os.path.getsize(path)))
+
+        for name, seconds, peak_mb, size in rows:
+            print(f"{name:<18} {seconds * 1000:9.1f} ms  peak RSS +{peak_mb:7.1f} MB  file {size / 1024:8.1f} KB")
+        print(f"speedup: {rows[0][1] / rows[1][1]:.1f}x")
+
+        expected, actual = parts(baseline_path), parts(stream_path)
+        identical = expected == actual
+        print(f"package parts identical: {identical}")
+        if not identical:
+            differing = sorted(name for name in set(expected) | set(actual) if expected.get(name) != actual.get(name))
+            raise SystemExit(f"output differs in: {', '.join(differing)}")
+
+
+if __name__ == "__main__":
+    main()
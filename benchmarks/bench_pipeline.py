@@ -0,0 +1,226 @@
+"""
+Offline end-to-end benchmark for the playlist and single-video generators.
+
+Runs generate_playlist_docx and generate_single_video_docx against local stand-ins
+(offline_stubs.FakeExtractor for yt-dlp, offline_stubs.StubServer for caption downloads
+and the OpenAI API) at several concurrency levels, and reports videos per minute,
+per-stage p50/p99 latency, LLM retries and peak RSS. Each scenario runs in a forked
+child so RSS and process-wide state (rate limiter, caches) start fresh.
+
+    python benchmarks/bench_pipeline.py --videos 200 --concurrency 8,32,64
+    python benchmarks/bench_pipeline.py --llm-latency 1.0 --error-rate 0.02 --rpm 600
+    python benchmarks/bench_pipeline.py --concurrency 16 --profile traces/
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from offline_stubs import FakeExtractor, StubConfig, start_stub_process  # noqa: E402
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def run_playlist(stub_url: str, args, concurrency: int) -> Dict:
+    from yt_notetaker.llm_utils import get_llm_scheduler
+    from yt_notetaker.notetaker import generate_playlist_docx
+
+    extractor = FakeExtractor(stub_url, videos=args.videos, metadata_latency=args.metadata_latency, caption_format=args.caption_format)
+    extractor.install()
+    stages: Dict[str, List[float]] = {"fetch": [], "outline": [], "total": []}
+    failures = 0
+
+    def on_event(event) -> None:
+        nonlocal failures
+        if event.kind == "transcript_fetched":
+            stages["fetch"].append(event.stage_seconds)
+        elif event.kind == "outlined":
+            stages["outline"].append(event.stage_seconds)
+            stages["total"].append(event.elapsed)
+        elif event.kind == "failed":
+            failures += 1
+
+    with tempfile.TemporaryDirectory() as out:
+        start = time.perf_counter()
+        generate_playlist_docx(
+            f"bench://playlist/c{concurrency}?videos={args.videos}",
+            out,
+            openai_api_key="bench",
+            llm_base_url=f"{stub_url}/v1",
+            transcript_cache="off",
+            llm_cache="off",
+            manifest="off",
+            metadata_concurrency=min(concurrency, args.metadata_concurrency),
+            download_concurrency=concurrency,
+            llm_concurrency=concurrency,
+            on_event=on_event,
+        )
+        wall = time.perf_counter() - start
+    stages["metadata"] = extractor.durations
+    return {
+        "videos": args.videos,
+        "failed": failures,
+        "wall": wall,
+        "stages": stages,
+        "retries": get_llm_scheduler().retries,
+    }
+
+
+def run_single(stub_url: str, args, concurrency: int) -> Dict:
+    from yt_notetaker.llm_utils import get_llm_scheduler
+    from yt_notetaker.notetaker import agenerate_single_video_docx
+
+    extractor = FakeExtractor(stub_url, metadata_latency=args.metadata_latency, caption_format=args.caption_format)
+    extractor.install()
+    totals: List[float] = []
+    failures = 0
+
+    async def one(out: str, index: int, limit: asyncio.Semaphore) -> None:
+        nonlocal failures
+        async with limit:
+            start = time.perf_counter()
+            try:
+                await agenerate_single_video_docx(
+                    f"https://www.youtube.com/watch?v=single-{concurrency}-{index:05d}",
+                    out,
+                    openai_api_key="bench",
+                    llm_base_url=f"{stub_url}/v1",
+                    transcript_cache="off",
+                    llm_cache="off",
+                )
+                totals.append(time.perf_counter() - start)
+            except Exception:
+                failures += 1
+
+    async def run_all(out: str) -> None:
+        limit = asyncio.Semaphore(concurrency)
+        await asyncio.gather(*(one(out, i, limit) for i in range(args.single_videos)))
+
+    with tempfile.TemporaryDirectory() as out:
+        start = time.perf_counter()
+        asyncio.run(run_all(out))
+        wall = time.perf_counter() - start
+    return {
+        "videos": args.single_videos,
+        "failed": failures,
+        "wall": wall,
+        "stages": {"metadata": extractor.durations, "total": totals},
+        "retries": get_llm_scheduler().retries,
+    }
+
+
+def _child(target, stub_url: str, args, concurrency: int, queue) -> None:
+    from yt_notetaker.metrics import get_metrics
+
+    os.environ["YT_NOTETAKER_CACHE_DIR"] = tempfile.mkdtemp(prefix="yt-notetaker-bench-")
+    metrics = get_metrics()
+    metrics.reset()
+    if args.profile:
+        metrics.start_trace()
+    result = target(stub_url, args, concurrency)
+    # ru_maxrss is in KiB on Linux.
+    result["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    if args.profile:
+        path = os.path.join(args.profile, f"{target.__name__}-c{concurrency}.json")
+        metrics.write_trace(path)
+        result["profile"] = f"{metrics.summary_table()}\ntrace: {path}"
+    queue.put(result)
+
+
+def run_isolated(target, stub_url: str, args, concurrency: int) -> Dict:
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+    child = context.Process(target=_child, args=(target, stub_url, args, concurrency, queue))
+    child.start()
+    result = queue.get()
+    child.join()
+    return result
+
+
+def format_row(name: str, concurrency: int, result: Dict) -> str:
+    stages = result["stages"]
+    cells = []
+    for stage in ("metadata", "fetch", "outline", "total"):
+        values = stages.get(stage)
+        if values:
+            cells.append(f"{percentile(values, 50):.2f}/{percentile(values, 99):.2f}".rjust(16))
+        else:
+            cells.append("-".rjust(16))
+    rate = result["videos"] / result["wall"] * 60 if result["wall"] else 0.0
+    return (
+        f"{name:<9} {concurrency:>5} {result['videos']:>6} {result['failed']:>4} {result['wall']:8.1f} "
+        f"{rate:9.1f}  {'  '.join(cells)}  {result['retries']:>7} {result['peak_rss_mb']:8.1f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--videos", type=int, default=100, help="Videos in the benchmark playlist.")
+    parser.add_argument("--single-videos", type=int, default=16, help="Single-video documents per concurrency level.")
+    parser.add_argument("--concurrency", default="4,16,64", help="Comma-separated concurrency levels.")
+    parser.add_argument("--metadata-concurrency", type=int, default=16, help="Cap for the metadata stage.")
+    parser.add_argument("--metadata-latency", type=float, default=0.05, help="Seconds per fake yt-dlp extraction.")
+    parser.add_argument("--caption-minutes", type=float, default=20.0, help="Length of each synthetic caption file.")
+    parser.add_argument("--caption-format", choices=("json3", "vtt"), default="json3")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Mean stub completion latency in seconds.")
+    parser.add_argument("--llm-jitter", type=float, default=0.25, help="Uniform +/- jitter around the latency.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of completions answered with HTTP 500.")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Fraction of completions cut off mid-JSON.")
+    parser.add_argument("--rpm", type=float, default=None, help="Stub requests-per-minute limit (429 above it).")
+    parser.add_argument("--tpm", type=float, default=None, help="Stub tokens-per-minute limit (429 above it).")
+    parser.add_argument("--scenarios", default="playlist,single", help="Comma-separated: playlist, single.")
+    parser.add_argument("--profile", metavar="DIR", default=None, help="Write a span trace per run to DIR and print its summary.")
+    args = parser.parse_args()
+    if args.profile:
+        os.makedirs(args.profile, exist_ok=True)
+
+    config = StubConfig(
+        llm_latency=args.llm_latency,
+        llm_jitter=args.llm_jitter,
+        error_rate=args.error_rate,
+        malformed_rate=args.malformed_rate,
+        requests_per_minute=args.rpm,
+        tokens_per_minute=args.tpm,
+        caption_minutes=args.caption_minutes,
+        caption_format=args.caption_format,
+    )
+    stub, stub_url = start_stub_process(config)
+    levels = [int(level) for level in args.concurrency.split(",") if level.strip()]
+    scenarios = {"playlist": run_playlist, "single": run_single}
+    try:
+        print(
+            f"stub {stub_url}: llm {args.llm_latency}s +/-{args.llm_jitter}s, error rate {args.error_rate}, "
+            f"truncated {args.malformed_rate}, "
+            f"rpm {args.rpm or '-'}, tpm {args.tpm or '-'}, captions {args.caption_minutes} min {args.caption_format}"
+        )
+        print(
+            f"{'scenario':<9} {'conc':>5} {'videos':>6} {'fail':>4} {'wall s':>8} {'videos/min':>9}  "
+            f"{'metadata p50/p99':>16}  {'fetch p50/p99':>16}  {'outline p50/p99':>16}  {'total p50/p99':>16}  "
+            f"{'retries':>7} {'RSS MB':>8}"
+        )
+        for name in args.scenarios.split(","):
+            target = scenarios[name.strip()]
+            for level in levels:
+                result = run_isolated(target, stub_url, args, level)
+                print(format_row(name.strip(), level, result), flush=True)
+                if result.get("profile"):
+                    print(result["profile"] + "\n", flush=True)
+    finally:
+        stub.terminate()
+
+
+if __name__ == "__main__":
+    main()
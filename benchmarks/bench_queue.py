@@ -0,0 +1,137 @@
+"""
+Offline multi-process benchmark for the job queue (serve/worker mode) on one machine.
+
+Starts the queue API and renderer in this process, submits playlists over HTTP and runs
+several worker processes against it (through the API, or directly on the SQLite file with
+--local-workers), all backed by offline_stubs so no network is needed. --kill-after
+SIGKILLs the first worker mid-run to show its leased tasks being taken over once their
+lease expires. Reports wall time, videos per minute, tasks per worker and retries.
+
+    python benchmarks/bench_queue.py --workers 4 --playlists 4 --videos 100
+    python benchmarks/bench_queue.py --workers 3 --local-workers 1 --kill-after 5 --lease-seconds 5
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from offline_stubs import FakeExtractor, StubConfig, start_stub_process  # noqa: E402
+
+
+def _worker_process(stub_url: str, api_url: Optional[str], db: Optional[str], worker_id: str, settings: Dict) -> None:
+    FakeExtractor(stub_url, metadata_latency=settings['metadata_latency']).install()
+    from yt_notetaker.work_queue import RemoteQueue, WorkQueue
+    from yt_notetaker.worker import Worker
+
+    queue = RemoteQueue(api_url) if api_url else WorkQueue(db, lease_seconds=settings['lease_seconds'])
+    worker = Worker(
+        queue,
+        worker_id=worker_id,
+        concurrency=settings['concurrency'],
+        poll_interval=0.2,
+        openai_api_key="bench",
+        llm_base_url=f"{stub_url}/v1",
+    )
+    asyncio.run(worker.run(exit_when_idle=True))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes talking to the HTTP API.")
+    parser.add_argument("--local-workers", type=int, default=0, help="Worker processes using the SQLite file directly.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Tasks in flight per worker.")
+    parser.add_argument("--playlists", type=int, default=4, help="Playlist jobs to submit.")
+    parser.add_argument("--videos", type=int, default=100, help="Videos per playlist.")
+    parser.add_argument("--metadata-latency", type=float, default=0.05, help="Seconds per fake yt-dlp extraction.")
+    parser.add_argument("--caption-minutes", type=float, default=5.0, help="Length of each synthetic caption file.")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Mean stub completion latency in seconds.")
+    parser.add_argument("--lease-seconds", type=float, default=10.0, help="Task lease length.")
+    parser.add_argument("--kill-after", type=float, default=None, help="SIGKILL the first worker after this many seconds.")
+    args = parser.parse_args()
+
+    from yt_notetaker.server import start_queue_server
+    from yt_notetaker.work_queue import WorkQueue
+    from yt_notetaker.worker import Worker
+    import requests
+
+    stub, stub_url = start_stub_process(StubConfig(llm_latency=args.llm_latency, caption_minutes=args.caption_minutes))
+    work = tempfile.mkdtemp(prefix="yt-notetaker-queue-bench-")
+    os.environ["YT_NOTETAKER_CACHE_DIR"] = os.path.join(work, "cache")
+    db = os.path.join(work, "queue.sqlite3")
+    queue = WorkQueue(db, lease_seconds=args.lease_seconds)
+    server = start_queue_server(queue, 0, output_dir=os.path.join(work, "out"))
+    api_url = f"http://127.0.0.1:{server.server_port}"
+    renderer = Worker(queue, worker_id="renderer", kinds=("render",), concurrency=1, poll_interval=0.2)
+    render_thread = threading.Thread(target=asyncio.run, args=(renderer.run(),), daemon=True)
+    render_thread.start()
+
+    settings = {'concurrency': args.concurrency, 'metadata_latency': args.metadata_latency, 'lease_seconds': args.lease_seconds}
+    context = multiprocessing.get_context("spawn")
+    processes = []
+    try:
+        start = time.perf_counter()
+        job_ids = [
+            requests.post(f"{api_url}/jobs", json={
+                'url': f"bench://playlist/q{i}?videos={args.videos}",
+                'options': {'transcript_cache': "off", 'llm_cache': "off"},
+            }).json()['id']
+            for i in range(args.playlists)
+        ]
+        for i in range(args.workers + args.local_workers):
+            remote = i < args.workers
+            worker_id = f"{'remote' if remote else 'local'}-{i}"
+            process = context.Process(
+                target=_worker_process,
+                args=(stub_url, api_url if remote else None, None if remote else db, worker_id, settings),
+            )
+            process.start()
+            processes.append(process)
+        killed = False
+        while True:
+            jobs = [requests.get(f"{api_url}/jobs/{job_id}").json() for job_id in job_ids]
+            if all(job['status'] in ("done", "failed") for job in jobs):
+                break
+            if args.kill_after is not None and not killed and time.perf_counter() - start >= args.kill_after:
+                os.kill(processes[0].pid, signal.SIGKILL)
+                killed = True
+                print(f"killed worker 0 after {args.kill_after:.1f}s")
+            time.sleep(0.2)
+        wall = time.perf_counter() - start
+    finally:
+        for process in processes:
+            process.join(timeout=30)
+            if process.is_alive():
+                process.terminate()
+        renderer.stop()
+        server.shutdown()
+        stub.terminate()
+
+    conn = sqlite3.connect(db)
+    videos = sum(sum(job['videos'].values()) for job in jobs)
+    failed = sum(job['videos'].get('failed', 0) for job in jobs)
+    retried = conn.execute("SELECT COUNT(*) FROM tasks WHERE attempts > 1").fetchone()[0]
+    per_worker = conn.execute(
+        "SELECT lease_owner, COUNT(*) FROM tasks WHERE status = 'done' GROUP BY lease_owner ORDER BY lease_owner"
+    ).fetchall()
+    print(
+        f"{args.workers} remote + {args.local_workers} local workers x {args.concurrency}, "
+        f"{args.playlists} playlists x {args.videos} videos, llm {args.llm_latency}s, lease {args.lease_seconds}s"
+    )
+    print(f"jobs: {', '.join(job['status'] for job in jobs)}")
+    print(f"{videos} videos ({failed} failed) in {wall:.1f}s = {videos / wall * 60:.0f} videos/min, {retried} tasks retried")
+    print("tasks per worker: " + ", ".join(f"{owner}={count}" for owner, count in per_worker))
+    print(f"output: {os.path.join(work, 'out')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Startup-time benchmark and import-budget check for the CLI and package entry points.
+
+Each scenario runs in a fresh interpreter (so nothing is already imported) and reports
+the median wall time of the whole process, the time spent inside the scenario itself, and
+which heavy dependencies ended up in sys.modules. With --check the script exits non-zero
+when a scenario loads a dependency it must not need (e.g. langchain for --help or yt-dlp
+for render-only work) or, with --max-ms, runs over the given in-process budget; use it as
+a CI guard.
+
+    python benchmarks/bench_startup.py --repeat 5
+    python benchmarks/bench_startup.py --check --max-ms 1500
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY = (
+    "langchain", "langchain_core", "langchain_openai", "openai", "tiktoken",
+    "yt_dlp", "docx", "lxml", "httpx", "requests", "pydantic",
+)
+LLM_STACK = ("langchain", "langchain_core", "langchain_openai", "openai", "tiktoken")
+HTTP_STACK = ("httpx", "requests")
+
+NOTES = {
+    'title': "Startup benchmark",
+    'kind': "playlist",
+    'source_url': None,
+    'videos': [{
+        'video_id': "v1",
+        'title': "Video 1",
+        'outline': {'sections': [{'title': "Topic", 'subsections': [{'title': "Point", 'bullets': ["a", "b"]}]}]},
+        'error': None,
+    }],
+}
+
+# name -> (code run in a fresh interpreter, modules that must not be imported)
+SCENARIOS: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "import yt_notetaker": (
+        "import yt_notetaker",
+        LLM_STACK + HTTP_STACK + ("yt_dlp", "docx", "pydantic"),
+    ),
+    "main.py --help": (
+        "import contextlib, io, sys\n"
+        "sys.argv = ['main.py', '--help']\n"
+        "import main\n"
+        "with contextlib.redirect_stdout(io.StringIO()):\n"
+        "    try:\n"
+        "        main.main()\n"
+        "    except SystemExit:\n"
+        "        pass\n",
+        LLM_STACK + HTTP_STACK + ("yt_dlp", "docx"),
+    ),
+    "render markdown": (
+        "import tempfile\n"
+        "from yt_notetaker import render_notes\n"
+        "render_notes(NOTES_PATH, ['markdown', 'html'], tempfile.mkdtemp())\n",
+        LLM_STACK + HTTP_STACK + ("yt_dlp", "docx"),
+    ),
+    "render docx": (
+        "import tempfile\n"
+        "from yt_notetaker import render_notes\n"
+        "render_notes(NOTES_PATH, ['docx'], tempfile.mkdtemp())\n",
+        LLM_STACK + HTTP_STACK + ("yt_dlp",),
+    ),
+    "no-LLM pipeline": (
+        "import asyncio\n"
+        "from yt_notetaker.notetaker import VideoPipeline\n"
+        "async def run():\n"
+        "    async with VideoPipeline(use_llm=False) as pipeline:\n"
+        "        await pipeline.process_entry({'id': 'v1', 'title': 'Video 1'})\n"
+        "asyncio.run(run())\n",
+        LLM_STACK + HTTP_STACK,
+    ),
+    "import llm_utils": (
+        "import yt_notetaker.llm_utils",
+        (),
+    ),
+}
+
+_RUNNER = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+NOTES_PATH = {notes!r}
+start = time.perf_counter()
+exec(compile({code!r}, "<scenario>", "exec"))
+elapsed = time.perf_counter() - start
+print(json.dumps({{'ms': elapsed * 1000, 'modules': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def run_scenario(code: str, notes_path: str) -> Tuple[float, float, List[str]]:
+    script = _RUNNER.format(root=ROOT, notes=notes_path, code=code, heavy=HEAVY)
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True)
+    wall = (time.perf_counter() - start) * 1000
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip() or f"exit code {completed.returncode}")
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    return (wall, result['ms'], result['modules'])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario; medians are reported.")
+    parser.add_argument("--check", action="store_true", help="Exit non-zero if a scenario imports a forbidden module.")
+    parser.add_argument("--max-ms", type=float, default=None, help="With --check, also fail guarded scenarios slower than this (in-process ms).")
+    args = parser.parse_args()
+
+    failures: List[str] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        notes_path = os.path.join(tmp, "startup.notes.json")
+        with open(notes_path, "w", encoding="utf-8") as fh:
+            json.dump(NOTES, fh)
+
+        print(f"{'scenario':<22} {'process ms':>11} {'scenario ms':>12}  heavy modules loaded")
+        for name, (code, forbidden) in SCENARIOS.items():
+            runs = [run_scenario(code, notes_path) for _ in range(args.repeat)]
+            wall = statistics.median(run[0] for run in runs)
+            inner = statistics.median(run[1] for run in runs)
+            modules = runs[-1][2]
+            print(f"{name:<22} {wall:11.0f} {inner:12.0f}  {', '.join(modules) or '-'}")
+            unexpected = [m for m in modules if m in forbidden]
+            if unexpected:
+                failures.append(f"{name}: imported {', '.join(unexpected)}")
+            if forbidden and args.max_ms is not None and inner > args.max_ms:
+                failures.append(f"{name}: {inner:.0f} ms over the {args.max_ms:.0f} ms budget")
+
+    if args.check:
+        if failures:
+            raise SystemExit("import budget exceeded:\n  " + "\n  ".join(failures))
+        print("import budget: ok")
+
+
+if __name__ == "__main__":
+    main()
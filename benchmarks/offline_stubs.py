@@ -0,0 +1,476 @@
+"""
+Local stand-ins for YouTube and the OpenAI API, used by the end-to-end benchmarks.
+
+StubServer is a threaded HTTP server that serves synthetic caption files
+(GET /captions/<video_id>.<json3|vtt>) and an OpenAI-compatible chat completions
+endpoint (POST /v1/chat/completions) with configurable latency, error rate, rate of
+truncated JSON replies and requests/tokens-per-minute limits answered with 429s and
+x-ratelimit-* headers. The response_format of a request is accepted and ignored.
+It also stands in for the Batch API (POST /v1/files, POST /v1/batches, GET
+/v1/batches/<id>, GET /v1/files/<id>/content): a batch is answered in one go, with the
+same error and truncation rates, and reported completed after batch_latency seconds.
+answer_batch_file and watch_batch_dir do the same for request files in a directory
+(the "directory" batch backend).
+
+FakeExtractor replaces the yt-dlp calls (get_playlist_info / get_video_info) with
+synthetic playlists whose caption URLs point at the StubServer, so everything after
+extraction (caption download, parsing, chunking, LLM calls, DOCX writing) runs for real.
+"""
+import email.parser
+import email.policy
+import json
+import multiprocessing
+import os
+import random
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, List, Optional
+
+
+WORDS = (
+    "today we look at how attention layers route information between tokens and why the "
+    "key query product is scaled before the softmax so that gradients stay well behaved "
+    "during training of larger transformer models on long sequences"
+).split()
+
+
+def _vtt_ts(ms: int) -> str:
+    return f"{ms // 3600000:02d}:{ms // 60000 % 60:02d}:{ms // 1000 % 60:02d}.{ms % 1000:03d}"
+
+
+def synthetic_json3(video_id: str, minutes: float, cue_ms: int = 2500) -> str:
+    """
+    YouTube json3 auto-captions of the given length; text varies with video_id.
+    """
+    offset = sum(map(ord, video_id))
+    events = []
+    for i, t in enumerate(range(0, int(minutes * 60000), cue_ms)):
+        words = [WORDS[(offset + i * 3 + k) % len(WORDS)] for k in range(8)]
+        events.append({
+            "tStartMs": t,
+            "dDurationMs": cue_ms,
+            "segs": [{"utf8": words[0]}] + [{"utf8": " " + w, "tOffsetMs": k * 300} for k, w in enumerate(words[1:])],
+        })
+    return json.dumps({"events": events})
+
+
+def synthetic_rolling_vtt(video_id: str, minutes: float, cue_ms: int = 2500) -> str:
+    """
+    WebVTT in YouTube's rolling auto-caption layout: each cue repeats the previous line.
+    """
+    offset = sum(map(ord, video_id))
+    lines = ["WEBVTT", "Kind: captions", "Language: en", ""]
+    previous = ""
+    for i, t in enumerate(range(0, int(minutes * 60000), cue_ms)):
+        current = " ".join(WORDS[(offset + i * 3 + k) % len(WORDS)] for k in range(8))
+        lines.append(f"{_vtt_ts(t)} --> {_vtt_ts(t + cue_ms)} align:start position:0%")
+        lines.append(previous + "\n" + current if previous else current)
+        lines.append("")
+        previous = current
+    return "\n".join(lines)
+
+
+@dataclass
+class StubConfig:
+    llm_latency: float = 0.5
+    llm_jitter: float = 0.25
+    error_rate: float = 0.0
+    malformed_rate: float = 0.0
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+    caption_minutes: float = 20.0
+    caption_format: str = "json3"
+    caption_latency: float = 0.02
+    batch_latency: float = 1.0
+    # Status of the error_rate failures: 500, or 429 with a retry-after-ms of retry_after_ms.
+    error_status: int = 500
+    retry_after_ms: int = 50
+
+
+class _Bucket:
+    # Server-side rate limit: a per-minute budget refilled continuously.
+
+    def __init__(self, per_minute: Optional[float]) -> None:
+        self.per_minute = per_minute
+        self.level = per_minute or 0.0
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self, amount: float) -> Optional[float]:
+        """
+        Spend amount; returns None on success or the seconds until it would fit.
+        """
+        if not self.per_minute:
+            return None
+        with self.lock:
+            now = time.monotonic()
+            self.level = min(self.per_minute, self.level + (now - self.updated) * self.per_minute / 60.0)
+            self.updated = now
+            if self.level >= amount:
+                self.level -= amount
+                return None
+            return (amount - self.level) * 60.0 / self.per_minute
+
+    def remaining(self) -> int:
+        return int(self.level) if self.per_minute else 1_000_000
+
+
+def _outline_for(prompt: str, rng: random.Random) -> Dict:
+    title = re.search(r"Title:\s*(.*)", prompt)
+    name = title.group(1).strip()[:60] if title else "Video"
+    sections = []
+    for s in range(3):
+        subs = []
+        for u in range(2):
+            bullets = [" ".join(rng.choice(WORDS) for _ in range(12)) for _ in range(3)]
+            subs.append({"title": f"{name}: point {s + 1}.{u + 1}", "bullets": bullets})
+        sections.append({"title": f"{name}: topic {s + 1}", "subsections": subs})
+    return {"sections": sections}
+
+
+def _completion(payload: Dict, number: int, seed: float, rng_value: float, config: StubConfig) -> Dict:
+    prompt = "\n".join(str(m.get("content", "")) for m in payload.get("messages", []))
+    prompt_tokens = len(prompt) // 4 + 1
+    completion_tokens = 400
+    content = json.dumps(_outline_for(prompt, random.Random(seed)))
+    finish_reason = "stop"
+    if random.Random(seed).random() < config.malformed_rate:
+        # A fenced reply cut off mid-way, as when max_tokens is reached.
+        content = "```json\n" + content[: int(len(content) * (0.3 + 0.6 * rng_value))]
+        finish_reason = "length"
+    return {
+        "id": f"chatcmpl-{number}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": payload.get("model", "stub"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": finish_reason}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def answer_batch_lines(data: bytes, config: StubConfig, rng: random.Random) -> List[Dict]:
+    """
+    Batch API output lines for a JSONL request file; error_rate of them fail with a 500.
+    """
+    results = []
+    for number, line in enumerate(data.decode("utf-8").splitlines()):
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        rng_value, seed = rng.random(), rng.random()
+        result = {"id": f"batch_req_{number}", "custom_id": request["custom_id"], "error": None}
+        if rng_value < config.error_rate:
+            body = {"error": {"message": "The server had an error", "type": "server_error"}}
+            result["response"] = {"status_code": 500, "body": body}
+        else:
+            result["response"] = {"status_code": 200, "body": _completion(request["body"], number, seed, rng_value, config)}
+        results.append(result)
+    return results
+
+
+def answer_batch_file(input_path: str, output_path: str, config: StubConfig, seed: int = 0) -> None:
+    """
+    Answer a request file as a batch would, moving the output file into place when done.
+    """
+    with open(input_path, "rb") as fh:
+        results = answer_batch_lines(fh.read(), config, random.Random(seed))
+    with open(f"{output_path}.tmp", "w", encoding="utf-8") as fh:
+        fh.writelines(json.dumps(result) + "\n" for result in results)
+    os.replace(f"{output_path}.tmp", output_path)
+
+
+def watch_batch_dir(directory: str, config: StubConfig, stop: threading.Event, poll_interval: float = 0.1) -> None:
+    """
+    Local stand-in for the "directory" batch backend: answers every <name>.jsonl request
+    file in directory that has no <name>.output.jsonl yet, after batch_latency seconds,
+    until stop is set.
+    """
+    while not stop.wait(poll_interval):
+        for name in sorted(os.listdir(directory)) if os.path.isdir(directory) else []:
+            if not name.endswith(".jsonl") or name.endswith((".output.jsonl", ".errors.jsonl")):
+                continue
+            output = os.path.join(directory, name[: -len(".jsonl")] + ".output.jsonl")
+            if not os.path.exists(output):
+                time.sleep(config.batch_latency)
+                answer_batch_file(os.path.join(directory, name), output, config)
+
+
+class StubServer:
+    """
+    Threaded HTTP stub for caption files and chat completions; see the module docstring.
+    """
+
+    def __init__(self, config: StubConfig, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.config = config
+        self.requests = 0
+        self.rejected = 0
+        self.failed = 0
+        self._captions: Dict[str, bytes] = {}
+        self._captions_lock = threading.Lock()
+        self._rpm = _Bucket(config.requests_per_minute)
+        self._tpm = _Bucket(config.tokens_per_minute)
+        self._counter_lock = threading.Lock()
+        self._rng = random.Random(0)
+        self._files: Dict[str, bytes] = {}
+        self._batches: Dict[str, Dict] = {}
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._httpd.request_queue_size = 1024
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def serve_forever(self) -> None:
+        self._httpd.serve_forever()
+
+    def start(self) -> "StubServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def shutdown(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def caption_body(self, video_id: str, ext: str) -> bytes:
+        key = f"{video_id}.{ext}"
+        with self._captions_lock:
+            body = self._captions.get(key)
+        if body is None:
+            if ext == "vtt":
+                text = synthetic_rolling_vtt(video_id, self.config.caption_minutes)
+            else:
+                text = synthetic_json3(video_id, self.config.caption_minutes)
+            body = text.encode("utf-8")
+            with self._captions_lock:
+                self._captions[key] = body
+        return body
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def _send(self, status: int, body: bytes, content_type: str, headers: Optional[Dict[str, str]] = None) -> None:
+                self.send_response(status)
+                self.send_header("content-type", content_type)
+                self.send_header("content-length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_json(self, body: Dict) -> None:
+                self._send(200, json.dumps(body).encode(), "application/json")
+
+            def _batch_status(self, batch_id: str) -> Optional[Dict]:
+                batch = server._batches.get(batch_id)
+                if batch is not None and batch["status"] == "in_progress" and time.time() >= batch["ready_at"]:
+                    with server._counter_lock:
+                        rng = random.Random(server._rng.random())
+                    results = answer_batch_lines(server._files[batch["input_file_id"]], server.config, rng)
+                    output_id = f"file-{len(server._files)}"
+                    server._files[output_id] = "".join(json.dumps(r) + "\n" for r in results).encode()
+                    failed = sum(1 for r in results if r["response"]["status_code"] != 200)
+                    batch.update(
+                        status="completed",
+                        output_file_id=output_id,
+                        request_counts={"total": len(results), "completed": len(results) - failed, "failed": failed},
+                    )
+                return batch
+
+            def do_GET(self) -> None:
+                path = self.path.split("?")[0].rstrip("/")
+                match = re.fullmatch(r"/v1/batches/([\w-]+)", path)
+                if match:
+                    batch = self._batch_status(match.group(1))
+                    if batch is None:
+                        self._send(404, b'{"error": {"message": "no such batch"}}', "application/json")
+                    else:
+                        self._send_json({k: v for k, v in batch.items() if k != "ready_at"})
+                    return
+                match = re.fullmatch(r"/v1/files/([\w-]+)/content", path)
+                if match and match.group(1) in server._files:
+                    self._send(200, server._files[match.group(1)], "application/jsonl")
+                    return
+                match = re.fullmatch(r"/captions/([\w-]+)\.(json3|vtt)", self.path.split("?")[0])
+                if not match:
+                    self._send(404, b"not found", "text/plain")
+                    return
+                time.sleep(server.config.caption_latency)
+                content_type = "application/json" if match.group(2) == "json3" else "text/vtt"
+                self._send(200, server.caption_body(match.group(1), match.group(2)), content_type)
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("content-length") or 0)
+                data = self.rfile.read(length)
+                path = self.path.split("?")[0].rstrip("/")
+                if path.endswith("/v1/files"):
+                    # The upload is multipart/form-data with the request file in the "file" part.
+                    message = email.parser.BytesParser(policy=email.policy.default).parsebytes(
+                        f"content-type: {self.headers['content-type']}\r\n\r\n".encode() + data
+                    )
+                    upload = next(part for part in message.iter_parts() if part.get_param("name", header="content-disposition") == "file")
+                    file_id = f"file-{len(server._files)}"
+                    server._files[file_id] = upload.get_payload(decode=True)
+                    self._send_json({
+                        "id": file_id, "object": "file", "bytes": len(server._files[file_id]), "created_at": int(time.time()),
+                        "filename": upload.get_filename() or "batch.jsonl", "purpose": "batch", "status": "processed",
+                    })
+                    return
+                payload = json.loads(data or b"{}")
+                if path.endswith("/v1/batches"):
+                    batch_id = f"batch_{len(server._batches)}"
+                    server._batches[batch_id] = {
+                        "id": batch_id,
+                        "object": "batch",
+                        "endpoint": payload.get("endpoint"),
+                        "input_file_id": payload.get("input_file_id"),
+                        "completion_window": payload.get("completion_window", "24h"),
+                        "status": "in_progress",
+                        "created_at": int(time.time()),
+                        "output_file_id": None,
+                        "error_file_id": None,
+                        "request_counts": {"total": 0, "completed": 0, "failed": 0},
+                        "ready_at": time.time() + server.config.batch_latency,
+                    }
+                    self._send_json({k: v for k, v in server._batches[batch_id].items() if k != "ready_at"})
+                    return
+                if not path.endswith("/chat/completions"):
+                    self._send(404, b'{"error": {"message": "not found"}}', "application/json")
+                    return
+                with server._counter_lock:
+                    server.requests += 1
+                    rng_value = server._rng.random()
+                    seed = server._rng.random()
+                prompt = "\n".join(str(m.get("content", "")) for m in payload.get("messages", []))
+                prompt_tokens = len(prompt) // 4 + 1
+                completion_tokens = 400
+                config = server.config
+
+                wait = server._rpm.take(1) or server._tpm.take(prompt_tokens + completion_tokens)
+                limit_headers = {}
+                if config.requests_per_minute:
+                    limit_headers["x-ratelimit-limit-requests"] = str(int(config.requests_per_minute))
+                    limit_headers["x-ratelimit-remaining-requests"] = str(server._rpm.remaining())
+                if config.tokens_per_minute:
+                    limit_headers["x-ratelimit-limit-tokens"] = str(int(config.tokens_per_minute))
+                    limit_headers["x-ratelimit-remaining-tokens"] = str(server._tpm.remaining())
+                if wait is not None:
+                    with server._counter_lock:
+                        server.rejected += 1
+                    body = json.dumps({"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}})
+                    self._send(429, body.encode(), "application/json", {**limit_headers, "retry-after-ms": str(int(wait * 1000) + 1)})
+                    return
+
+                time.sleep(max(0.0, config.llm_latency + (seed - 0.5) * 2 * config.llm_jitter))
+                if rng_value < config.error_rate:
+                    with server._counter_lock:
+                        server.failed += 1
+                    if config.error_status == 429:
+                        body = json.dumps({"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}})
+                        limit_headers["retry-after-ms"] = str(config.retry_after_ms)
+                    else:
+                        body = json.dumps({"error": {"message": "The server had an error", "type": "server_error"}})
+                    self._send(config.error_status, body.encode(), "application/json", limit_headers)
+                    return
+
+                body = json.dumps(_completion(payload, server.requests, seed, rng_value, config))
+                self._send(200, body.encode(), "application/json", limit_headers)
+
+        return Handler
+
+
+def _serve_in_process(config: Dict, ready) -> None:
+    server = StubServer(StubConfig(**config))
+    ready.put(server.url)
+    server.serve_forever()
+
+
+def start_stub_process(config: StubConfig):
+    """
+    Run a StubServer in a separate process so its threads do not compete with the code
+    under test. Returns (process, base_url); terminate the process when done.
+    """
+    context = multiprocessing.get_context("spawn")
+    ready = context.Queue()
+    process = context.Process(target=_serve_in_process, args=(asdict(config), ready), daemon=True)
+    process.start()
+    return (process, ready.get(timeout=30))
+
+
+class FakeExtractor:
+    """
+    Synthetic replacement for the yt-dlp extraction calls.
+    Playlist URLs of the form "bench://playlist/<name>?videos=<n>" enumerate n entries;
+    video info points its auto captions at the stub server. metadata_latency simulates the
+    blocking time of one yt-dlp extraction.
+    """
+
+    def __init__(self, stub_url: str, *, videos: int = 100, metadata_latency: float = 0.05, caption_format: str = "json3") -> None:
+        self.stub_url = stub_url
+        self.videos = videos
+        self.metadata_latency = metadata_latency
+        self.caption_format = caption_format
+        self.durations: List[float] = []
+        self._lock = threading.Lock()
+
+    def playlist_info(self, url: str) -> Dict:
+        name = url.rsplit("/", 1)[-1].split("?")[0] or "bench"
+        match = re.search(r"videos=(\d+)", url)
+        count = int(match.group(1)) if match else self.videos
+
+        def entries() -> Iterator[Dict]:
+            for i in range(count):
+                yield {"id": f"{name}-{i:05d}", "title": f"Benchmark video {i + 1}"}
+
+        return {"title": f"Benchmark {name}", "entries": entries()}
+
+    def video_info(self, url: str) -> Dict:
+        start = time.perf_counter()
+        time.sleep(self.metadata_latency)
+        video_id = url.rsplit("=", 1)[-1]
+        ext = self.caption_format
+        info = {
+            "id": video_id,
+            "title": f"Benchmark video {video_id}",
+            "automatic_captions": {"en": [{"ext": ext, "url": f"{self.stub_url}/captions/{video_id}.{ext}"}]},
+        }
+        with self._lock:
+            self.durations.append(time.perf_counter() - start)
+        return info
+
+    def install(self) -> Callable[[], None]:
+        """
+        Patch the extraction functions the pipeline, generators, batch mode and queue worker call;
+        returns a function that restores the originals.
+        """
+        from yt_notetaker import batch, notetaker, pipeline, worker
+
+        originals = (notetaker.get_playlist_info, worker.get_playlist_info, batch.get_playlist_info, pipeline.get_video_info)
+        notetaker.get_playlist_info = self.playlist_info
+        worker.get_playlist_info = self.playlist_info
+        batch.get_playlist_info = self.playlist_info
+        pipeline.get_video_info = self.video_info
+
+        def restore() -> None:
+            (
+                notetaker.get_playlist_info,
+                worker.get_playlist_info,
+                batch.get_playlist_info,
+                pipeline.get_video_info,
+            ) = originals
+
+        return restore
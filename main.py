@@ -1,35 +1,96 @@
+import logging
 import os
-from typing import List
+from typing import TYPE_CHECKING, List, Optional
 
 import typer
 
-from yt_notetaker.notetaker import generate_playlist_docx, generate_single_video_docx
+from yt_notetaker.metrics import get_metrics, start_metrics_server
+
+if TYPE_CHECKING:
+    from yt_notetaker.pipeline import VideoEvent
+
+# Commands import the pipeline, LLM and document modules when they run, so --help and
+# render-only invocations do not pay for yt-dlp, langchain or the HTTP stack; the format
+# list for --help is therefore spelled out rather than read from the writer registry.
+OUTPUT_FORMATS = ("docx", "markdown", "html", "json")
 
 
 app = typer.Typer(help="Generate DOCX files of YouTube playlist transcripts.")
 
 
+@app.callback()
+def configure(
+    ctx: typer.Context,
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="Log per-video details such as transcript token savings."),
+    profile: Optional[str] = typer.Option(None, "--profile", help="Write a JSON trace of timing spans and counters to this path and print a summary table."),
+    metrics_port: Optional[int] = typer.Option(None, "--metrics-port", help="Serve Prometheus text-format metrics on this port while the command runs."),
+    metrics_host: str = typer.Option("127.0.0.1", "--metrics-host", help="Interface for --metrics-port."),
+):
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+    logging.getLogger("yt_notetaker").setLevel(logging.INFO if verbose else logging.WARNING)
+    if metrics_port is not None:
+        server = start_metrics_server(metrics_port, metrics_host)
+        ctx.call_on_close(server.shutdown)
+    if profile:
+        get_metrics().start_trace()
+        ctx.call_on_close(lambda: _write_profile(profile))
+
+
 @app.command()
 def generate(
     playlist_urls: List[str] = typer.Argument(..., help="One or more YouTube playlist URLs."),
     output_dir: str = typer.Option("playlists_docx", "--output-dir", "-o", help="Directory to save DOCX files."),
     use_llm: bool = typer.Option(True, "--use-llm/--no-llm", help="Enable LLM summarization and outline."),
     model: str = typer.Option("gpt-4o-mini", "--model", help="LLM model for summarization."),
+    llm_base_url: Optional[str] = typer.Option(None, "--llm-base-url", help="OpenAI-compatible API base URL."),
+    llm_rpm: Optional[float] = typer.Option(None, "--llm-rpm", help="LLM requests-per-minute budget (default: learned from rate-limit headers)."),
+    llm_tpm: Optional[float] = typer.Option(None, "--llm-tpm", help="LLM tokens-per-minute budget (default: learned from rate-limit headers)."),
     include_raw_transcript: bool = typer.Option(False, "--include-raw/--no-include-raw", help="Include raw transcript in DOCX (not recommended)."),
-    max_workers: int = typer.Option(250, "--max-workers", help="Max parallel threads for LLM calls."),
+    metadata_concurrency: int = typer.Option(16, "--metadata-concurrency", help="Max concurrent yt-dlp metadata extractions."),
+    download_concurrency: int = typer.Option(32, "--download-concurrency", help="Max concurrent caption downloads."),
+    llm_concurrency: int = typer.Option(64, "--llm-concurrency", help="Max concurrent LLM calls."),
+    max_workers: Optional[int] = typer.Option(None, "--max-workers", hidden=True, help="Deprecated alias for --llm-concurrency."),
+    transcript_cache: str = typer.Option("use", "--transcript-cache", help="Transcript cache mode: use, refresh or off."),
+    llm_cache: str = typer.Option("use", "--llm-cache", help="LLM outline cache mode: use, refresh or off."),
+    manifest: str = typer.Option("use", "--manifest", help="Per-playlist resume manifest mode: use, refresh or off."),
+    chunk_tokens: int = typer.Option(8000, "--chunk-tokens", help="Max transcript tokens per outline call."),
+    chunk_overlap_tokens: int = typer.Option(200, "--chunk-overlap-tokens", help="Transcript tokens repeated between neighbouring chunks."),
+    merge_token_budget: int = typer.Option(12000, "--merge-token-budget", help="Max prompt tokens for one outline merge call."),
+    progress: bool = typer.Option(True, "--progress/--no-progress", help="Print a line as each video finishes."),
 ):
     """Generate DOCX files for provided playlist URLs."""
+    from yt_notetaker.notetaker import generate_playlists_docx
+
     os.makedirs(output_dir, exist_ok=True)
-    for url in playlist_urls:
-        typer.echo(f"Processing playlist: {url}")
-        generate_playlist_docx(
-            url,
-            output_dir=output_dir,
-            use_llm=use_llm,
-            llm_model=model,
-            include_raw_transcript=include_raw_transcript,
-            max_workers=max_workers,
-        )
+    _configure_rate_limits(llm_rpm, llm_tpm)
+    typer.echo(f"Processing {len(playlist_urls)} playlist(s)")
+    results = generate_playlists_docx(
+        playlist_urls,
+        output_dir=output_dir,
+        use_llm=use_llm,
+        llm_model=model,
+        llm_base_url=llm_base_url,
+        include_raw_transcript=include_raw_transcript,
+        metadata_concurrency=metadata_concurrency,
+        download_concurrency=download_concurrency,
+        llm_concurrency=max_workers if max_workers is not None else llm_concurrency,
+        transcript_cache=transcript_cache,
+        llm_cache=llm_cache,
+        manifest=manifest,
+        chunk_tokens=chunk_tokens,
+        chunk_overlap_tokens=chunk_overlap_tokens,
+        merge_token_budget=merge_token_budget,
+        on_event=_ProgressPrinter() if progress else None,
+    )
+    for result in results:
+        if result.error:
+            typer.echo(f"Failed: {result.url} — {result.error}", err=True)
+        else:
+            typer.echo(f"Saved: {result.path}")
+    if use_llm and llm_cache != "off":
+        _echo_llm_cache_stats()
+    if any(result.error for result in results):
+        raise typer.Exit(code=1)
 
 
 @app.command()
@@ -38,16 +99,216 @@ def generate_single(
     output_dir: str = typer.Option("playlists_docx", "--output-dir", "-o", help="Directory to save DOCX files."),
     use_llm: bool = typer.Option(True, "--use-llm/--no-llm", help="Enable LLM summarization and outline."),
     model: str = typer.Option("gpt-4o-mini", "--model", help="LLM model for summarization."),
+    llm_base_url: Optional[str] = typer.Option(None, "--llm-base-url", help="OpenAI-compatible API base URL."),
+    llm_rpm: Optional[float] = typer.Option(None, "--llm-rpm", help="LLM requests-per-minute budget (default: learned from rate-limit headers)."),
+    llm_tpm: Optional[float] = typer.Option(None, "--llm-tpm", help="LLM tokens-per-minute budget (default: learned from rate-limit headers)."),
+    transcript_cache: str = typer.Option("use", "--transcript-cache", help="Transcript cache mode: use, refresh or off."),
+    llm_cache: str = typer.Option("use", "--llm-cache", help="LLM outline cache mode: use, refresh or off."),
+    chunk_tokens: int = typer.Option(8000, "--chunk-tokens", help="Max transcript tokens per outline call."),
+    chunk_overlap_tokens: int = typer.Option(200, "--chunk-overlap-tokens", help="Transcript tokens repeated between neighbouring chunks."),
+    merge_token_budget: int = typer.Option(12000, "--merge-token-budget", help="Max prompt tokens for one outline merge call."),
 ):
+    from yt_notetaker.notetaker import generate_single_video_docx
+
     os.makedirs(output_dir, exist_ok=True)
+    _configure_rate_limits(llm_rpm, llm_tpm)
     typer.echo(f"Processing video: {video_url}")
     path = generate_single_video_docx(
         video_url,
         output_dir=output_dir,
         use_llm=use_llm,
         llm_model=model,
+        llm_base_url=llm_base_url,
+        transcript_cache=transcript_cache,
+        llm_cache=llm_cache,
+        chunk_tokens=chunk_tokens,
+        chunk_overlap_tokens=chunk_overlap_tokens,
+        merge_token_budget=merge_token_budget,
     )
     typer.echo(f"Saved: {path}")
+    if use_llm and llm_cache != "off":
+        _echo_llm_cache_stats()
+
+
+@app.command()
+def generate_batch(
+    playlist_urls: List[str] = typer.Argument(..., help="One or more YouTube playlist URLs."),
+    output_dir: str = typer.Option("playlists_docx", "--output-dir", "-o", help="Directory to save DOCX files."),
+    batch_dir: str = typer.Option("batch_requests", "--batch-dir", help="Directory for batch request and result files."),
+    backend: str = typer.Option("openai", "--backend", help="Where batches run: openai (Batch API) or directory (files for a local stand-in)."),
+    poll_interval: float = typer.Option(60.0, "--poll-interval", help="Seconds between batch status checks."),
+    model: str = typer.Option("gpt-4o-mini", "--model", help="LLM model for summarization."),
+    llm_base_url: Optional[str] = typer.Option(None, "--llm-base-url", help="OpenAI-compatible API base URL."),
+    metadata_concurrency: int = typer.Option(16, "--metadata-concurrency", help="Max concurrent yt-dlp metadata extractions."),
+    download_concurrency: int = typer.Option(32, "--download-concurrency", help="Max concurrent caption downloads."),
+    transcript_cache: str = typer.Option("use", "--transcript-cache", help="Transcript cache mode: use, refresh or off."),
+    llm_cache: str = typer.Option("use", "--llm-cache", help="LLM outline cache mode: use, refresh or off."),
+    chunk_tokens: int = typer.Option(8000, "--chunk-tokens", help="Max transcript tokens per outline call."),
+    chunk_overlap_tokens: int = typer.Option(200, "--chunk-overlap-tokens", help="Transcript tokens repeated between neighbouring chunks."),
+    merge_token_budget: int = typer.Option(12000, "--merge-token-budget", help="Max prompt tokens for one outline merge call."),
+):
+    """Generate DOCX files for playlist URLs with outlines from batch requests (slower, cheaper)."""
+    from yt_notetaker.batch import generate_playlists_docx_batch
+
+    os.makedirs(output_dir, exist_ok=True)
+    typer.echo(f"Processing {len(playlist_urls)} playlist(s) in batch mode ({backend})")
+    results = generate_playlists_docx_batch(
+        playlist_urls,
+        output_dir=output_dir,
+        batch_dir=batch_dir,
+        backend=backend,
+        poll_interval=poll_interval,
+        llm_model=model,
+        llm_base_url=llm_base_url,
+        metadata_concurrency=metadata_concurrency,
+        download_concurrency=download_concurrency,
+        transcript_cache=transcript_cache,
+        llm_cache=llm_cache,
+        chunk_tokens=chunk_tokens,
+        chunk_overlap_tokens=chunk_overlap_tokens,
+        merge_token_budget=merge_token_budget,
+    )
+    for result in results:
+        if result.error:
+            typer.echo(f"Failed: {result.url} — {result.error}", err=True)
+        else:
+            typer.echo(f"Saved: {result.path}")
+    if llm_cache != "off":
+        _echo_llm_cache_stats()
+    if any(result.error for result in results):
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def render(
+    notes_files: List[str] = typer.Argument(..., help="Saved .notes.json files written next to generated DOCX files."),
+    formats: List[str] = typer.Option(["docx"], "--format", "-f", help=f"Output format, repeatable: {', '.join(OUTPUT_FORMATS)} or a registered writer."),
+    output_dir: Optional[str] = typer.Option(None, "--output-dir", "-o", help="Directory for rendered files (default: next to each notes file)."),
+):
+    """Render stored outlines into DOCX, Markdown, HTML or JSON without re-running extraction or the LLM."""
+    from yt_notetaker.notetaker import render_notes
+
+    for notes_file in notes_files:
+        try:
+            paths = render_notes(notes_file, formats, output_dir)
+        except (OSError, ValueError) as exc:
+            raise typer.BadParameter(str(exc))
+        for path in paths:
+            typer.echo(f"Saved: {path}")
+
+
+@app.command()
+def serve(
+    db: str = typer.Option("queue.sqlite3", "--db", help="SQLite job queue database."),
+    host: str = typer.Option("127.0.0.1", "--host", help="Interface to listen on."),
+    port: int = typer.Option(8765, "--port", help="Port for the job API."),
+    output_dir: str = typer.Option("playlists_docx", "--output-dir", "-o", help="Directory for rendered DOCX files."),
+    lease_seconds: float = typer.Option(60.0, "--lease-seconds", help="How long a claimed task stays leased without a heartbeat."),
+    max_attempts: int = typer.Option(3, "--max-attempts", help="Attempts per task before it is recorded as failed."),
+):
+    """Serve the durable job queue over HTTP and render finished jobs; run `worker` processes to do the work."""
+    import asyncio
+
+    from yt_notetaker.server import start_queue_server
+    from yt_notetaker.work_queue import WorkQueue
+    from yt_notetaker.worker import Worker
+
+    queue = WorkQueue(db, lease_seconds=lease_seconds, max_attempts=max_attempts)
+    server = start_queue_server(queue, port, host, output_dir=output_dir)
+    typer.echo(f"Job queue {db} serving on http://{host}:{server.server_port}")
+    try:
+        asyncio.run(Worker(queue, kinds=("render",), concurrency=1).run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        queue.close()
+
+
+@app.command()
+def worker(
+    server: Optional[str] = typer.Option(None, "--server", help="Job API URL of a `serve` process, e.g. http://host:8765."),
+    db: Optional[str] = typer.Option(None, "--db", help="Queue database on this machine, used directly instead of --server."),
+    concurrency: int = typer.Option(8, "--concurrency", help="Tasks processed at once."),
+    worker_id: Optional[str] = typer.Option(None, "--worker-id", help="Name recorded on leased tasks (default: host-pid-random)."),
+    llm_base_url: Optional[str] = typer.Option(None, "--llm-base-url", help="OpenAI-compatible API base URL."),
+    llm_rpm: Optional[float] = typer.Option(None, "--llm-rpm", help="LLM requests-per-minute budget (default: learned from rate-limit headers)."),
+    llm_tpm: Optional[float] = typer.Option(None, "--llm-tpm", help="LLM tokens-per-minute budget (default: learned from rate-limit headers)."),
+    metadata_concurrency: int = typer.Option(16, "--metadata-concurrency", help="Max concurrent yt-dlp metadata extractions."),
+    download_concurrency: int = typer.Option(32, "--download-concurrency", help="Max concurrent caption downloads."),
+    llm_concurrency: int = typer.Option(64, "--llm-concurrency", help="Max concurrent LLM calls."),
+    lease_seconds: float = typer.Option(60.0, "--lease-seconds", help="With --db: task lease length; match the serve setting."),
+    max_attempts: int = typer.Option(3, "--max-attempts", help="With --db: attempts per task; match the serve setting."),
+    exit_when_idle: bool = typer.Option(False, "--exit-when-idle", help="Exit once the queue has no work for this worker."),
+):
+    """Process tasks from the job queue until interrupted."""
+    import asyncio
+
+    from yt_notetaker.pipeline import StageLimits
+    from yt_notetaker.work_queue import RemoteQueue, WorkQueue
+    from yt_notetaker.worker import Worker
+
+    if (server is None) == (db is None):
+        raise typer.BadParameter("pass exactly one of --server or --db")
+    _configure_rate_limits(llm_rpm, llm_tpm)
+    queue = RemoteQueue(server) if server else WorkQueue(db, lease_seconds=lease_seconds, max_attempts=max_attempts)
+    runner = Worker(
+        queue,
+        worker_id=worker_id,
+        concurrency=concurrency,
+        llm_base_url=llm_base_url,
+        limits=StageLimits(metadata=metadata_concurrency, download=download_concurrency, llm=llm_concurrency),
+    )
+    typer.echo(f"Worker {runner.worker_id} polling {server or db}", err=True)
+    try:
+        processed = asyncio.run(runner.run(exit_when_idle=exit_when_idle))
+    except KeyboardInterrupt:
+        return
+    typer.echo(f"Worker {runner.worker_id} processed {processed} task(s)", err=True)
+
+
+class _ProgressPrinter:
+    """
+    Prints one line to stderr per finished video with a running done/seen count.
+    """
+
+    def __init__(self) -> None:
+        self.seen = 0
+        self.done = 0
+
+    def __call__(self, event: "VideoEvent") -> None:
+        if event.kind == "started":
+            self.seen += 1
+            return
+        if event.kind not in ("outlined", "failed"):
+            return
+        self.done += 1
+        if event.kind == "failed":
+            status = f"failed: {event.error}"
+        else:
+            status = "reused" if event.reused else "outlined"
+        typer.echo(f"[{self.done}/{self.seen}] {event.video_id} {event.title!r} {status} ({event.elapsed:.1f}s)", err=True)
+
+
+def _configure_rate_limits(rpm: Optional[float], tpm: Optional[float]) -> None:
+    if rpm is not None or tpm is not None:
+        from yt_notetaker.llm_utils import configure_llm_scheduler
+
+        configure_llm_scheduler(requests_per_minute=rpm, tokens_per_minute=tpm)
+
+
+def _write_profile(path: str) -> None:
+    metrics = get_metrics()
+    metrics.write_trace(path)
+    typer.echo(metrics.summary_table(), err=True)
+    typer.echo(f"Profile trace: {path}", err=True)
+
+
+def _echo_llm_cache_stats() -> None:
+    from yt_notetaker.llm_cache import get_outline_cache
+
+    stats = get_outline_cache().stats()
+    typer.echo(f"LLM cache: {stats['hits']} hits, {stats['misses']} misses")
 
 
 def main():
@@ -3,7 +3,8 @@ from typing import List
 
 import streamlit as st
 
-from yt_notetaker.notetaker import generate_playlist_docx, generate_single_video_docx
+from yt_notetaker.jobs import Job, JobManager
+from yt_notetaker.llm_cache import get_outline_cache
 
 
 st.set_page_config(page_title="YouTube Playlist → DOCX", page_icon="📄", layout="centered")
@@ -26,76 +27,140 @@ with st.expander("LLM settings"):
     use_llm = st.checkbox("Use LLM for outline and notes", value=True)
     model = st.text_input("Model", value="gpt-4o-mini")
     include_raw = st.checkbox("Include raw transcript in DOCX", value=False)
+    llm_cache = st.selectbox("LLM outline cache", ["use", "refresh", "off"], index=0)
+    llm_concurrency = st.number_input("Max concurrent LLM calls", min_value=1, max_value=256, value=64)
+
+
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+POLL_SECONDS = 1.0
+
+
+@st.cache_resource
+def job_manager() -> JobManager:
+    """
+    One job manager (event loop thread and bounded worker pool) per server process,
+    shared by every browser session.
+    """
+    return JobManager()
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def read_output(path: str, mtime_ns: int) -> bytes:
+    """
+    File contents for a download button, read once per file version instead of on every rerun.
+    """
+    with open(path, "rb") as fh:
+        return fh.read()
+
+
+def session_jobs() -> List[str]:
+    # Job ids are mirrored in the URL so a reloaded page reattaches to its jobs.
+    if "jobs" not in st.session_state:
+        st.session_state["jobs"] = st.query_params.get_all("job")
+    return st.session_state["jobs"]
+
+
+def track(job: Job) -> None:
+    ids = session_jobs()
+    if job.id not in ids:
+        ids.insert(0, job.id)
+        st.query_params["job"] = ids
+    if job.status == "done":
+        st.info("This job already finished with the same settings; its files are reused.")
+
+
+def show_llm_cache_stats() -> None:
+    stats = get_outline_cache().stats()
+    st.caption(f"LLM cache (all jobs on this server): {stats['hits']} hits, {stats['misses']} misses")
+
+
+def render_job(job: Job) -> None:
+    label = job.urls[0] if len(job.urls) == 1 else f"{len(job.urls)} playlists"
+    with st.container(border=True):
+        st.markdown(f"**{label}** · `{job.id}` · {job.status}")
+        if job.status == "queued":
+            st.info("Waiting for a free worker")
+        elif job.status == "running" and job.kind == "video":
+            st.info("Fetching the transcript and outlining the video")
+        if job.kind == "playlists" and (job.seen or job.active):
+            st.progress(job.progress, text=f"{job.done}/{job.seen} videos done")
+        if job.rows:
+            if job.active:
+                st.dataframe(list(job.rows.values()))
+            else:
+                with st.expander("Videos"):
+                    st.dataframe(list(job.rows.values()))
+        if job.active:
+            st.button("Cancel", key=f"cancel-{job.id}", on_click=job_manager().cancel, args=(job.id,))
+        if job.status == "failed":
+            st.error(f"Failed: {job.error}")
+        for result in job.results:
+            if result.error:
+                st.error(f"Failed: {result.url} — {result.error}")
+            elif result.path and os.path.exists(result.path):
+                st.success(f"Saved: {result.path}")
+                st.download_button(
+                    label=f"Download {os.path.basename(result.path)}",
+                    data=read_output(result.path, os.stat(result.path).st_mtime_ns),
+                    file_name=os.path.basename(result.path),
+                    mime=DOCX_MIME,
+                    key=f"download-{job.id}-{result.path}",
+                    on_click="ignore",
+                )
+            else:
+                st.warning(f"No file generated for: {result.url}")
+
 
 run_playlist = st.button("Generate Playlist DOCX")
 run_single = st.button("Generate Single Video DOCX")
 
+# Jobs run in the shared background manager, so widget interactions and reruns never
+# interrupt them; the panel below polls their progress.
 if run_playlist:
     urls: List[str] = [u.strip() for u in playlist_text.splitlines() if u.strip()]
     if not urls:
         st.warning("Please enter at least one playlist URL.")
         st.stop()
-
-    os.makedirs(output_dir, exist_ok=True)
-
-    progress = st.progress(0)
-    status_area = st.empty()
-    results = []
-    total = len(urls)
-
-    for idx, url in enumerate(urls, start=1):
-        status_area.info(f"Processing playlist {idx}/{total}: {url}")
-        try:
-            path = generate_playlist_docx(
-                url,
-                output_dir=output_dir,
-                use_llm=use_llm,
-                llm_model=model,
-                include_raw_transcript=include_raw,
-                max_workers=250,
-            )
-            results.append((url, path, None))
-        except Exception as exc:
-            results.append((url, None, str(exc)))
-        progress.progress(int(idx / total * 100))
-
-    st.subheader("Results")
-    for url, path, err in results:
-        if err:
-            st.error(f"Failed: {url} — {err}")
-        elif path and os.path.exists(path):
-            st.success(f"Saved: {path}")
-            with open(path, "rb") as fh:
-                st.download_button(
-                    label=f"Download {os.path.basename(path)}",
-                    data=fh.read(),
-                    file_name=os.path.basename(path),
-                    mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                )
-        else:
-            st.warning(f"No file generated for: {url}")
+    # All playlists share one work queue; videos that appear in several are processed once.
+    track(job_manager().submit_playlists(
+        urls,
+        output_dir,
+        use_llm=use_llm,
+        llm_model=model,
+        include_raw_transcript=include_raw,
+        llm_concurrency=int(llm_concurrency),
+        llm_cache=llm_cache,
+    ))
 
 if run_single:
     if not single_url:
         st.warning("Please enter a video URL.")
         st.stop()
-    os.makedirs(output_dir_single, exist_ok=True)
-    try:
-        path = generate_single_video_docx(
-            single_url,
-            output_dir=output_dir_single,
-            use_llm=use_llm,
-            llm_model=model,
-        )
-        st.success(f"Saved: {path}")
-        with open(path, "rb") as fh:
-            st.download_button(
-                label=f"Download {os.path.basename(path)}",
-                data=fh.read(),
-                file_name=os.path.basename(path),
-                mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            )
-    except Exception as exc:
-        st.error(f"Failed: {single_url} — {exc}")
-
-
+    track(job_manager().submit_video(
+        single_url.strip(),
+        output_dir_single,
+        use_llm=use_llm,
+        llm_model=model,
+        llm_cache=llm_cache,
+    ))
+
+jobs = [job for job in (job_manager().get(job_id) for job_id in session_jobs()) if job is not None]
+polling = any(job.active for job in jobs)
+
+
+@st.fragment(run_every=POLL_SECONDS if polling else None)
+def jobs_panel() -> None:
+    current = [job for job in (job_manager().get(job_id) for job_id in session_jobs()) if job is not None]
+    if not current:
+        return
+    st.subheader("Jobs")
+    for job in current:
+        render_job(job)
+    if use_llm and llm_cache != "off":
+        show_llm_cache_stats()
+    if polling and not any(job.active for job in current):
+        # Everything finished: rerun the page once so polling stops.
+        st.rerun()
+
+
+jobs_panel()
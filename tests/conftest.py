@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pytest
+
+# The offline stand-ins for YouTube and the OpenAI API are shared with the benchmarks.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+
+@pytest.fixture
+def stub_server():
+    """
+    Start offline_stubs.StubServer instances with the given StubConfig fields; they are
+    shut down after the test.
+    """
+    from offline_stubs import StubConfig, StubServer
+
+    servers = []
+
+    def start(**config):
+        server = StubServer(StubConfig(**config)).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
@@ -0,0 +1,42 @@
+import asyncio
+import gc
+
+from yt_notetaker import clients
+from yt_notetaker.llm_utils import _get_llm
+from yt_notetaker.pipeline import VideoPipeline
+
+
+async def _use_llm_clients():
+    async with VideoPipeline():
+        client = clients.get_llm_async_http_client()
+        _get_llm("gpt-4o-mini", "test-key")
+        return client
+
+
+def test_loop_clients_are_closed_with_the_pipeline():
+    used = [asyncio.run(_use_llm_clients()) for _ in range(3)]
+    gc.collect()
+    assert clients._loop_clients == {}
+    assert all(client.is_closed for client in used)
+    assert not [o for o in gc.get_objects() if isinstance(o, asyncio.AbstractEventLoop) and o.is_closed()]
+
+
+def test_loop_clients_are_shared_by_nested_pipelines():
+    async def run():
+        async with VideoPipeline():
+            async with VideoPipeline():
+                inner = clients.get_llm_async_http_client()
+            assert not inner.is_closed
+            assert clients.get_llm_async_http_client() is inner
+        return inner
+
+    assert asyncio.run(run()).is_closed
+
+
+def test_clients_of_a_closed_loop_are_dropped():
+    async def run():
+        return clients.get_llm_async_http_client()
+
+    asyncio.run(run())
+    asyncio.run(run())
+    assert len(clients._loop_clients) == 1
@@ -0,0 +1,35 @@
+import json
+
+import pytest
+
+from bench_startup import NOTES, SCENARIOS, run_scenario
+
+
+# Modules each entry point must not load, whatever else bench_startup.SCENARIOS forbids.
+ABSENT = {
+    "import yt_notetaker": ("langchain", "langchain_openai", "yt_dlp", "docx"),
+    "main.py --help": ("langchain", "langchain_openai", "yt_dlp", "docx"),
+    "render markdown": ("langchain", "langchain_openai", "yt_dlp", "docx"),
+    "render docx": ("langchain", "langchain_openai", "yt_dlp"),
+    "no-LLM pipeline": ("langchain", "langchain_openai"),
+}
+
+
+@pytest.fixture(scope="module")
+def notes_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp("startup") / "startup.notes.json"
+    path.write_text(json.dumps(NOTES), encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("name", sorted(ABSENT))
+def test_entry_point_stays_within_its_import_budget(name, notes_path):
+    code, forbidden = SCENARIOS[name]
+    _, _, modules = run_scenario(code, notes_path)
+    assert not set(modules) & (set(forbidden) | set(ABSENT[name]))
+
+
+def test_import_llm_utils_loads_the_llm_stack(notes_path):
+    # Guards the check itself: the scenario runner does see heavy imports.
+    _, _, modules = run_scenario(SCENARIOS["import llm_utils"][0], notes_path)
+    assert "langchain_openai" in modules
@@ -0,0 +1,98 @@
+import asyncio
+import time
+
+import openai
+import pytest
+from langchain.schema import HumanMessage
+
+from yt_notetaker import llm_utils
+from yt_notetaker.llm_utils import LLMScheduler, RateLimiter, _get_llm
+from yt_notetaker.pipeline import VideoPipeline
+
+
+MESSAGES = [HumanMessage(content="Title: Scheduler test\n\nTranscript (plaintext):\nhello")]
+
+
+def _llm(server):
+    return _get_llm("gpt-4o-mini", "test-key", f"{server.url}/v1")
+
+
+def test_429s_are_retried_until_the_request_succeeds(stub_server):
+    server = stub_server(llm_latency=0.0, llm_jitter=0.0, error_rate=0.5, error_status=429, retry_after_ms=20)
+    scheduler = LLMScheduler(RateLimiter(), base_delay=0.001, max_delay=1.0)
+    for _ in range(8):
+        response = scheduler.invoke(_llm(server), MESSAGES, model="gpt-4o-mini")
+        assert response.content
+    assert server.failed > 0
+    assert scheduler.retries == server.failed
+    assert server.requests == 8 + server.failed
+
+
+def test_retry_after_is_honoured(stub_server):
+    server = stub_server(llm_latency=0.0, llm_jitter=0.0, error_rate=1.0, error_status=429, retry_after_ms=300)
+    scheduler = LLMScheduler(RateLimiter(), max_retries=1, base_delay=0.001)
+    started = time.monotonic()
+    with pytest.raises(openai.RateLimitError):
+        scheduler.invoke(_llm(server), MESSAGES, model="gpt-4o-mini")
+    assert time.monotonic() - started >= 0.3
+    assert server.requests == 2
+
+
+def test_budgets_follow_the_rate_limit_headers(stub_server):
+    server = stub_server(llm_latency=0.0, requests_per_minute=5000, tokens_per_minute=2_000_000)
+    unset = LLMScheduler(RateLimiter())
+    unset.invoke(_llm(server), MESSAGES, model="gpt-4o-mini")
+    assert unset.limiter.requests_per_minute == 5000
+    assert unset.limiter.tokens_per_minute == 2_000_000
+
+    # Configured budgets are lowered to what the API reports, never raised.
+    higher = LLMScheduler(RateLimiter(requests_per_minute=10_000, tokens_per_minute=1_000_000))
+    higher.invoke(_llm(server), MESSAGES, model="gpt-4o-mini")
+    assert higher.limiter.requests_per_minute == 5000
+    assert higher.limiter.tokens_per_minute == 1_000_000
+
+
+def test_budgets_are_taken_from_429_responses(stub_server):
+    server = stub_server(llm_latency=0.0, error_rate=1.0, error_status=429, retry_after_ms=1, requests_per_minute=5000)
+    scheduler = LLMScheduler(RateLimiter(), max_retries=1, base_delay=0.001)
+    with pytest.raises(openai.RateLimitError):
+        scheduler.invoke(_llm(server), MESSAGES, model="gpt-4o-mini")
+    assert scheduler.limiter.requests_per_minute == 5000
+
+
+def test_async_calls_back_off_and_succeed(stub_server):
+    server = stub_server(llm_latency=0.0, llm_jitter=0.0, error_rate=0.3, error_status=429, retry_after_ms=10)
+    scheduler = LLMScheduler(RateLimiter(), base_delay=0.001, max_delay=1.0)
+
+    async def run():
+        llm = _llm(server)
+        return await asyncio.gather(*(scheduler.ainvoke(llm, MESSAGES, model="gpt-4o-mini") for _ in range(10)))
+
+    responses = asyncio.run(run())
+    assert all(response.content for response in responses)
+    assert scheduler.retries == server.failed > 0
+
+
+def test_persistent_429_fails_the_video_instead_of_losing_it(stub_server, monkeypatch):
+    from offline_stubs import FakeExtractor
+
+    server = stub_server(llm_latency=0.0, error_rate=1.0, error_status=429, retry_after_ms=1, caption_minutes=1.0)
+    monkeypatch.setattr(llm_utils, "_llm_scheduler", LLMScheduler(RateLimiter(), max_retries=2, base_delay=0.001))
+    restore = FakeExtractor(server.url, metadata_latency=0.0).install()
+    try:
+        async def run():
+            async with VideoPipeline(
+                openai_api_key="test-key",
+                llm_base_url=f"{server.url}/v1",
+                transcript_cache="off",
+                llm_cache="off",
+            ) as pipeline:
+                return await pipeline.process_video({'id': "vid-429", 'title': "Rate limited"})
+
+        result = asyncio.run(run())
+    finally:
+        restore()
+    assert result.video_id == "vid-429"
+    assert result.outline is None
+    assert "429" in result.error or "Rate limit" in result.error
+    assert server.requests == 3
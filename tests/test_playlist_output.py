@@ -0,0 +1,33 @@
+import os
+
+import pytest
+
+from yt_notetaker.notetaker import generate_playlist_docx
+from yt_notetaker.writers import JsonWriter
+
+
+def test_a_writer_error_aborts_the_playlist_output(stub_server, tmp_path, monkeypatch):
+    from offline_stubs import FakeExtractor
+
+    server = stub_server(caption_minutes=1.0)
+    written = []
+
+    def video(self, notes):
+        if written:
+            raise OSError("disk full")
+        written.append(notes)
+
+    monkeypatch.setattr(JsonWriter, "video", video)
+    restore = FakeExtractor(server.url, metadata_latency=0.0).install()
+    try:
+        with pytest.raises(OSError, match="disk full"):
+            generate_playlist_docx(
+                "bench://playlist/p?videos=3",
+                str(tmp_path),
+                use_llm=False,
+                transcript_cache="off",
+                manifest="off",
+            )
+    finally:
+        restore()
+    assert not [name for name in os.listdir(tmp_path) if name.endswith((".docx", ".notes.json"))]
@@ -0,0 +1,19 @@
+import os
+
+from yt_notetaker.notetaker import playlist_filenames, render_notes
+from yt_notetaker.schemas import NotesDocument
+from yt_notetaker.writers import notes_path_for
+
+
+def test_render_keeps_the_numbered_name_of_a_same_titled_playlist(tmp_path):
+    paths = playlist_filenames(str(tmp_path), ["Course", "Course"])
+    for index, path in enumerate(paths):
+        document = NotesDocument(title="Course", source_url=f"https://example.com/{index}")
+        with open(notes_path_for(path), "w", encoding="utf-8") as fh:
+            fh.write(document.model_dump_json())
+
+    first = render_notes(notes_path_for(paths[0]), ["markdown"])
+    second = render_notes(notes_path_for(paths[1]), ["markdown"])
+
+    assert first == [os.path.join(str(tmp_path), "Course.md")]
+    assert second == [os.path.join(str(tmp_path), "Course (2).md")]
@@ -0,0 +1,85 @@
+import logging
+import os
+
+import pytest
+
+from yt_notetaker.chunking import count_tokens
+from yt_notetaker.pipeline import VideoPipeline
+from yt_notetaker.transcript_utils import CueTable, is_rolling_captions, merge_rolling_cues, parse_captions
+
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def load(name: str) -> CueTable:
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as fh:
+        return parse_captions(fh.read())
+
+
+@pytest.fixture
+def auto_captions() -> CueTable:
+    return load("auto_captions_rolling.en.vtt")
+
+
+@pytest.fixture
+def manual_captions() -> CueTable:
+    return load("manual_repeated_phrases.en.srt")
+
+
+def test_auto_captions_are_rolling(auto_captions):
+    assert is_rolling_captions(auto_captions)
+
+
+def test_manual_captions_with_repeated_phrases_are_not_rolling(manual_captions):
+    assert len(manual_captions) == 10
+    assert not is_rolling_captions(manual_captions)
+    assert merge_rolling_cues(manual_captions) is manual_captions
+
+
+def test_merge_keeps_each_spoken_line_once(auto_captions):
+    merged = merge_rolling_cues(auto_captions)
+    # YouTube alternates a cue that adds a line with a 10 ms cue holding just that line.
+    spoken = [auto_captions.cue_text(i) for i in range(1, len(auto_captions), 2)]
+    assert [text for _, _, text in merged] == spoken
+    assert merged.plaintext() == " ".join(spoken)
+    assert merged.cue_text(0) == "hi everyone and welcome back to the channel"
+    assert merged.cue_text(1) == "today we're going to talk about attention"
+
+
+def test_merge_keeps_the_timestamps_of_the_cues_that_add_words(auto_captions):
+    merged = merge_rolling_cues(auto_captions)
+    adding = [(start, end) for i, (start, end, _) in enumerate(auto_captions) if i % 2 == 0]
+    assert [(start, end) for start, end, _ in merged] == adding
+    assert list(merged)[:2] == [
+        (0.0, 2.87, "hi everyone and welcome back to the channel"),
+        (2.88, 5.29, "today we're going to talk about attention"),
+    ]
+
+
+def test_normalize_reports_the_token_reduction(auto_captions, caplog):
+    pipeline = VideoPipeline(llm_model="gpt-4o-mini")
+    with caplog.at_level(logging.INFO, logger="yt_notetaker.pipeline"):
+        cues, raw_tokens, tokens = pipeline.normalize("fixture", auto_captions)
+    assert raw_tokens == count_tokens(auto_captions.plaintext(), "gpt-4o-mini")
+    assert tokens == count_tokens(cues.plaintext(), "gpt-4o-mini")
+    # Each line appears three times in the rolling layout and once after merging.
+    assert tokens < raw_tokens * 0.4
+    assert f"fixture: merged rolling captions, {raw_tokens} -> {tokens} transcript tokens" in caplog.text
+
+
+def test_normalize_leaves_manual_captions_alone(manual_captions):
+    cues, raw_tokens, tokens = VideoPipeline().normalize("manual", manual_captions)
+    assert cues is manual_captions
+    assert tokens == raw_tokens
+
+
+def test_empty_cue_does_not_take_the_next_identifier_as_text():
+    table = parse_captions("WEBVTT\n\n1\n00:00:01.000 --> 00:00:02.000\n\n2\n00:00:03.000 --> 00:00:04.000\nhi\n")
+    assert list(table) == [(3.0, 4.0, "hi")]
+
+
+def test_whitespace_line_after_timing_keeps_an_auto_caption_cue_open():
+    table = parse_captions(
+        "WEBVTT\n\n00:00:01.000 --> 00:00:02.000 align:start position:0%\n \nhello<00:00:01.500><c> there</c>\n"
+    )
+    assert list(table) == [(1.0, 2.0, "hello there")]
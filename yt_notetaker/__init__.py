@@ -1,10 +1,61 @@
+from typing import TYPE_CHECKING
+
 __all__ = [
     "generate_playlist_docx",
+    "generate_playlists_docx",
     "generate_single_video_docx",
+    "agenerate_playlist_docx",
+    "agenerate_playlists_docx",
+    "agenerate_single_video_docx",
+    "generate_playlists_docx_batch",
+    "agenerate_playlists_docx_batch",
+    "render_notes",
+    "PlaylistResult",
+    "VideoEvent",
 ]
 
-from .notetaker import generate_playlist_docx, generate_single_video_docx
+# Public names are resolved on first access so that importing the package (or a light
+# submodule such as writers) does not load yt-dlp, langchain or the HTTP stack.
+_EXPORTS = {
+    "generate_playlist_docx": ".notetaker",
+    "generate_playlists_docx": ".notetaker",
+    "generate_single_video_docx": ".notetaker",
+    "agenerate_playlist_docx": ".notetaker",
+    "agenerate_playlists_docx": ".notetaker",
+    "agenerate_single_video_docx": ".notetaker",
+    "generate_playlists_docx_batch": ".batch",
+    "agenerate_playlists_docx_batch": ".batch",
+    "render_notes": ".notetaker",
+    "PlaylistResult": ".notetaker",
+    "VideoEvent": ".pipeline",
+}
+
+if TYPE_CHECKING:
+    from .notetaker import (
+        generate_playlist_docx,
+        generate_playlists_docx,
+        generate_single_video_docx,
+        agenerate_playlist_docx,
+        agenerate_playlists_docx,
+        agenerate_single_video_docx,
+        render_notes,
+        PlaylistResult,
+    )
+    from .batch import generate_playlists_docx_batch, agenerate_playlists_docx_batch
+    from .pipeline import VideoEvent
 
 __version__ = "0.1.0"
 
 
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
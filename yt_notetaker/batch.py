@@ -0,0 +1,612 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain.schema import BaseMessage
+
+from .chunking import DEFAULT_CHUNK_OVERLAP_TOKENS, DEFAULT_CHUNK_TOKENS
+from .clients import get_llm_http_client
+from .llm_cache import OutlineCache, outline_cache_key
+from .llm_utils import (
+    OUTLINE_PARSE_RETRIES,
+    OutlineParseError,
+    cache_lookup,
+    cache_put,
+    merge_messages,
+    outline_messages,
+    parse_outline_content,
+    outline_response_format,
+    retry_messages,
+    plan_merge_groups,
+)
+from .metrics import incr, span
+from .notetaker import PlaylistResult, playlist_filenames
+from .pipeline import StageLimits, VideoPipeline, video_url_for
+from .schemas import NotesDocument, OutlineResponse, VideoNotes
+from .transcript_utils import check_cache_modes, get_playlist_info
+from .writers import DocxWriter, JsonWriter, notes_path_for, render_notes_document
+
+
+"""
+Batch mode for non-urgent playlist runs: instead of one synchronous chat completion per
+transcript chunk, every outline prompt of the run is written into a JSONL request file for
+the OpenAI Batch API (or for a local stand-in that reads and answers files in a directory),
+the batch is polled until it finishes, and the replies are validated into OutlineResponse
+with the same local JSON repair as live calls. Multi-chunk videos are merged level by level
+in further rounds, and the documents are written once every video has a single outline.
+Replies are stored in the outline cache under the same keys as live calls, and submitted
+batches are recorded in the batch directory, so an interrupted run resumes polling instead
+of paying for the requests again.
+"""
+
+
+logger = logging.getLogger(__name__)
+
+BATCH_BACKENDS = ("openai", "directory")
+BATCH_ENDPOINT = "/v1/chat/completions"
+# Per-file limits of the Batch API; larger rounds are split into several batches.
+MAX_BATCH_REQUESTS = 50_000
+MAX_BATCH_BYTES = 190 * 1024 * 1024
+_TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+_ROLES = {'system': "system", 'human': "user", 'ai': "assistant"}
+
+
+def _read_json(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path: str, data: Dict[str, Any]) -> None:
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(data, fh)
+    os.replace(tmp, path)
+
+
+def _parse_lines(text: str) -> List[Dict[str, Any]]:
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def _split(name: str, lines: List[Dict[str, Any]]) -> Iterator[Tuple[str, List[bytes]]]:
+    """
+    Encode request lines and group them into files within the Batch API limits, named
+    name, or name.1, name.2, ... when more than one is needed.
+    """
+    parts: List[List[bytes]] = [[]]
+    size = 0
+    for line in lines:
+        data = json.dumps(line, ensure_ascii=False).encode("utf-8") + b"\n"
+        if parts[-1] and (len(parts[-1]) >= MAX_BATCH_REQUESTS or size + len(data) > MAX_BATCH_BYTES):
+            parts.append([])
+            size = 0
+        parts[-1].append(data)
+        size += len(data)
+    if len(parts) == 1:
+        yield name, parts[0]
+        return
+    for index, part in enumerate(parts, start=1):
+        yield f"{name}.{index}", part
+
+
+def _write_requests(directory: str, name: str, data: List[bytes]) -> Tuple[str, str, bool]:
+    """
+    Write a request file; returns its path, sha256 and whether it differs from the file
+    already there.
+    """
+    path = os.path.join(directory, f"{name}.jsonl")
+    body = b"".join(data)
+    digest = hashlib.sha256(body).hexdigest()
+    try:
+        with open(path, "rb") as fh:
+            unchanged = hashlib.sha256(fh.read()).hexdigest() == digest
+    except OSError:
+        unchanged = False
+    if not unchanged:
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(body)
+        os.replace(tmp, path)
+    return path, digest, not unchanged
+
+
+class OpenAIBatchBackend:
+    """
+    Runs request files through the OpenAI Batch API (Files upload, then batches.create on
+    /v1/chat/completions). The id of each submitted batch is kept next to its request file
+    as <name>.batch.json, and the output and error files are saved beside it; a rerun with
+    an identical request file polls the recorded batch instead of submitting a new one.
+    base_url points at any server implementing the Files and Batches endpoints.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        *,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        poll_interval: float = 60.0,
+        completion_window: str = "24h",
+    ) -> None:
+        self.directory = directory
+        self.api_key = api_key
+        self.base_url = base_url
+        self.poll_interval = poll_interval
+        self.completion_window = completion_window
+
+    def run(self, name: str, lines: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        import openai
+
+        client = openai.OpenAI(api_key=self.api_key, base_url=self.base_url, http_client=get_llm_http_client())
+        os.makedirs(self.directory, exist_ok=True)
+        batches = []
+        # Everything is submitted before polling, so split rounds run side by side.
+        for part, data in _split(name, lines):
+            path, digest, _ = _write_requests(self.directory, part, data)
+            state_path = os.path.join(self.directory, f"{part}.batch.json")
+            state = _read_json(state_path)
+            batch = None
+            if state is not None and state.get('input_sha256') == digest:
+                batch = client.batches.retrieve(state['batch_id'])
+                if batch.status in ("failed", "cancelled"):
+                    batch = None
+                else:
+                    logger.info("%s: resuming batch %s (%s)", part, batch.id, batch.status)
+            if batch is None:
+                with open(path, "rb") as fh:
+                    upload = client.files.create(file=fh, purpose="batch")
+                batch = client.batches.create(
+                    input_file_id=upload.id,
+                    endpoint=BATCH_ENDPOINT,
+                    completion_window=self.completion_window,
+                )
+                _write_json(state_path, {'batch_id': batch.id, 'input_file_id': upload.id, 'input_sha256': digest})
+                incr("batch_submissions", backend="openai")
+                logger.info("%s: submitted %d requests as batch %s", part, len(data), batch.id)
+            batches.append((part, batch))
+
+        results: List[Dict[str, Any]] = []
+        for part, batch in batches:
+            batch = self._wait(client, part, batch)
+            if batch.status in ("failed", "cancelled") and not batch.output_file_id:
+                errors = getattr(batch.errors, "data", None) or []
+                detail = "; ".join(error.message or error.code or "" for error in errors) or batch.status
+                raise RuntimeError(f"batch {batch.id} for {part} {batch.status}: {detail}")
+            for suffix, file_id in (("output", batch.output_file_id), ("errors", batch.error_file_id)):
+                if not file_id:
+                    continue
+                text = client.files.content(file_id).text
+                with open(os.path.join(self.directory, f"{part}.{suffix}.jsonl"), "w", encoding="utf-8") as fh:
+                    fh.write(text)
+                results.extend(_parse_lines(text))
+        return results
+
+    def _wait(self, client, part: str, batch):
+        counts = None
+        with span("batch.wait", backend="openai", round=part, batch_id=batch.id):
+            while batch.status not in _TERMINAL_STATUSES:
+                time.sleep(self.poll_interval)
+                batch = client.batches.retrieve(batch.id)
+                progress = batch.request_counts
+                if progress is not None and (progress.completed, progress.failed) != counts:
+                    counts = (progress.completed, progress.failed)
+                    logger.info(
+                        "%s: batch %s %s, %d of %d done, %d failed",
+                        part, batch.id, batch.status, progress.completed, progress.total, progress.failed,
+                    )
+        return batch
+
+
+class DirectoryBatchBackend:
+    """
+    Hands request files to a local stand-in for the Batch API: writes <name>.jsonl into
+    directory and waits for the stand-in to put the results in <name>.output.jsonl (moved
+    into place once complete), with failed requests either there or in <name>.errors.jsonl,
+    in the Batch API's output format. A result file from an earlier, identical request file
+    is reused. timeout bounds the wait per round in seconds.
+    """
+
+    def __init__(self, directory: str, *, poll_interval: float = 5.0, timeout: Optional[float] = None) -> None:
+        self.directory = directory
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+
+    def run(self, name: str, lines: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        os.makedirs(self.directory, exist_ok=True)
+        parts = []
+        for part, data in _split(name, lines):
+            output = os.path.join(self.directory, f"{part}.output.jsonl")
+            errors = os.path.join(self.directory, f"{part}.errors.jsonl")
+            if _write_requests(self.directory, part, data)[2]:
+                for stale in (output, errors):
+                    if os.path.exists(stale):
+                        os.remove(stale)
+                incr("batch_submissions", backend="directory")
+                logger.info("%s: wrote %d requests to %s", part, len(data), self.directory)
+            parts.append((part, output, errors))
+
+        results: List[Dict[str, Any]] = []
+        started = time.monotonic()
+        with span("batch.wait", backend="directory", round=name):
+            for part, output, errors in parts:
+                while not os.path.exists(output):
+                    if self.timeout is not None and time.monotonic() - started > self.timeout:
+                        raise TimeoutError(f"no results for {part} in {self.directory} after {self.timeout:.0f}s")
+                    time.sleep(self.poll_interval)
+                for path in (output, errors):
+                    if os.path.exists(path):
+                        with open(path, "r", encoding="utf-8") as fh:
+                            results.extend(_parse_lines(fh.read()))
+        return results
+
+
+@dataclass
+class _Video:
+    video_id: str
+    title: str
+    level: int = 0
+    outlines: List[Optional[OutlineResponse]] = field(default_factory=list)
+    pending: int = 0
+    error: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.error is not None or (self.pending == 0 and len(self.outlines) == 1 and self.outlines[0] is not None)
+
+
+@dataclass
+class _Request:
+    video: _Video
+    slot: int
+    kind: str
+    messages: List[BaseMessage]
+    cache_key: str
+    cache: Optional[OutlineCache]
+    attempt: int = 1
+
+    @property
+    def custom_id(self) -> str:
+        return f"{self.video.video_id}/{self.kind}{self.video.level}/{self.slot}/{self.attempt}"
+
+    def line(self, model: str, response_format: Optional[Dict]) -> Dict[str, Any]:
+        body: Dict[str, Any] = {
+            'model': model,
+            'temperature': 0,
+            'messages': [{'role': _ROLES[m.type], 'content': m.content} for m in self.messages],
+        }
+        if response_format:
+            body['response_format'] = response_format
+        return {'custom_id': self.custom_id, 'method': "POST", 'url': BATCH_ENDPOINT, 'body': body}
+
+
+def batch_run_id(
+    playlist_urls: Sequence[str],
+    *,
+    llm_model: str,
+    chunk_tokens: int,
+    chunk_overlap_tokens: int,
+    merge_token_budget: int,
+) -> str:
+    """
+    Short id for a batch run, derived from the set of playlists and the settings that shape
+    its requests. Round files are prefixed with it, so runs sharing a batch directory are
+    easy to tell apart.
+    """
+    payload = json.dumps(
+        [sorted(set(playlist_urls)), llm_model, chunk_tokens, chunk_overlap_tokens, merge_token_budget],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:12]
+
+
+class _BatchRun:
+    # Per-run state: the videos, their outline slots and the requests of the next round.
+
+    def __init__(self, pipeline: VideoPipeline, backend, run_id: str) -> None:
+        self.pipeline = pipeline
+        self.backend = backend
+        self.run_id = run_id
+        self.model = pipeline.llm_model
+        self.requests = 0
+        self.rounds = 0
+        self._retries: List[_Request] = []
+
+    async def _request(self, video: _Video, slot: int, kind: str, title: str, text: str) -> Optional[_Request]:
+        # None when the outline cache already has the answer, which is then filled in.
+        pipeline = self.pipeline
+        key = outline_cache_key(
+            kind,
+            model=self.model,
+            title=title,
+            text=text,
+            playlist_mode=pipeline.playlist_mode,
+            response_format=outline_response_format(),
+        )
+        # The cache is SQLite, possibly shared with other processes: keep it off the event loop.
+        cache, cached = await asyncio.to_thread(cache_lookup, key, pipeline.llm_cache)
+        if cached is not None:
+            video.outlines[slot] = cached
+            return None
+        if kind == "outline":
+            messages = outline_messages(title, text, playlist_mode=pipeline.playlist_mode)
+        else:
+            messages = merge_messages(title, text)
+        video.pending += 1
+        return _Request(video, slot, kind, messages, key, cache)
+
+    async def start(self, video: _Video, prompts: List[Tuple[str, str]]) -> List[_Request]:
+        video.outlines = [None] * len(prompts)
+        requests = [
+            await self._request(video, slot, "outline", title, text) for slot, (title, text) in enumerate(prompts)
+        ]
+        return [r for r in requests if r is not None]
+
+    async def advance(self, video: _Video) -> List[_Request]:
+        """
+        Merge requests for the next level of video's tree once its current level is complete.
+        """
+        pipeline = self.pipeline
+        while not video.finished and video.pending == 0:
+            groups = plan_merge_groups(
+                video.outlines, max_tokens=pipeline.merge_token_budget, fan_in=pipeline.merge_fan_in, model=self.model
+            )
+            video.level += 1
+            video.outlines = [group[0] if len(group) == 1 else None for group in groups]
+            requests = []
+            for slot, group in enumerate(groups):
+                if len(group) > 1:
+                    outlines_json = json.dumps([o.model_dump() for o in group])
+                    request = await self._request(video, slot, "merge", video.title, outlines_json)
+                    if request is not None:
+                        requests.append(request)
+            if requests:
+                return requests
+        return []
+
+    async def run_round(self, requests: List[_Request]) -> None:
+        self.rounds += 1
+        self.requests += len(requests)
+        by_id = {request.custom_id: request for request in requests}
+        response_format = outline_response_format()
+        lines = [by_id[custom_id].line(self.model, response_format) for custom_id in sorted(by_id)]
+        # Files and batch state are named by content, not by round number: a rerun whose
+        # earlier rounds come from the outline cache still finds the batch it submitted.
+        digest = hashlib.sha256(json.dumps(lines, ensure_ascii=False).encode("utf-8")).hexdigest()
+        name = f"{self.run_id}-{digest[:16]}"
+        logger.info("batch %s round %d: %d requests as %s", self.run_id, self.rounds, len(lines), name)
+        with span("batch.round", run=self.run_id, round=self.rounds, requests=len(lines)):
+            results = await asyncio.to_thread(self.backend.run, name, lines)
+        for result in results:
+            request = by_id.pop(str(result.get('custom_id')), None)
+            if request is not None:
+                await self._ingest(request, result)
+        for request in by_id.values():
+            self._failed(request, "missing from the batch results")
+
+    async def _ingest(self, request: _Request, result: Dict[str, Any]) -> None:
+        response = result.get('response') or {}
+        body = response.get('body') or {}
+        if result.get('error') or response.get('status_code') != 200:
+            error = result.get('error') or body.get('error') or {}
+            incr("batch_requests", kind=request.kind, outcome="error")
+            self._failed(request, error.get('message') or f"HTTP {response.get('status_code')}")
+            return
+        usage = body.get('usage') or {}
+        incr("llm_prompt_tokens", int(usage.get('prompt_tokens') or 0), model=self.model)
+        incr("llm_completion_tokens", int(usage.get('completion_tokens') or 0), model=self.model)
+        try:
+            choice = body['choices'][0]
+            message = choice.get('message') or {}
+            outline = parse_outline_content(
+                message.get('content'),
+                finish_reason=choice.get('finish_reason'),
+                refusal=message.get('refusal'),
+                model=self.model,
+            )
+        except (KeyError, IndexError, TypeError) as exc:
+            incr("batch_requests", kind=request.kind, outcome="invalid")
+            self._failed(request, f"malformed batch result: {exc!r}")
+            return
+        except OutlineParseError as exc:
+            incr("batch_requests", kind=request.kind, outcome="invalid")
+            self._failed(request, str(exc), retry_messages=retry_messages(request.messages, exc))
+            return
+        incr("batch_requests", kind=request.kind, outcome="ok")
+        request.video.outlines[request.slot] = outline
+        request.video.pending -= 1
+        if request.cache is not None:
+            await asyncio.to_thread(cache_put, request.cache, request.cache_key, outline)
+
+    def _failed(self, request: _Request, error: str, *, retry_messages: Optional[List[BaseMessage]] = None) -> None:
+        video = request.video
+        if request.attempt > OUTLINE_PARSE_RETRIES or video.error is not None:
+            video.pending -= 1
+            video.error = video.error or error
+            return
+        incr("llm_parse_retries" if retry_messages else "llm_retries", model=self.model)
+        self._retries.append(replace(
+            request, messages=retry_messages or request.messages, attempt=request.attempt + 1
+        ))
+
+    async def next_requests(self, videos: Sequence[_Video]) -> List[_Request]:
+        requests, self._retries = self._retries, []
+        for video in videos:
+            requests.extend(await self.advance(video))
+        return requests
+
+
+async def agenerate_playlists_docx_batch(
+    playlist_urls: List[str],
+    output_dir: str = "playlists_docx",
+    *,
+    batch_dir: str = "batch_requests",
+    backend: str = "openai",
+    llm_model: str = "gpt-4o-mini",
+    openai_api_key: Optional[str] = None,
+    llm_base_url: Optional[str] = None,
+    transcript_cache: str = "use",
+    llm_cache: str = "use",
+    poll_interval: float = 60.0,
+    metadata_concurrency: int = 16,
+    download_concurrency: int = 32,
+    chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+    chunk_overlap_tokens: int = DEFAULT_CHUNK_OVERLAP_TOKENS,
+    merge_token_budget: int = 12000,
+) -> List[PlaylistResult]:
+    """
+    agenerate_playlists_docx through the Batch API. All playlists are enumerated and every
+    transcript fetched and chunked first; the chunk outline prompts of the whole run then go
+    out as one batch round, each further level of merges for long videos as another, and a
+    reply that cannot be used is asked for again in the next round (up to
+    OUTLINE_PARSE_RETRIES times). Only then is a DOCX and .notes.json written per playlist.
+    backend is "openai" (Batch API at llm_base_url, status checked every poll_interval
+    seconds) or "directory" (request files left in batch_dir for a local stand-in, see
+    DirectoryBatchBackend). Request and result files are kept in batch_dir, named
+    <run id>-<hash of the round's requests> after batch_run_id, so a rerun finds each round
+    it already submitted whatever its position. There is no run manifest; reruns reuse the
+    outline cache and any batch already submitted. Repeated URLs are processed once, and
+    playlists with the same title get distinct file names (see playlist_filenames).
+    """
+    if backend not in BATCH_BACKENDS:
+        raise ValueError(f"backend must be one of {', '.join(BATCH_BACKENDS)}, got {backend!r}")
+    check_cache_modes(transcript_cache=transcript_cache, llm_cache=llm_cache)
+    if backend == "openai":
+        runner = OpenAIBatchBackend(batch_dir, api_key=openai_api_key, base_url=llm_base_url, poll_interval=poll_interval)
+    else:
+        runner = DirectoryBatchBackend(batch_dir, poll_interval=poll_interval)
+    os.makedirs(output_dir, exist_ok=True)
+
+    limits = StageLimits(metadata=metadata_concurrency, download=download_concurrency)
+    async with VideoPipeline(
+        llm_model=llm_model,
+        openai_api_key=openai_api_key,
+        llm_base_url=llm_base_url,
+        playlist_mode=True,
+        transcript_cache=transcript_cache,
+        llm_cache=llm_cache,
+        limits=limits,
+        chunk_tokens=chunk_tokens,
+        chunk_overlap_tokens=chunk_overlap_tokens,
+        merge_token_budget=merge_token_budget,
+    ) as pipeline:
+        urls = list(dict.fromkeys(playlist_urls))
+        run_id = batch_run_id(
+            urls,
+            llm_model=llm_model,
+            chunk_tokens=chunk_tokens,
+            chunk_overlap_tokens=chunk_overlap_tokens,
+            merge_token_budget=merge_token_budget,
+        )
+        run = _BatchRun(pipeline, runner, run_id)
+        videos: Dict[str, _Video] = {}
+        collecting: Dict[str, asyncio.Task] = {}
+
+        async def collect(video: _Video) -> List[_Request]:
+            try:
+                info = await pipeline.video_info(video_url_for(video.video_id))
+                cues, _, _ = pipeline.normalize(video.video_id, await pipeline.transcript(info))
+            except Exception as exc:
+                video.error = str(exc)
+                return []
+            return await run.start(video, pipeline.outline_prompts(video.title, cues))
+
+        async def enumerate_playlist(url: str) -> Tuple[str, List[Dict]]:
+            info = await pipeline.run_blocking(get_playlist_info, url)
+            entries = []
+            async for entry in pipeline.iter_entries(info):
+                entries.append(entry)
+                video_id = entry.get('id')
+                if video_id and video_id not in videos:
+                    videos[video_id] = _Video(video_id, entry.get('title', 'Untitled'))
+                    collecting[video_id] = asyncio.create_task(collect(videos[video_id]))
+            return info.get('title', 'Playlist'), entries
+
+        with span("batch.collect"):
+            playlists = await asyncio.gather(*(enumerate_playlist(url) for url in urls), return_exceptions=True)
+            requests = [r for task in collecting.values() for r in await task]
+        logger.info("batch %s: %d videos from %d playlists", run_id, len(videos), len(urls))
+
+        while True:
+            requests += await run.next_requests(list(videos.values()))
+            if not requests:
+                break
+            await run.run_round(requests)
+            requests = []
+
+    filenames = playlist_filenames(
+        output_dir, [None if isinstance(playlist, BaseException) else playlist[0] for playlist in playlists]
+    )
+    results: Dict[str, PlaylistResult] = {}
+    for url, playlist, filename in zip(urls, playlists, filenames):
+        if isinstance(playlist, BaseException):
+            results[url] = PlaylistResult(url, error=str(playlist))
+            continue
+        title, entries = playlist
+        notes = []
+        for entry in entries:
+            video = videos.get(entry.get('id'))
+            if video is None:
+                notes.append(VideoNotes(video_id=entry.get('id'), title=entry.get('title', 'Untitled'), error="Missing video id"))
+            else:
+                notes.append(VideoNotes(
+                    video_id=video.video_id,
+                    title=entry.get('title', 'Untitled'),
+                    outline=None if video.error else video.outlines[0],
+                    error=video.error,
+                ))
+        document = NotesDocument(title=title, kind="playlist", source_url=url, videos=notes)
+        with span("write.docx"):
+            await asyncio.to_thread(render_notes_document, document, DocxWriter(filename))
+        with span("write.json"):
+            await asyncio.to_thread(render_notes_document, document, JsonWriter(notes_path_for(filename)))
+        results[url] = PlaylistResult(url, path=filename)
+    logger.info("batch %s: %d requests in %d rounds", run_id, run.requests, run.rounds)
+    return [results[url] for url in playlist_urls]
+
+
+def generate_playlists_docx_batch(
+    playlist_urls: List[str],
+    output_dir: str = "playlists_docx",
+    *,
+    batch_dir: str = "batch_requests",
+    backend: str = "openai",
+    llm_model: str = "gpt-4o-mini",
+    openai_api_key: Optional[str] = None,
+    llm_base_url: Optional[str] = None,
+    transcript_cache: str = "use",
+    llm_cache: str = "use",
+    poll_interval: float = 60.0,
+    metadata_concurrency: int = 16,
+    download_concurrency: int = 32,
+    chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+    chunk_overlap_tokens: int = DEFAULT_CHUNK_OVERLAP_TOKENS,
+    merge_token_budget: int = 12000,
+) -> List[PlaylistResult]:
+    """
+    Synchronous wrapper around agenerate_playlists_docx_batch.
+    """
+    return asyncio.run(agenerate_playlists_docx_batch(
+        playlist_urls,
+        output_dir,
+        batch_dir=batch_dir,
+        backend=backend,
+        llm_model=llm_model,
+        openai_api_key=openai_api_key,
+        llm_base_url=llm_base_url,
+        transcript_cache=transcript_cache,
+        llm_cache=llm_cache,
+        poll_interval=poll_interval,
+        metadata_concurrency=metadata_concurrency,
+        download_concurrency=download_concurrency,
+        chunk_tokens=chunk_tokens,
+        chunk_overlap_tokens=chunk_overlap_tokens,
+        merge_token_budget=merge_token_budget,
+    ))
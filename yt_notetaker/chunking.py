@@ -0,0 +1,134 @@
+import functools
+from dataclasses import dataclass
+from typing import List
+
+from .transcript_utils import CueTable
+
+
+"""
+Token-budgeted transcript chunking.
+Caption cues are grouped into prompt-sized chunks measured in the chosen model's tokens,
+with optional overlap between neighbouring chunks. Chunk boundaries always fall on cue
+edges and prefer cues that end a sentence.
+"""
+
+
+DEFAULT_CHUNK_TOKENS = 8000
+DEFAULT_CHUNK_OVERLAP_TOKENS = 200
+
+_SENTENCE_ENDINGS = (".", "?", "!", "…", '."', '?"', '!"')
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token estimate (about four characters per token for English text).
+    """
+    return len(text) // 4 + 1
+
+
+@functools.lru_cache(maxsize=None)
+def _encoding_for(model: str):
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        # tiktoken downloads its BPE files on first use; offline hosts fall back to estimates.
+        return None
+
+
+def count_tokens(text: str, model: str) -> int:
+    """
+    Number of tokens in text for the given model, using tiktoken when it is installed
+    and falling back to estimate_tokens otherwise.
+    """
+    encoding = _encoding_for(model)
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+@dataclass
+class TranscriptChunk:
+    index: int
+    start: float
+    end: float
+    text: str
+    tokens: int
+
+
+def chunk_cues(
+    cues: CueTable,
+    *,
+    max_tokens: int = DEFAULT_CHUNK_TOKENS,
+    overlap_tokens: int = DEFAULT_CHUNK_OVERLAP_TOKENS,
+    model: str = "gpt-4o-mini",
+) -> List[TranscriptChunk]:
+    """
+    Split cues into chunks of at most max_tokens tokens.
+    A chunk is closed at the last sentence-ending cue in its final quarter when there is one,
+    otherwise at the last cue that fits. Each following chunk repeats roughly overlap_tokens
+    worth of trailing cues from its predecessor. A single cue longer than max_tokens becomes
+    a chunk of its own.
+    """
+    if not cues:
+        return []
+    overlap_tokens = max(0, min(overlap_tokens, max_tokens // 2))
+    sizes = [count_tokens(cues.cue_text(i), model) + 1 for i in range(len(cues))]
+
+    chunks: List[TranscriptChunk] = []
+    start = 0
+    n = len(cues)
+    while start < n:
+        end = start
+        used = 0
+        while end < n and (end == start or used + sizes[end] <= max_tokens):
+            used += sizes[end]
+            end += 1
+
+        if end < n:
+            end = _snap_to_sentence(cues, sizes, start, end, max_tokens)
+
+        chunk_tokens = sum(sizes[start:end])
+        chunks.append(TranscriptChunk(
+            index=len(chunks),
+            start=cues.starts[start],
+            end=cues.ends[end - 1],
+            text=cues.text_range(start, end),
+            tokens=chunk_tokens,
+        ))
+        if end >= n:
+            break
+        start = _overlap_start(sizes, start, end, overlap_tokens)
+    return chunks
+
+
+def _snap_to_sentence(cues: CueTable, sizes: List[int], start: int, end: int, max_tokens: int) -> int:
+    # Walk back from the cut looking for a sentence end, but never give up more than a
+    # quarter of the budget for it.
+    floor_tokens = max_tokens * 3 // 4
+    used = sum(sizes[start:end])
+    i = end
+    while i - 1 > start and used >= floor_tokens:
+        if cues.cue_text(i - 1).endswith(_SENTENCE_ENDINGS):
+            return i
+        used -= sizes[i - 1]
+        i -= 1
+    return end
+
+
+def _overlap_start(sizes: List[int], start: int, end: int, overlap_tokens: int) -> int:
+    if overlap_tokens <= 0:
+        return end
+    i = end
+    carried = 0
+    while i - 1 > start and carried + sizes[i - 1] <= overlap_tokens:
+        carried += sizes[i - 1]
+        i -= 1
+    return i
+
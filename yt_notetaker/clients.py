@@ -0,0 +1,203 @@
+import asyncio
+import importlib.util
+import os
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+if TYPE_CHECKING:
+    import httpx
+    import requests
+
+
+"""
+Process-wide pooled HTTP clients.
+Caption downloads share one keep-alive requests.Session, and LLM calls share one httpx
+connection pool: a single sync client for all threads and one async client per running
+event loop (httpx async connections are bound to the loop that opened them, so a client
+cannot outlive asyncio.run). Users of a loop's async client hold it with
+retain_loop_clients / release_loop_clients, and it is closed when the last one releases it;
+clients of loops that closed without that are dropped on the next lookup.
+HTTP/2 is used when the optional h2 package is installed.
+The HTTP libraries are imported when a client is first built.
+Pool sizes come from YT_NOTETAKER_HTTP_POOL_SIZE (caption downloads, default 32) and
+YT_NOTETAKER_LLM_POOL_SIZE (LLM connections, default 100), or configure_clients.
+"""
+
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+_lock = threading.Lock()
+_settings: Dict[str, Optional[object]] = {'http_pool_size': None, 'llm_pool_size': None, 'http2': None}
+_session: Optional["requests.Session"] = None
+_llm_client: Optional["httpx.Client"] = None
+
+
+
+class _LoopClients:
+    # The async LLM client of one event loop, objects built on top of it, and its users.
+
+    def __init__(self) -> None:
+        self.client: Optional["httpx.AsyncClient"] = None
+        self.objects: Dict[Any, Any] = {}
+        self.users = 0
+
+
+_loop_clients: Dict[asyncio.AbstractEventLoop, _LoopClients] = {}
+
+
+def _setting(name: str, env: str, default: int) -> int:
+    value = _settings[name]
+    if value is None:
+        value = int(os.environ.get(env) or default)
+    return int(value)
+
+
+def http_pool_size() -> int:
+    return _setting('http_pool_size', "YT_NOTETAKER_HTTP_POOL_SIZE", 32)
+
+
+def llm_pool_size() -> int:
+    return _setting('llm_pool_size', "YT_NOTETAKER_LLM_POOL_SIZE", 100)
+
+
+def use_http2() -> bool:
+    return HTTP2_AVAILABLE if _settings['http2'] is None else bool(_settings['http2'] and HTTP2_AVAILABLE)
+
+
+def configure_clients(
+    *,
+    http_pool_size: Optional[int] = None,
+    llm_pool_size: Optional[int] = None,
+    http2: Optional[bool] = None,
+) -> None:
+    """
+    Set pool sizes and HTTP/2 use (None keeps the environment default) and drop the current
+    clients so the next call builds them with the new settings.
+    """
+    with _lock:
+        _settings.update(http_pool_size=http_pool_size, llm_pool_size=llm_pool_size, http2=http2)
+    close_clients()
+
+
+def close_clients() -> None:
+    """
+    Close the shared sync clients and forget the per-loop async ones, which are closed by
+    release_loop_clients on their own loop.
+    """
+    global _session, _llm_client
+    with _lock:
+        session, client = _session, _llm_client
+        _session = _llm_client = None
+        _loop_clients.clear()
+    if session is not None:
+        session.close()
+    if client is not None:
+        client.close()
+
+
+def get_http_session() -> "requests.Session":
+    """
+    Keep-alive requests.Session for synchronous caption downloads, safe to share across threads.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    global _session
+    with _lock:
+        if _session is None:
+            size = http_pool_size()
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def _llm_limits() -> "httpx.Limits":
+    import httpx
+
+    size = llm_pool_size()
+    return httpx.Limits(max_connections=size, max_keepalive_connections=size, keepalive_expiry=30.0)
+
+
+def get_llm_http_client() -> "httpx.Client":
+    """
+    Shared sync httpx client for OpenAI-compatible APIs (the openai SDK defaults plus pool
+    limits and HTTP/2).
+    """
+    import openai
+
+    global _llm_client
+    with _lock:
+        if _llm_client is None:
+            _llm_client = openai.DefaultHttpxClient(limits=_llm_limits(), http2=use_http2())
+        return _llm_client
+
+
+def _loop_state(loop: asyncio.AbstractEventLoop) -> _LoopClients:
+    # Caller holds _lock.
+    for stale in [other for other in _loop_clients if other.is_closed()]:
+        del _loop_clients[stale]
+    state = _loop_clients.get(loop)
+    if state is None:
+        state = _loop_clients[loop] = _LoopClients()
+    return state
+
+
+def get_llm_async_http_client() -> Optional["httpx.AsyncClient"]:
+    """
+    Async httpx client for the running event loop, created on first use in that loop.
+    Returns None outside a running loop.
+    """
+    import openai
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+    with _lock:
+        state = _loop_state(loop)
+        if state.client is None:
+            state.client = openai.DefaultAsyncHttpxClient(limits=_llm_limits(), http2=use_http2())
+        return state.client
+
+
+def loop_client_cache() -> Optional[Dict[Any, Any]]:
+    """
+    Dict for objects that wrap the running loop's async client (such as chat models); it is
+    dropped together with that client. Returns None outside a running loop.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+    with _lock:
+        return _loop_state(loop).objects
+
+
+def retain_loop_clients() -> None:
+    """
+    Mark the running loop's async clients as in use until the matching release_loop_clients.
+    """
+    loop = asyncio.get_running_loop()
+    with _lock:
+        _loop_state(loop).users += 1
+
+
+async def release_loop_clients() -> None:
+    """
+    Undo one retain_loop_clients; the last release closes the loop's async client and drops
+    everything cached for the loop.
+    """
+    loop = asyncio.get_running_loop()
+    with _lock:
+        state = _loop_clients.get(loop)
+        if state is None:
+            return
+        state.users -= 1
+        if state.users > 0:
+            return
+        del _loop_clients[loop]
+    if state.client is not None:
+        await state.client.aclose()
@@ -0,0 +1,179 @@
+import functools
+import io
+import os
+import re
+import uuid
+import zipfile
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
+
+from .schemas import OutlineResponse
+
+
+"""
+Streaming DOCX writer for large outline documents.
+Package parts are taken verbatim from a document produced by python-docx's default
+template, and paragraphs are serialized straight into word/document.xml inside the zip
+with style ids resolved once, so output matches python-docx's add_heading/add_paragraph
+markup without building an lxml tree for the whole document.
+"""
+
+
+_STYLE_NAMES = ("Heading 1", "Heading 2", "Heading 3", "Heading 4", "List Bullet")
+_DOCUMENT_PART = "word/document.xml"
+_FLUSH_CHARS = 64 * 1024
+
+_XML_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+# Characters lxml refuses in text nodes; python-docx raises on them, here they are dropped.
+_INVALID_XML_RE = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+_RUN_SPLIT_RE = re.compile(r"(\t|\r|\n)")
+
+
+@functools.lru_cache(maxsize=1)
+def _template() -> Tuple[List[Tuple[zipfile.ZipInfo, bytes]], bytes, bytes, Dict[str, str]]:
+    """
+    Package parts of an empty python-docx document, the document.xml bytes before and
+    after the body content, and style ids keyed by style name.
+    """
+    from docx import Document
+
+    document = Document()
+    style_ids = {name: document.styles[name].style_id for name in _STYLE_NAMES}
+    buffer = io.BytesIO()
+    document.save(buffer)
+    parts: List[Tuple[zipfile.ZipInfo, bytes]] = []
+    head = tail = b""
+    with zipfile.ZipFile(buffer) as archive:
+        for info in archive.infolist():
+            data = archive.read(info)
+            if info.filename == _DOCUMENT_PART:
+                # New paragraphs go before the body's trailing section properties.
+                cut = data.rindex(b"<w:sectPr")
+                head, tail = data[:cut], data[cut:]
+            else:
+                parts.append((info, data))
+    return (parts, head, tail, style_ids)
+
+
+def _run_xml(text: str) -> str:
+    # Mirrors python-docx's run text handling: tabs become <w:tab/>, CR and LF become
+    # <w:br/>, and text with surrounding whitespace keeps xml:space="preserve".
+    out = []
+    for piece in _RUN_SPLIT_RE.split(_INVALID_XML_RE.sub("", text)):
+        if not piece:
+            continue
+        if piece == "\t":
+            out.append("<w:tab/>")
+        elif piece in ("\r", "\n"):
+            out.append("<w:br/>")
+        elif len(piece.strip()) < len(piece):
+            out.append(f'<w:t xml:space="preserve">{piece.translate(_XML_ESCAPES)}</w:t>')
+        else:
+            out.append(f"<w:t>{piece.translate(_XML_ESCAPES)}</w:t>")
+    return "<w:r>" + "".join(out) + "</w:r>" if out else ""
+
+
+class DocxStreamWriter:
+    """
+    Write a .docx paragraph by paragraph.
+    The body is streamed into the zip as it is produced and flushed in large blocks, so
+    memory stays flat however many sections are written. When given a path, the file is
+    written under a temporary name and moved into place on close; an exception inside a
+    with block discards it.
+    """
+
+    def __init__(self, target: Union[str, BinaryIO]) -> None:
+        parts, head, self._tail, self._style_ids = _template()
+        self._path: Optional[str] = None
+        self._tmp_path: Optional[str] = None
+        if isinstance(target, str):
+            self._path = target
+            # Unique per writer: several writers in one process may target the same path.
+            self._tmp_path = f"{target}.{uuid.uuid4().hex}.tmp"
+            target = self._tmp_path
+        self._zip = zipfile.ZipFile(target, "w", zipfile.ZIP_DEFLATED)
+        for info, data in parts:
+            self._zip.writestr(info.filename, data)
+        self._body = self._zip.open(_DOCUMENT_PART, "w", force_zip64=True)
+        self._body.write(head)
+        self._pending: List[str] = []
+        self._pending_chars = 0
+        self._closed = False
+
+    def __enter__(self) -> "DocxStreamWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def _emit(self, xml: str) -> None:
+        self._pending.append(xml)
+        self._pending_chars += len(xml)
+        if self._pending_chars >= _FLUSH_CHARS:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._pending:
+            self._body.write("".join(self._pending).encode("utf-8"))
+            self._pending.clear()
+            self._pending_chars = 0
+
+    def paragraph(self, text: str = "", style: Optional[str] = None) -> None:
+        """
+        Equivalent of Document.add_paragraph(text, style) for a style name.
+        """
+        props = f'<w:pPr><w:pStyle w:val="{self._style_ids[style]}"/></w:pPr>' if style else ""
+        content = props + (_run_xml(text) if text else "")
+        self._emit(f"<w:p>{content}</w:p>" if content else "<w:p/>")
+
+    def heading(self, text: str, level: int) -> None:
+        """
+        Equivalent of Document.add_heading(text, level) for levels 1-4.
+        """
+        self.paragraph(text, f"Heading {level}")
+
+    def outline(self, outline: OutlineResponse) -> None:
+        """
+        Same layout as write_outline_to_docx: Heading 3 sections, Heading 4 subsections
+        and List Bullet paragraphs.
+        """
+        for section in outline.sections:
+            self.heading(section.title, 3)
+            for sub in section.subsections:
+                self.heading(sub.title, 4)
+                for bullet in sub.bullets:
+                    self.paragraph(bullet, "List Bullet")
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._flush()
+        self._body.write(self._tail)
+        self._body.close()
+        self._zip.close()
+        if self._path is not None:
+            os.replace(self._tmp_path, self._path)
+
+    def abort(self) -> None:
+        """
+        Stop writing and remove the temporary file, leaving any existing output untouched.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._body.close()
+            self._zip.close()
+        finally:
+            if self._tmp_path is not None:
+                try:
+                    os.unlink(self._tmp_path)
+                except OSError:
+                    pass
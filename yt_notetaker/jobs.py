@@ -0,0 +1,268 @@
+import asyncio
+import concurrent.futures
+import copy
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from .metrics import incr
+
+if TYPE_CHECKING:
+    from .notetaker import PlaylistResult
+    from .pipeline import VideoEvent
+
+
+"""
+Background jobs for front ends that must not block on a run (the Streamlit app).
+A JobManager owns one event loop thread and one bounded yt-dlp thread pool shared by every
+job it runs, and admits at most max_jobs runs at a time; later submissions wait in the
+queue. Callers get a job id back immediately and poll get() for the status, the per-video
+progress rows fed by VideoEvents, and the results. Submitting the same work again while it
+is queued or running, or after it finished with its files still on disk, returns the
+existing job instead of starting a new run.
+Defaults come from YT_NOTETAKER_MAX_JOBS (concurrent runs, default 2) and
+YT_NOTETAKER_JOB_METADATA_THREADS (shared yt-dlp threads, default 16).
+"""
+
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUSES = ("queued", "running", "done", "failed", "cancelled")
+_ACTIVE = ("queued", "running")
+# Set by the manager itself for every run.
+_RESERVED_OPTIONS = ("on_event", "metadata_executor")
+
+
+@dataclass
+class Job:
+    """
+    One submitted run. rows maps a video id to its latest status row; seen and done count the
+    videos that started and finished (outlined or failed).
+    """
+
+    id: str
+    kind: str
+    key: str
+    urls: List[str]
+    output_dir: str
+    options: Dict[str, Any]
+    status: str = "queued"
+    created: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    rows: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    seen: int = 0
+    done: int = 0
+    results: List["PlaylistResult"] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def active(self) -> bool:
+        return self.status in _ACTIVE
+
+    @property
+    def progress(self) -> float:
+        return self.done / self.seen if self.seen else 0.0
+
+    @property
+    def paths(self) -> List[str]:
+        return [r.path for r in self.results if r.path]
+
+    def reusable(self) -> bool:
+        """
+        True for a successful run whose files are all still on disk.
+        """
+        return (
+            self.status == "done"
+            and all(r.error is None for r in self.results)
+            and bool(self.paths)
+            and all(os.path.exists(path) for path in self.paths)
+        )
+
+
+def job_key(kind: str, urls: List[str], output_dir: str, options: Dict[str, Any]) -> str:
+    """
+    Stable hash of a job's inputs, used to find identical submissions.
+    """
+    payload = json.dumps(
+        {'kind': kind, 'urls': urls, 'output_dir': os.path.abspath(output_dir), 'options': options},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.environ.get(name) or default)
+
+
+class JobManager:
+    """
+    Runs generate jobs on a background event loop with a bounded, shared worker pool.
+    All methods are thread-safe; get() and list() return copies that later progress does
+    not modify.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_jobs: Optional[int] = None,
+        metadata_threads: Optional[int] = None,
+        keep_finished: int = 100,
+    ) -> None:
+        self.max_jobs = max_jobs or _env_int("YT_NOTETAKER_MAX_JOBS", 2)
+        self.metadata_threads = metadata_threads or _env_int("YT_NOTETAKER_JOB_METADATA_THREADS", 16)
+        self.keep_finished = keep_finished
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Job] = {}
+        self._by_key: Dict[str, str] = {}
+        self._futures: Dict[str, concurrent.futures.Future] = {}
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.metadata_threads, thread_name_prefix="yt-job-metadata"
+        )
+        self._loop = asyncio.new_event_loop()
+        self._slots = asyncio.Semaphore(self.max_jobs)
+        self._thread = threading.Thread(target=self._loop.run_forever, name="yt-jobs", daemon=True)
+        self._thread.start()
+
+    def submit_playlists(self, urls: List[str], output_dir: str = "playlists_docx", **options: Any) -> Job:
+        """
+        Queue agenerate_playlists_docx(urls, output_dir, **options) and return the job.
+        """
+        return self._submit("playlists", list(urls), output_dir, options)
+
+    def submit_video(self, url: str, output_dir: str = "playlists_docx", **options: Any) -> Job:
+        """
+        Queue agenerate_single_video_docx(url, output_dir, **options) and return the job.
+        """
+        return self._submit("video", [url], output_dir, options)
+
+    def _submit(self, kind: str, urls: List[str], output_dir: str, options: Dict[str, Any]) -> Job:
+        reserved = [name for name in _RESERVED_OPTIONS if name in options]
+        if reserved:
+            raise ValueError(f"{', '.join(reserved)} cannot be passed to a job")
+        if not urls:
+            raise ValueError("a job needs at least one URL")
+        key = job_key(kind, urls, output_dir, options)
+        with self._lock:
+            existing = self._jobs.get(self._by_key.get(key, ""))
+            if existing is not None and (existing.active or existing.reusable()):
+                incr("jobs_reused", status=existing.status)
+                return copy.deepcopy(existing)
+            job = Job(id=uuid.uuid4().hex[:12], kind=kind, key=key, urls=urls, output_dir=output_dir, options=options)
+            self._jobs[job.id] = job
+            self._by_key[key] = job.id
+            self._prune()
+            snapshot = copy.deepcopy(job)
+        future = asyncio.run_coroutine_threadsafe(self._run(job), self._loop)
+        future.add_done_callback(lambda f: self._cancelled(job) if f.cancelled() else None)
+        with self._lock:
+            self._futures[job.id] = future
+        incr("jobs_submitted", kind=kind)
+        return snapshot
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return copy.deepcopy(job) if job is not None else None
+
+    def list(self) -> List[Job]:
+        """
+        All retained jobs, newest first.
+        """
+        with self._lock:
+            jobs = sorted(self._jobs.values(), key=lambda j: j.created, reverse=True)
+            return copy.deepcopy(jobs)
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a queued or running job. Files already written are kept.
+        """
+        with self._lock:
+            future = self._futures.get(job_id)
+        return future.cancel() if future is not None else False
+
+    def shutdown(self) -> None:
+        with self._lock:
+            futures = list(self._futures.values())
+        for future in futures:
+            future.cancel()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _prune(self) -> None:
+        finished = sorted((j for j in self._jobs.values() if not j.active), key=lambda j: j.created)
+        for job in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[job.id]
+            self._futures.pop(job.id, None)
+            if self._by_key.get(job.key) == job.id:
+                del self._by_key[job.key]
+
+    def _on_event(self, job: Job, event: "VideoEvent") -> None:
+        with self._lock:
+            key = event.video_id or f"#{job.seen}"
+            if event.kind == "started":
+                job.seen += 1
+                job.rows[key] = {'video': event.title, 'id': event.video_id, 'status': "started", 'seconds': 0.0}
+                return
+            row = job.rows.setdefault(key, {'video': event.title, 'id': event.video_id})
+            if event.kind == "transcript_fetched":
+                row['status'] = "transcript fetched"
+            else:
+                job.done += 1
+                if event.kind == "failed":
+                    row['status'] = f"failed: {event.error}"
+                else:
+                    row['status'] = "reused" if event.reused else "outlined"
+            row['seconds'] = round(event.elapsed, 1)
+
+    def _cancelled(self, job: Job) -> None:
+        # A job cancelled before its coroutine started never reaches _run's finally block.
+        with self._lock:
+            if job.active:
+                job.status, job.finished = "cancelled", time.time()
+
+    def _set(self, job: Job, **changes: Any) -> None:
+        with self._lock:
+            for name, value in changes.items():
+                setattr(job, name, value)
+
+    async def _run(self, job: Job) -> None:
+        status, error, results = "failed", None, []
+        try:
+            async with self._slots:
+                self._set(job, status="running", started=time.time())
+                results = await self._generate(job)
+            status = "done"
+        except asyncio.CancelledError:
+            status = "cancelled"
+            raise
+        except Exception as exc:
+            logger.exception("job %s failed", job.id)
+            error = str(exc)
+        finally:
+            self._set(job, status=status, error=error, results=results, finished=time.time())
+            incr("jobs", kind=job.kind, outcome=status)
+
+    async def _generate(self, job: Job) -> List["PlaylistResult"]:
+        from .notetaker import PlaylistResult, agenerate_playlists_docx, agenerate_single_video_docx
+
+        if job.kind == "playlists":
+            return await agenerate_playlists_docx(
+                job.urls,
+                job.output_dir,
+                on_event=lambda event: self._on_event(job, event),
+                metadata_executor=self._executor,
+                **job.options,
+            )
+        path = await agenerate_single_video_docx(
+            job.urls[0], job.output_dir, metadata_executor=self._executor, **job.options
+        )
+        return [PlaylistResult(job.urls[0], path=path)]
@@ -0,0 +1,100 @@
+import json
+import re
+from typing import Any, List, Tuple
+
+
+"""
+Local repair of almost-valid JSON replies from chat models.
+repair_json strips code fences and surrounding prose, drops trailing commas and mismatched
+closers, and completes output that was cut off mid-way (open strings, a dangling key,
+unclosed objects and arrays), so a truncated outline keeps everything before the cut
+instead of costing another request.
+"""
+
+
+_FENCE_RE = re.compile(r"^```[a-zA-Z0-9_-]*\s*|\s*```\s*$")
+_DANGLING_KEY_RE = re.compile(r'([{,])\s*"(?:[^"\\]|\\.)*"\s*:?\s*$')
+
+
+def strip_code_fences(text: str) -> str:
+    text = text.strip()
+    if text.startswith("```"):
+        text = _FENCE_RE.sub("", text).strip()
+    return text
+
+
+def _drop_trailing_comma(out: List[str]) -> None:
+    while out and out[-1].isspace():
+        out.pop()
+    if out and out[-1] == ",":
+        out.pop()
+
+
+def repair_json(text: str) -> str:
+    """
+    Best-effort fix of a JSON document; the result may still be invalid.
+    """
+    text = strip_code_fences(text)
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if not starts:
+        return text
+    text = text[min(starts):]
+
+    out: List[str] = []
+    closers: List[str] = []
+    in_string = False
+    escape = False
+    for ch in text:
+        if in_string:
+            out.append(ch)
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+            out.append(ch)
+        elif ch in "{[":
+            closers.append("}" if ch == "{" else "]")
+            out.append(ch)
+        elif ch in "}]":
+            if closers and closers[-1] == ch:
+                _drop_trailing_comma(out)
+                closers.pop()
+                out.append(ch)
+                if not closers:
+                    # Anything after the top-level value is prose.
+                    break
+        else:
+            out.append(ch)
+
+    if in_string:
+        if escape:
+            out.pop()
+        out.append('"')
+    repaired = "".join(out).rstrip()
+    if closers:
+        if closers[-1] == "}":
+            # A key without its value: drop it, keeping the preceding "{" or ",".
+            match = _DANGLING_KEY_RE.search(repaired)
+            if match:
+                repaired = repaired[:match.start() + 1]
+        out = list(repaired)
+        _drop_trailing_comma(out)
+        repaired = "".join(out) + "".join(reversed(closers))
+    return repaired
+
+
+def loads_lenient(text: str) -> Tuple[Any, bool]:
+    """
+    Parse JSON, falling back to repair_json. Returns (value, repaired); raises ValueError
+    when the text cannot be parsed even after repair.
+    """
+    try:
+        return (json.loads(strip_code_fences(text), strict=False), False)
+    except ValueError:
+        pass
+    return (json.loads(repair_json(text), strict=False), True)
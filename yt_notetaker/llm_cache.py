@@ -0,0 +1,183 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from .prompts import (
+    PLAYLIST_NOTE_TAKER_SYSTEM,
+    SINGLE_VIDEO_NOTE_TAKER_SYSTEM,
+    MERGE_OUTLINES_SYSTEM,
+    JSON_SCHEMA_INSTRUCTIONS,
+)
+from .schemas import OutlineResponse
+from .transcript_utils import DEFAULT_CACHE_DIR
+
+
+"""
+Local memoization of LLM outline and merge results.
+Validated OutlineResponse JSON is stored in SQLite under a hash of everything that
+influences the model output, with TTL expiry and least-recently-used size eviction.
+"""
+
+
+def outline_cache_key(
+    kind: str,
+    *,
+    model: str,
+    title: str,
+    text: str,
+    playlist_mode: bool,
+    response_format: Optional[Dict],
+) -> str:
+    """
+    Cache key for an outline ("outline") or merge ("merge") call.
+    Covers the model, every prompt constant, the schema instructions, the response_format
+    sent with the request (schema and strict mode) and the full input.
+    """
+    payload = json.dumps(
+        [
+            kind,
+            model,
+            playlist_mode,
+            response_format,
+            PLAYLIST_NOTE_TAKER_SYSTEM,
+            SINGLE_VIDEO_NOTE_TAKER_SYSTEM,
+            MERGE_OUTLINES_SYSTEM,
+            JSON_SCHEMA_INSTRUCTIONS,
+            title,
+            text,
+        ],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def prompt_version() -> str:
+    """
+    Short fingerprint of the prompt constants and schema instructions.
+    Changes whenever a prompt edit could change model output.
+    """
+    payload = json.dumps(
+        [
+            PLAYLIST_NOTE_TAKER_SYSTEM,
+            SINGLE_VIDEO_NOTE_TAKER_SYSTEM,
+            MERGE_OUTLINES_SYSTEM,
+            JSON_SCHEMA_INSTRUCTIONS,
+        ],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class OutlineCache:
+    """
+    SQLite store of OutlineResponse JSON.
+    Entries older than ttl_seconds are treated as misses and removed; when the stored
+    values exceed max_bytes the least recently used ones are evicted. A single connection
+    is shared behind a lock, so the cache can be used from any number of worker threads.
+    """
+
+    def __init__(self, path: str, *, max_bytes: int = 256 * 1024 * 1024, ttl_seconds: float = 30 * 24 * 3600) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS outlines ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL,"
+                " created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS outlines_accessed ON outlines(accessed)")
+            self._conn.execute("DELETE FROM outlines WHERE created < ?", (time.time() - self.ttl_seconds,))
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[OutlineResponse]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created FROM outlines WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[1] < now - self.ttl_seconds:
+                self._conn.execute("DELETE FROM outlines WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE outlines SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        try:
+            return OutlineResponse.model_validate_json(row[0])
+        except ValueError:
+            return None
+
+    def put(self, key: str, outline: OutlineResponse) -> None:
+        value = outline.model_dump_json()
+        size = len(value.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO outlines (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM outlines").fetchone()[0]
+            if total > self.max_bytes:
+                excess = total - self.max_bytes
+                freed = 0
+                doomed = []
+                for old_key, old_size in self._conn.execute("SELECT key, size FROM outlines ORDER BY accessed ASC"):
+                    if freed >= excess:
+                        break
+                    doomed.append((old_key,))
+                    freed += old_size
+                self._conn.executemany("DELETE FROM outlines WHERE key = ?", doomed)
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM outlines")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM outlines").fetchone()
+            return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": total}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_outline_cache: Optional[OutlineCache] = None
+_outline_cache_lock = threading.Lock()
+
+
+def get_outline_cache() -> OutlineCache:
+    """
+    Process-wide outline cache.
+    Stored in YT_NOTETAKER_CACHE_DIR (default ~/.cache/yt-notetaker) as llm_outlines.sqlite3,
+    bounded by YT_NOTETAKER_LLM_CACHE_MB (default 256) and YT_NOTETAKER_LLM_CACHE_TTL_DAYS (default 30).
+    """
+    global _outline_cache
+    with _outline_cache_lock:
+        if _outline_cache is None:
+            base_dir = os.environ.get("YT_NOTETAKER_CACHE_DIR") or DEFAULT_CACHE_DIR
+            max_mb = int(os.environ.get("YT_NOTETAKER_LLM_CACHE_MB") or 256)
+            ttl_days = float(os.environ.get("YT_NOTETAKER_LLM_CACHE_TTL_DAYS") or 30)
+            _outline_cache = OutlineCache(
+                os.path.join(base_dir, "llm_outlines.sqlite3"),
+                max_bytes=max_mb * 1024 * 1024,
+                ttl_seconds=ttl_days * 24 * 3600,
+            )
+        return _outline_cache
+
@@ -1,58 +1,699 @@
-from typing import List, Optional
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from typing import Dict, List, Mapping, Optional, Tuple
+
+import openai
 
 from langchain_openai import ChatOpenAI
-from langchain.schema import HumanMessage, SystemMessage
+from langchain.schema import AIMessage, BaseMessage, HumanMessage, SystemMessage
 
+from .chunking import count_tokens, estimate_tokens
+from .clients import get_llm_async_http_client, get_llm_http_client, loop_client_cache
+from .llm_cache import OutlineCache, get_outline_cache, outline_cache_key
+from .metrics import incr, span
 from .prompts import (
     PLAYLIST_NOTE_TAKER_SYSTEM,
     SINGLE_VIDEO_NOTE_TAKER_SYSTEM,
+    MERGE_OUTLINES_SYSTEM,
     JSON_SCHEMA_INSTRUCTIONS,
 )
-from .schemas import OutlineResponse
+from .json_repair import loads_lenient
+from .schemas import OutlineResponse, strict_json_schema
+from .transcript_utils import CACHE_MODES
+
+
+logger = logging.getLogger(__name__)
+
+
+# Tokens taken by the merge system prompt, title line and schema instructions.
+MERGE_PROMPT_OVERHEAD_TOKENS = estimate_tokens(MERGE_OUTLINES_SYSTEM + JSON_SCHEMA_INSTRUCTIONS) + 32
+
+
+def plan_merge_groups(
+    outlines: List[OutlineResponse],
+    *,
+    max_tokens: int,
+    fan_in: int = 4,
+    model: str = "gpt-4o-mini",
+) -> List[List[OutlineResponse]]:
+    """
+    Split outlines into runs of adjacent outlines for one level of a merge tree.
+    Each group holds at most fan_in outlines and, where possible, fits a merge prompt within
+    max_tokens. A group of one is passed through unmerged to the next level. If no two
+    neighbours fit together the outlines are paired anyway so the tree still converges.
+    """
+    fan_in = max(2, fan_in)
+    sizes = [count_tokens(o.model_dump_json(), model) for o in outlines]
+    groups: List[List[OutlineResponse]] = []
+    current: List[OutlineResponse] = []
+    current_tokens = MERGE_PROMPT_OVERHEAD_TOKENS
+    for outline, size in zip(outlines, sizes):
+        if current and (len(current) >= fan_in or current_tokens + size > max_tokens):
+            groups.append(current)
+            current, current_tokens = [], MERGE_PROMPT_OVERHEAD_TOKENS
+        current.append(outline)
+        current_tokens += size
+    if current:
+        groups.append(current)
+
+    if len(groups) == len(outlines) and len(outlines) > 1:
+        groups = [outlines[i:i + 2] for i in range(0, len(outlines), 2)]
+    return groups
+
+
+# Rate-limit headers returned by the OpenAI API.
+_RATE_LIMIT_HEADERS = {
+    "requests": ("x-ratelimit-limit-requests", "x-ratelimit-remaining-requests"),
+    "tokens": ("x-ratelimit-limit-tokens", "x-ratelimit-remaining-tokens"),
+}
+_DURATION_PART_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+def _parse_duration(value: str) -> Optional[float]:
+    """
+    Parse rate-limit durations such as "1s", "6m0s", "20ms" or a plain number of seconds.
+    """
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART_RE.findall(value)
+    if not parts:
+        return None
+    scale = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+    return sum(float(number) * scale[unit] for number, unit in parts)
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter for requests per minute and tokens per minute.
+    Buckets refill continuously; a limit of None means unlimited until the API reports one
+    through its rate-limit headers. Safe to share between threads and event loops.
+    """
+
+    def __init__(self, requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None) -> None:
+        self._lock = threading.Lock()
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = float(requests_per_minute or 0)
+        self._tokens = float(tokens_per_minute or 0)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._updated = now
+        if self.requests_per_minute:
+            self._requests = min(self.requests_per_minute, self._requests + elapsed * self.requests_per_minute / 60.0)
+        if self.tokens_per_minute:
+            self._tokens = min(self.tokens_per_minute, self._tokens + elapsed * self.tokens_per_minute / 60.0)
+
+    def try_acquire(self, tokens: int) -> float:
+        """
+        Take one request and `tokens` tokens if available. Returns 0 on success, otherwise
+        the number of seconds to wait before trying again.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now < self._paused_until:
+                return self._paused_until - now
+            wait = 0.0
+            if self.requests_per_minute and self._requests < 1:
+                wait = max(wait, (1 - self._requests) * 60.0 / self.requests_per_minute)
+            if self.tokens_per_minute:
+                # A request larger than the whole budget waits for a full bucket.
+                tokens = min(tokens, self.tokens_per_minute)
+                if self._tokens < tokens:
+                    wait = max(wait, (tokens - self._tokens) * 60.0 / self.tokens_per_minute)
+            if wait > 0:
+                return wait
+            if self.requests_per_minute:
+                self._requests -= 1
+            if self.tokens_per_minute:
+                self._tokens -= tokens
+            return 0.0
+
+    async def acquire(self, tokens: int) -> None:
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def acquire_blocking(self, tokens: int) -> None:
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def adjust_tokens(self, delta: int) -> None:
+        """
+        Correct the token bucket once the real usage of a request is known
+        (positive delta returns over-estimated tokens, negative charges more).
+        """
+        if not self.tokens_per_minute:
+            return
+        with self._lock:
+            self._tokens = min(self.tokens_per_minute, self._tokens + delta)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Hold back every caller for `seconds`, e.g. after a 429 response.
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """
+        Adopt the limits and remaining budget reported in x-ratelimit-* response headers.
+        Configured limits are only ever lowered, never raised.
+        """
+        if not headers:
+            headers = {}
+        lowered = {str(k).lower(): v for k, v in headers.items()}
+        with self._lock:
+            self._refill(time.monotonic())
+            for kind, (limit_header, remaining_header) in _RATE_LIMIT_HEADERS.items():
+                try:
+                    limit = float(lowered[limit_header]) if limit_header in lowered else None
+                    remaining = float(lowered[remaining_header]) if remaining_header in lowered else None
+                except (TypeError, ValueError):
+                    continue
+                if kind == "requests":
+                    if limit and (not self.requests_per_minute or limit < self.requests_per_minute):
+                        self._requests = min(self._requests, limit) if self.requests_per_minute else limit
+                        self.requests_per_minute = limit
+                    if remaining is not None and self.requests_per_minute:
+                        self._requests = min(self._requests, remaining)
+                else:
+                    if limit and (not self.tokens_per_minute or limit < self.tokens_per_minute):
+                        self._tokens = min(self._tokens, limit) if self.tokens_per_minute else limit
+                        self.tokens_per_minute = limit
+                    if remaining is not None and self.tokens_per_minute:
+                        self._tokens = min(self._tokens, remaining)
+
+
+class LLMScheduler:
+    """
+    Shared dispatcher for chat model calls.
+    Every call first takes its estimated tokens (prompt plus expected completion) from the
+    RateLimiter, then runs with retries: 429s, 5xx responses, timeouts and connection errors
+    are retried with full-jitter exponential backoff, honouring Retry-After, and a 429 pauses
+    all callers. Rate-limit headers and reported token usage keep the limiter in step with
+    the API. Extra keyword arguments (e.g. extra_body) are passed to the model call.
+    """
+
+    def __init__(
+        self,
+        limiter: Optional[RateLimiter] = None,
+        *,
+        max_retries: int = 6,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        expected_completion_tokens: int = 1024,
+    ) -> None:
+        self.limiter = limiter or RateLimiter()
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.expected_completion_tokens = expected_completion_tokens
+        self.retries = 0
+
+    def estimate(self, messages: List[BaseMessage], model: str) -> int:
+        prompt = "\n".join(str(m.content) for m in messages)
+        return count_tokens(prompt, model) + 4 * len(messages) + self.expected_completion_tokens
+
+    def _retry_delay(self, exc: BaseException, attempt: int) -> Optional[float]:
+        status = getattr(exc, "status_code", None)
+        retryable = status in _RETRYABLE_STATUS or isinstance(exc, (openai.APIConnectionError, openai.APITimeoutError))
+        if not retryable or attempt >= self.max_retries:
+            return None
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        response = getattr(exc, "response", None)
+        headers = getattr(response, "headers", None) or {}
+        retry_after = None
+        if headers.get("retry-after-ms"):
+            retry_after = _parse_duration(headers["retry-after-ms"] + "ms")
+        elif headers.get("retry-after"):
+            retry_after = _parse_duration(headers["retry-after"])
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        if headers:
+            self.limiter.update_from_headers(headers)
+        if status == 429:
+            self.limiter.pause(delay)
+        return delay
+
+    def _settle(self, response, estimated: int, model: str) -> None:
+        metadata = getattr(response, "response_metadata", None) or {}
+        self.limiter.update_from_headers(metadata.get("headers") or {})
+        usage = getattr(response, "usage_metadata", None) or {}
+        if not isinstance(usage, dict):
+            usage = {}
+        incr("llm_requests", model=model, outcome="ok")
+        incr("llm_prompt_tokens", int(usage.get("input_tokens") or 0), model=model)
+        incr("llm_completion_tokens", int(usage.get("output_tokens") or 0), model=model)
+        total = usage.get("total_tokens")
+        if total:
+            self.limiter.adjust_tokens(estimated - int(total))
+
+    def _failed(self, exc: BaseException, attempt: int, model: str) -> Optional[float]:
+        delay = self._retry_delay(exc, attempt)
+        status = getattr(exc, "status_code", None)
+        incr("llm_requests", model=model, outcome="retry" if delay is not None else "error")
+        if delay is not None:
+            self.retries += 1
+            incr("llm_retries", model=model, status=str(status or type(exc).__name__))
+        return delay
+
+    async def ainvoke(self, llm: ChatOpenAI, messages: List[BaseMessage], *, model: str, **kwargs):
+        estimated = self.estimate(messages, model)
+        attempt = 0
+        while True:
+            with span("llm.rate_limit_wait"):
+                await self.limiter.acquire(estimated)
+            try:
+                with span("llm.request", model=model, attempt=attempt):
+                    response = await llm.ainvoke(messages, **kwargs)
+            except Exception as exc:
+                delay = self._failed(exc, attempt, model)
+                if delay is None:
+                    raise
+                attempt += 1
+                with span("llm.backoff"):
+                    await asyncio.sleep(delay)
+                continue
+            self._settle(response, estimated, model)
+            return response
+
+    def invoke(self, llm: ChatOpenAI, messages: List[BaseMessage], *, model: str, **kwargs):
+        estimated = self.estimate(messages, model)
+        attempt = 0
+        while True:
+            with span("llm.rate_limit_wait"):
+                self.limiter.acquire_blocking(estimated)
+            try:
+                with span("llm.request", model=model, attempt=attempt):
+                    response = llm.invoke(messages, **kwargs)
+            except Exception as exc:
+                delay = self._failed(exc, attempt, model)
+                if delay is None:
+                    raise
+                attempt += 1
+                with span("llm.backoff"):
+                    time.sleep(delay)
+                continue
+            self._settle(response, estimated, model)
+            return response
+
+
+_llm_scheduler: Optional[LLMScheduler] = None
+_llm_scheduler_lock = threading.Lock()
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """
+    Process-wide scheduler shared by every outline and merge call.
+    Initial budgets come from YT_NOTETAKER_LLM_RPM and YT_NOTETAKER_LLM_TPM (unset means
+    "learn from the API's rate-limit headers").
+    """
+    global _llm_scheduler
+    with _llm_scheduler_lock:
+        if _llm_scheduler is None:
+            rpm = os.environ.get("YT_NOTETAKER_LLM_RPM")
+            tpm = os.environ.get("YT_NOTETAKER_LLM_TPM")
+            _llm_scheduler = LLMScheduler(RateLimiter(
+                requests_per_minute=float(rpm) if rpm else None,
+                tokens_per_minute=float(tpm) if tpm else None,
+            ))
+        return _llm_scheduler
+
+
+def configure_llm_scheduler(
+    *,
+    requests_per_minute: Optional[float] = None,
+    tokens_per_minute: Optional[float] = None,
+    max_retries: int = 6,
+) -> LLMScheduler:
+    """
+    Replace the process-wide scheduler with one using the given budgets.
+    """
+    global _llm_scheduler
+    with _llm_scheduler_lock:
+        _llm_scheduler = LLMScheduler(
+            RateLimiter(requests_per_minute=requests_per_minute, tokens_per_minute=tokens_per_minute),
+            max_retries=max_retries,
+        )
+        return _llm_scheduler
+
+
+_llm_clients: Dict[Tuple, ChatOpenAI] = {}
+_llm_clients_lock = threading.Lock()
 
 
-def _get_llm(model: str, api_key: Optional[str]) -> ChatOpenAI:
-    return ChatOpenAI(model=model, temperature=0, api_key=api_key)
+def _get_llm(model: str, api_key: Optional[str], base_url: Optional[str] = None) -> ChatOpenAI:
+    """
+    Chat model for (model, api_key, base_url), reused across calls and workers.
+    Models built inside an event loop are kept with that loop's async client in clients.py
+    and released with it; all of them share the process-wide sync pool.
+    """
+    loop_cache = loop_client_cache()
+    http_client = get_llm_http_client()
+    http_async_client = get_llm_async_http_client()
+    # The pooled clients are part of the key so configure_clients takes effect.
+    key = (model, api_key or os.environ.get("OPENAI_API_KEY"), base_url, http_client, http_async_client)
+    with _llm_clients_lock:
+        cached = _llm_clients if loop_cache is None else loop_cache
+        llm = cached.get(key)
+    if llm is not None:
+        return llm
+    # Retries are handled by LLMScheduler so that backoff is shared across all workers.
+    llm = ChatOpenAI(
+        model=model,
+        temperature=0,
+        api_key=api_key,
+        base_url=base_url,
+        max_retries=0,
+        include_response_headers=True,
+        http_client=http_client,
+        http_async_client=http_async_client,
+    )
+    with _llm_clients_lock:
+        return cached.setdefault(key, llm)
 
 
-def outline_for_text(title: str, text: str, *, model: str, api_key: Optional[str], playlist_mode: bool) -> OutlineResponse:
+def cache_lookup(key: str, cache_mode: str) -> Tuple[Optional[OutlineCache], Optional[OutlineResponse]]:
+    """
+    (cache to write the result to, cached outline) for key under cache_mode ("use",
+    "refresh" or "off"); the outline is None unless cache_mode is "use" and key is stored.
+    """
+    if cache_mode not in CACHE_MODES:
+        raise ValueError(f"cache_mode must be one of {', '.join(CACHE_MODES)}, got {cache_mode!r}")
+    if cache_mode == "off":
+        return (None, None)
+    cache = get_outline_cache()
+    if cache_mode == "use":
+        cached = cache.get(key)
+        incr("llm_cache_lookups", result="hit" if cached is not None else "miss")
+        return (cache, cached)
+    return (cache, None)
+
+
+def cache_put(cache: Optional[OutlineCache], key: str, outline: OutlineResponse) -> None:
+    """
+    Store outline under key unless caching is off. Outlines salvaged from truncated replies
+    are likely incomplete and are not stored, so the next run asks for them again.
+    """
+    if cache is None or outline._truncated:
+        return
+    cache.put(key, outline)
+
+
+def outline_messages(title: str, text: str, *, playlist_mode: bool) -> List[BaseMessage]:
+    """
+    Prompt for outlining one transcript chunk.
+    """
     system = SystemMessage(content=(PLAYLIST_NOTE_TAKER_SYSTEM if playlist_mode else SINGLE_VIDEO_NOTE_TAKER_SYSTEM))
     human = HumanMessage(content=(
-        f"Title: {title}\n\nTranscript (plaintext):\n" + text[:15000] + "\n\n" + JSON_SCHEMA_INSTRUCTIONS
-    ))
-    llm = _get_llm(model, api_key)
-    response = llm.invoke([system, human])
-    content = response.content if hasattr(response, "content") else str(response)
-    if content.strip().startswith("```"):
-        content = content.strip().strip("`")
-        if content.lstrip().lower().startswith("json"):
-            content = content.lstrip()[4:]
-        content = content.strip()
-    import json
-    data = json.loads(content)
-    return OutlineResponse.model_validate(data)
-
-
-def merge_outlines(title: str, outlines: List[OutlineResponse], *, model: str, api_key: Optional[str], playlist_mode: bool) -> OutlineResponse:
-    system = SystemMessage(content=(
-        "You are a master note merger. Merge multiple JSON note outlines into one coherent outline. "
-        "Preserve the original order of topics as much as possible and avoid duplication. "
-        "Return the same JSON schema with consolidated sections."
+        f"Title: {title}\n\nTranscript (plaintext):\n" + text + "\n\n" + JSON_SCHEMA_INSTRUCTIONS
     ))
-    import json
-    outlines_json = json.dumps([o.model_dump() for o in outlines])
+    return [system, human]
+
+
+def merge_messages(title: str, outlines_json: str) -> List[BaseMessage]:
+    """
+    Prompt for merging a JSON array of outlines into one.
+    """
+    system = SystemMessage(content=MERGE_OUTLINES_SYSTEM)
     human = HumanMessage(content=(
         f"Title: {title}\n\nOutlines (JSON array):\n{outlines_json}\n\n" + JSON_SCHEMA_INSTRUCTIONS
     ))
-    llm = _get_llm(model, api_key)
-    response = llm.invoke([system, human])
+    return [system, human]
+
+
+class OutlineParseError(ValueError):
+    """
+    A model reply that is not a valid outline even after local JSON repair.
+    The rejected reply text is kept on ``content`` so a retry can show it to the model.
+    """
+
+    def __init__(self, message: str, content: str = ""):
+        super().__init__(message)
+        self.content = content
+
+
+# Requests for a fresh reply after an unparseable one; other segments are not re-sent.
+OUTLINE_PARSE_RETRIES = 2
+
+RESPONSE_FORMATS = ("json_schema", "json_object", "text")
+
+_OUTLINE_RESPONSE_FORMAT = {
+    'type': "json_schema",
+    'json_schema': {'name': "outline", 'strict': True, 'schema': strict_json_schema(OutlineResponse)},
+}
+
+
+def outline_response_format() -> Optional[Dict]:
+    """
+    response_format for outline requests, from YT_NOTETAKER_LLM_RESPONSE_FORMAT: strict
+    "json_schema" structured output (default), plain "json_object" mode for servers without
+    schema support, or "text" to send none.
+    """
+    mode = os.environ.get("YT_NOTETAKER_LLM_RESPONSE_FORMAT") or "json_schema"
+    if mode not in RESPONSE_FORMATS:
+        raise ValueError(f"YT_NOTETAKER_LLM_RESPONSE_FORMAT must be one of {', '.join(RESPONSE_FORMATS)}, got {mode!r}")
+    if mode == "json_schema":
+        return _OUTLINE_RESPONSE_FORMAT
+    if mode == "json_object":
+        return {'type': "json_object"}
+    return None
+
+
+def _request_kwargs() -> Dict:
+    # Sent as extra_body: a response_format argument makes langchain use the SDK's parse(),
+    # which raises on a truncated reply instead of returning it for repair.
+    response_format = outline_response_format()
+    return {'extra_body': {'response_format': response_format}} if response_format else {}
+
+
+def _parse_outline_response(response, *, model: str = "") -> OutlineResponse:
     content = response.content if hasattr(response, "content") else str(response)
-    if content.strip().startswith("```"):
-        content = content.strip().strip("`")
-        if content.lstrip().lower().startswith("json"):
-            content = content.lstrip()[4:]
-        content = content.strip()
-    data = json.loads(content)
-    return OutlineResponse.model_validate(data)
+    if not isinstance(content, str):
+        content = "".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content)
+    metadata = getattr(response, "response_metadata", None) or {}
+    refusal = (getattr(response, "additional_kwargs", None) or {}).get("refusal")
+    return parse_outline_content(
+        content, finish_reason=metadata.get("finish_reason"), refusal=refusal, model=model
+    )
+
+
+def parse_outline_content(
+    content: str,
+    *,
+    finish_reason: Optional[str] = None,
+    refusal: Optional[str] = None,
+    model: str = "",
+) -> OutlineResponse:
+    """
+    Validate the text of an outline reply, repairing invalid or truncated JSON locally.
+    Raises OutlineParseError when nothing usable is left.
+    """
+    truncated = finish_reason == "length"
+    try:
+        data, repaired = loads_lenient(content or "")
+        outline = OutlineResponse.model_validate(data)
+    except ValueError as exc:
+        raise OutlineParseError(f"unparseable outline reply: {refusal or exc}", content or "") from exc
+    if repaired:
+        outline._truncated = truncated
+        incr("llm_json_repairs", model=model, reason="truncated" if truncated else "invalid")
+        logger.info("repaired %s outline reply (%d characters)", "truncated" if truncated else "invalid", len(content))
+    return outline
+
+
+def retry_messages(messages: List[BaseMessage], exc: OutlineParseError) -> List[BaseMessage]:
+    """
+    The original conversation plus the rejected reply and a request to answer again.
+    """
+    return messages + [AIMessage(content=exc.content), HumanMessage(content=(
+        f"Your previous reply could not be used ({exc}). Reply again with the complete outline as JSON only."
+    ))]
+
+
+def _request_outline(llm: ChatOpenAI, messages: List[BaseMessage], model: str) -> OutlineResponse:
+    """
+    One outline or merge request, parsed and repaired locally; an unusable reply is asked
+    for again (up to OUTLINE_PARSE_RETRIES times) without touching any other request.
+    """
+    kwargs = _request_kwargs()
+    attempt = 0
+    while True:
+        response = get_llm_scheduler().invoke(llm, messages, model=model, **kwargs)
+        try:
+            return _parse_outline_response(response, model=model)
+        except OutlineParseError as exc:
+            if attempt >= OUTLINE_PARSE_RETRIES:
+                raise
+            attempt += 1
+            incr("llm_parse_retries", model=model)
+            messages = retry_messages(messages, exc)
+
 
+async def _arequest_outline(llm: ChatOpenAI, messages: List[BaseMessage], model: str) -> OutlineResponse:
+    """
+    Async counterpart of _request_outline.
+    """
+    kwargs = _request_kwargs()
+    attempt = 0
+    while True:
+        response = await get_llm_scheduler().ainvoke(llm, messages, model=model, **kwargs)
+        try:
+            return _parse_outline_response(response, model=model)
+        except OutlineParseError as exc:
+            if attempt >= OUTLINE_PARSE_RETRIES:
+                raise
+            attempt += 1
+            incr("llm_parse_retries", model=model)
+            messages = retry_messages(messages, exc)
 
+
+def outline_for_text(
+    title: str,
+    text: str,
+    *,
+    model: str,
+    api_key: Optional[str],
+    playlist_mode: bool,
+    cache_mode: str = "use",
+    base_url: Optional[str] = None,
+) -> OutlineResponse:
+    """
+    Outline one transcript chunk. The text is sent in full; callers are expected to split
+    long transcripts with chunking.chunk_cues first. The call goes through the shared
+    LLMScheduler (rate limits and retries); base_url points at an OpenAI-compatible server.
+    The reply is constrained to the OutlineResponse schema where the server supports it.
+    """
+    key = outline_cache_key(
+        "outline",
+        model=model,
+        title=title,
+        text=text,
+        playlist_mode=playlist_mode,
+        response_format=outline_response_format(),
+    )
+    cache, cached = cache_lookup(key, cache_mode)
+    if cached is not None:
+        return cached
+    outline = _request_outline(
+        _get_llm(model, api_key, base_url), outline_messages(title, text, playlist_mode=playlist_mode), model
+    )
+    cache_put(cache, key, outline)
+    return outline
+
+
+async def aoutline_for_text(
+    title: str,
+    text: str,
+    *,
+    model: str,
+    api_key: Optional[str],
+    playlist_mode: bool,
+    cache_mode: str = "use",
+    base_url: Optional[str] = None,
+) -> OutlineResponse:
+    """
+    Async counterpart of outline_for_text using ChatOpenAI.ainvoke.
+    """
+    key = outline_cache_key(
+        "outline",
+        model=model,
+        title=title,
+        text=text,
+        playlist_mode=playlist_mode,
+        response_format=outline_response_format(),
+    )
+    # The cache is SQLite, possibly shared with other processes: keep it off the event loop.
+    cache, cached = await asyncio.to_thread(cache_lookup, key, cache_mode)
+    if cached is not None:
+        return cached
+    outline = await _arequest_outline(
+        _get_llm(model, api_key, base_url), outline_messages(title, text, playlist_mode=playlist_mode), model
+    )
+    if cache is not None:
+        await asyncio.to_thread(cache_put, cache, key, outline)
+    return outline
+
+
+def merge_outlines(
+    title: str,
+    outlines: List[OutlineResponse],
+    *,
+    model: str,
+    api_key: Optional[str],
+    playlist_mode: bool,
+    cache_mode: str = "use",
+    base_url: Optional[str] = None,
+) -> OutlineResponse:
+    """
+    Merge the outlines of consecutive transcript chunks into one outline for the video.
+    The caller keeps the combined size within the model's context (see plan_merge_groups).
+    The call goes through the shared LLMScheduler and the outline cache, like outline_for_text.
+    """
+    outlines_json = json.dumps([o.model_dump() for o in outlines])
+    key = outline_cache_key(
+        "merge",
+        model=model,
+        title=title,
+        text=outlines_json,
+        playlist_mode=playlist_mode,
+        response_format=outline_response_format(),
+    )
+    cache, cached = cache_lookup(key, cache_mode)
+    if cached is not None:
+        return cached
+    outline = _request_outline(_get_llm(model, api_key, base_url), merge_messages(title, outlines_json), model)
+    cache_put(cache, key, outline)
+    return outline
+
+
+async def amerge_outlines(
+    title: str,
+    outlines: List[OutlineResponse],
+    *,
+    model: str,
+    api_key: Optional[str],
+    playlist_mode: bool,
+    cache_mode: str = "use",
+    base_url: Optional[str] = None,
+) -> OutlineResponse:
+    """
+    Async counterpart of merge_outlines using ChatOpenAI.ainvoke.
+    """
+    outlines_json = json.dumps([o.model_dump() for o in outlines])
+    key = outline_cache_key(
+        "merge",
+        model=model,
+        title=title,
+        text=outlines_json,
+        playlist_mode=playlist_mode,
+        response_format=outline_response_format(),
+    )
+    cache, cached = await asyncio.to_thread(cache_lookup, key, cache_mode)
+    if cached is not None:
+        return cached
+    outline = await _arequest_outline(_get_llm(model, api_key, base_url), merge_messages(title, outlines_json), model)
+    if cache is not None:
+        await asyncio.to_thread(cache_put, cache, key, outline)
+    return outline
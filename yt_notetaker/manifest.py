@@ -0,0 +1,185 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+from .schemas import OutlineResponse
+from .transcript_utils import CueTable
+
+
+"""
+Per-playlist run manifests.
+A manifest is a JSON Lines file stored next to the playlist DOCX. Each line records one
+processed video: its id, a hash of its transcript, the model, chunking settings and prompt
+version used, and the resulting outline (or the error). Lines are appended and fsynced as
+each video finishes, so a crashed run loses at most the videos that were in flight; the
+last line for a video id wins. Reruns reuse outlines whose inputs are unchanged.
+"""
+
+
+MANIFEST_VERSION = 1
+
+
+def manifest_path_for(docx_path: str) -> str:
+    """
+    Manifest file stored alongside the given DOCX path.
+    """
+    root, _ = os.path.splitext(docx_path)
+    return root + ".manifest.jsonl"
+
+
+def transcript_hash(cues: CueTable) -> str:
+    """
+    Content hash of a parsed transcript (cue timings and text).
+    """
+    return hashlib.sha256(cues.to_bytes()).hexdigest()
+
+
+@dataclass
+class ManifestRecord:
+    video_id: str
+    title: str
+    transcript_sha256: Optional[str]
+    model: str
+    prompt_version: str
+    settings: Dict[str, int] = field(default_factory=dict)
+    outline: Optional[Dict] = None
+    error: Optional[str] = None
+    transcript_tokens: int = 0
+    raw_transcript_tokens: int = 0
+    updated: float = 0.0
+
+    def matches(self, *, transcript_sha256: str, model: str, prompt_version: str, settings: Dict[str, int]) -> bool:
+        """
+        True when this record holds a successful outline produced from the same inputs.
+        """
+        return (
+            self.error is None
+            and self.outline is not None
+            and self.transcript_sha256 == transcript_sha256
+            and self.model == model
+            and self.prompt_version == prompt_version
+            and self.settings == settings
+        )
+
+    def outline_response(self) -> Optional[OutlineResponse]:
+        if self.outline is None:
+            return None
+        return OutlineResponse.model_validate(self.outline)
+
+
+class PlaylistManifest:
+    """
+    Append-only JSONL manifest for one playlist output.
+    Safe to record into from several threads; unreadable trailing lines left by an
+    interrupted write are ignored on load.
+    """
+
+    def __init__(self, path: str, *, load: bool = True) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._records: Dict[str, ManifestRecord] = {}
+        self.reused = 0
+        if load:
+            self._load()
+
+    def _load(self) -> None:
+        try:
+            fh = open(self.path, "r", encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with fh:
+            for line in fh:
+                try:
+                    data = json.loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(data, dict) or data.get('version') != MANIFEST_VERSION:
+                    continue
+                data.pop('version')
+                try:
+                    record = ManifestRecord(**data)
+                except TypeError:
+                    continue
+                self._records[record.video_id] = record
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def get(self, video_id: str) -> Optional[ManifestRecord]:
+        with self._lock:
+            return self._records.get(video_id)
+
+    def lookup(
+        self,
+        video_id: str,
+        *,
+        transcript_sha256: str,
+        model: str,
+        prompt_version: str,
+        settings: Dict[str, int],
+    ) -> Optional[OutlineResponse]:
+        """
+        Stored outline for video_id if it was produced from the same transcript, model,
+        prompt version and settings; None if the video is new, changed or previously failed.
+        """
+        record = self.get(video_id)
+        if record is None or not record.matches(
+            transcript_sha256=transcript_sha256, model=model, prompt_version=prompt_version, settings=settings
+        ):
+            return None
+        try:
+            outline = record.outline_response()
+        except ValueError:
+            return None
+        with self._lock:
+            self.reused += 1
+        return outline
+
+    def record(self, record: ManifestRecord) -> None:
+        """
+        Append a record and flush it to disk before returning.
+        """
+        record.updated = record.updated or time.time()
+        line = json.dumps({'version': MANIFEST_VERSION, **asdict(record)}, ensure_ascii=False) + "\n"
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as fh:
+                fh.write(line)
+                fh.flush()
+                os.fsync(fh.fileno())
+            self._records[record.video_id] = record
+
+    def compact(self, video_ids: Optional[List[str]] = None) -> None:
+        """
+        Rewrite the manifest with one line per video, keeping only video_ids when given
+        (in that order). The rewrite is atomic.
+        """
+        with self._lock:
+            if video_ids is None:
+                records = list(self._records.values())
+            else:
+                records = [self._records[v] for v in dict.fromkeys(video_ids) if v in self._records]
+            directory = os.path.dirname(self.path) or "."
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                    for record in records:
+                        fh.write(json.dumps({'version': MANIFEST_VERSION, **asdict(record)}, ensure_ascii=False) + "\n")
+                    fh.flush()
+                    os.fsync(fh.fileno())
+                os.replace(tmp_path, self.path)
+            except OSError:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+                raise
+            self._records = {record.video_id: record for record in records}
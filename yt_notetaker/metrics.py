@@ -0,0 +1,309 @@
+import asyncio
+import contextlib
+import json
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+"""
+Process-wide instrumentation: timing spans and counters.
+Spans aggregate per name (count, total, max and a sampled latency distribution) and, while a
+trace is being recorded, are also kept as Chrome trace events (chrome://tracing, Perfetto)
+with one lane per thread or asyncio task. Counters carry optional labels. The same registry
+renders a summary table, a JSON trace and the Prometheus text exposition format; an optional
+HTTP endpoint serves the latter for long-running processes.
+"""
+
+
+PROMETHEUS_PREFIX = "yt_notetaker_"
+PROMETHEUS_QUANTILES = (0.5, 0.9, 0.99)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+@dataclass
+class SpanStats:
+    """
+    Aggregate timings of one span name. samples is a uniform reservoir of durations.
+    """
+
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    samples: List[float] = field(default_factory=list)
+
+    def quantile(self, q: float) -> float:
+        if not self.samples:
+            return float("nan")
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))]
+
+
+class Metrics:
+    """
+    Thread-safe registry of spans and counters. Timestamps use time.perf_counter.
+    """
+
+    def __init__(self, *, max_samples: int = 2048, max_trace_events: int = 500_000) -> None:
+        self.max_samples = max_samples
+        self.max_trace_events = max_trace_events
+        self._lock = threading.Lock()
+        self._epoch = time.perf_counter()
+        self._counters: Dict[Tuple[str, LabelKey], float] = {}
+        self._spans: Dict[str, SpanStats] = {}
+        self._trace: Optional[List[Dict]] = None
+        self._lanes: Dict[str, int] = {}
+        self._rng = random.Random(0)
+        self.dropped_trace_events = 0
+
+    def reset(self) -> None:
+        with self._lock:
+            self._epoch = time.perf_counter()
+            self._counters.clear()
+            self._spans.clear()
+            self._lanes.clear()
+            self._trace = [] if self._trace is not None else None
+            self.dropped_trace_events = 0
+
+    def incr(self, name: str, value: float = 1, **labels: str) -> None:
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def counter(self, name: str, **labels: str) -> float:
+        """
+        Current value of a counter; without labels, the sum over all label sets.
+        """
+        wanted = set((k, str(v)) for k, v in labels.items())
+        with self._lock:
+            return sum(v for (n, key), v in self._counters.items() if n == name and wanted <= set(key))
+
+    def start_trace(self) -> None:
+        """
+        Begin keeping individual span events for write_trace.
+        """
+        with self._lock:
+            if self._trace is None:
+                self._trace = []
+
+    @property
+    def tracing(self) -> bool:
+        return self._trace is not None
+
+    def record(self, name: str, start: float, end: float, **attrs) -> None:
+        """
+        Record a finished span given its perf_counter start and end.
+        """
+        duration = max(0.0, end - start)
+        lane = _lane_name()
+        with self._lock:
+            stats = self._spans.get(name)
+            if stats is None:
+                stats = self._spans[name] = SpanStats()
+            stats.count += 1
+            stats.total += duration
+            stats.max = max(stats.max, duration)
+            if len(stats.samples) < self.max_samples:
+                stats.samples.append(duration)
+            else:
+                slot = self._rng.randrange(stats.count)
+                if slot < self.max_samples:
+                    stats.samples[slot] = duration
+            if self._trace is None:
+                return
+            if len(self._trace) >= self.max_trace_events:
+                self.dropped_trace_events += 1
+                return
+            tid = self._lanes.setdefault(lane, len(self._lanes) + 1)
+            event = {
+                'name': name,
+                'ph': "X",
+                'ts': round((start - self._epoch) * 1e6, 1),
+                'dur': round(duration * 1e6, 1),
+                'pid': 1,
+                'tid': tid,
+            }
+            if attrs:
+                event['args'] = {k: v for k, v in attrs.items() if v is not None}
+            self._trace.append(event)
+
+    @contextlib.contextmanager
+    def span(self, name: str, **attrs) -> Iterator[None]:
+        """
+        Time the enclosed block, including awaits when used inside a coroutine.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter(), **attrs)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            spans = {
+                name: {
+                    'count': s.count,
+                    'total_seconds': s.total,
+                    'mean_seconds': s.total / s.count if s.count else 0.0,
+                    'p50_seconds': s.quantile(0.5),
+                    'p99_seconds': s.quantile(0.99),
+                    'max_seconds': s.max,
+                }
+                for name, s in sorted(self._spans.items())
+            }
+            counters = [
+                {'name': name, 'labels': dict(key), 'value': value}
+                for (name, key), value in sorted(self._counters.items())
+            ]
+        return {'spans': spans, 'counters': counters}
+
+    def trace(self) -> Dict:
+        """
+        Chrome trace event document with the recorded spans and the aggregate snapshot.
+        """
+        with self._lock:
+            events = list(self._trace or [])
+            lanes = dict(self._lanes)
+            dropped = self.dropped_trace_events
+        metadata = [
+            {'name': "thread_name", 'ph': "M", 'pid': 1, 'tid': tid, 'args': {'name': lane}}
+            for lane, tid in lanes.items()
+        ]
+        return {
+            'traceEvents': metadata + events,
+            'displayTimeUnit': "ms",
+            'droppedEvents': dropped,
+            'summary': self.snapshot(),
+        }
+
+    def write_trace(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(self.trace(), fh)
+
+    def summary_table(self) -> str:
+        snapshot = self.snapshot()
+        lines = [
+            f"{'span':<24} {'count':>7} {'total s':>9} {'mean ms':>9} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+        ]
+        for name, s in snapshot['spans'].items():
+            lines.append(
+                f"{name:<24} {s['count']:>7} {s['total_seconds']:9.2f} {s['mean_seconds'] * 1000:9.1f} "
+                f"{s['p50_seconds'] * 1000:9.1f} {s['p99_seconds'] * 1000:9.1f} {s['max_seconds'] * 1000:9.1f}"
+            )
+        if snapshot['counters']:
+            lines.append("")
+            lines.append(f"{'counter':<48} {'value':>14}")
+            for c in snapshot['counters']:
+                labels = ",".join(f"{k}={v}" for k, v in c['labels'].items())
+                name = f"{c['name']}{{{labels}}}" if labels else c['name']
+                value = c['value']
+                shown = f"{int(value)}" if float(value).is_integer() else f"{value:.3f}"
+                lines.append(f"{name:<48} {shown:>14}")
+        return "\n".join(lines)
+
+    def prometheus_text(self) -> str:
+        """
+        Render counters and span summaries in the Prometheus text exposition format.
+        """
+        snapshot = self.snapshot()
+        out: List[str] = []
+        typed = set()
+        for c in snapshot['counters']:
+            metric = f"{PROMETHEUS_PREFIX}{_metric_name(c['name'])}_total"
+            if metric not in typed:
+                typed.add(metric)
+                out.append(f"# TYPE {metric} counter")
+            out.append(f"{metric}{_prometheus_labels(c['labels'])} {_prometheus_value(c['value'])}")
+        metric = f"{PROMETHEUS_PREFIX}span_seconds"
+        with self._lock:
+            spans = [(name, s.count, s.total, [s.quantile(q) for q in PROMETHEUS_QUANTILES]) for name, s in sorted(self._spans.items())]
+        if spans:
+            out.append(f"# TYPE {metric} summary")
+        for name, count, total, quantiles in spans:
+            for q, value in zip(PROMETHEUS_QUANTILES, quantiles):
+                out.append(f"{metric}{_prometheus_labels({'span': name, 'quantile': str(q)})} {_prometheus_value(value)}")
+            out.append(f"{metric}_sum{_prometheus_labels({'span': name})} {_prometheus_value(total)}")
+            out.append(f"{metric}_count{_prometheus_labels({'span': name})} {count}")
+        return "\n".join(out) + "\n"
+
+
+def _lane_name() -> str:
+    thread = threading.current_thread().name
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    return f"{thread}/{task.get_name()}" if task is not None else thread
+
+
+def _metric_name(name: str) -> str:
+    return "".join(ch if ch.isalnum() or ch == "_" else "_" for ch in name)
+
+
+def _prometheus_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        f'{_metric_name(k)}="' + str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') + '"'
+        for k, v in labels.items()
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def _prometheus_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+_metrics = Metrics()
+
+
+def get_metrics() -> Metrics:
+    """
+    Process-wide metrics registry shared by all modules.
+    """
+    return _metrics
+
+
+def span(name: str, **attrs):
+    """
+    Time a block on the process-wide registry: `with span("captions.download"): ...`.
+    """
+    return _metrics.span(name, **attrs)
+
+
+def incr(name: str, value: float = 1, **labels: str) -> None:
+    _metrics.incr(name, value, **labels)
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    Serve the process-wide registry at http://host:port/metrics in the Prometheus text
+    format from a daemon thread. Call shutdown() on the returned server to stop it.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args) -> None:
+            pass
+
+        def do_GET(self) -> None:
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = _metrics.prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("content-type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("content-length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
@@ -1,26 +1,48 @@
-import os
+import asyncio
 import concurrent.futures
-from typing import Dict, List, Optional, Tuple
-
-from docx import Document
-from .schemas import OutlineResponse
-from .transcript_utils import (
-    get_playlist_info,
-    get_video_info,
-    get_video_transcript,
-    captions_to_plaintext,
-    captions_to_segments,
+import contextlib
+import functools
+import logging
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+from .chunking import DEFAULT_CHUNK_OVERLAP_TOKENS, DEFAULT_CHUNK_TOKENS
+from .schemas import NotesDocument, OutlineResponse, VideoNotes
+from .manifest import PlaylistManifest, manifest_path_for
+from .metrics import span
+from .transcript_utils import check_cache_modes, get_playlist_info
+from .pipeline import BatchScheduler, EventCallback, ReorderBuffer, StageLimits, VideoPipeline, VideoResult
+from .writers import (
+    DocxWriter,
+    JsonWriter,
+    NotesWriter,
+    get_writer,
+    notes_path_for,
+    render_notes_document,
+    write_outline_to_docx,  # re-exported for existing callers
 )
-from .llm_utils import outline_for_text, merge_outlines
 
 
 """
 High-level orchestration functions for generating DOCX notes for playlists and single videos.
-Transcript fetching/parsing and LLM calls are delegated to dedicated modules.
+Transcript fetching/parsing and LLM calls are delegated to dedicated modules; the async
+engine that drives them lives in pipeline.py. The generate_* functions are synchronous
+wrappers around their agenerate_* counterparts.
 """
 
 
-def generate_playlist_docx(
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PlaylistResult:
+    url: str
+    path: Optional[str] = None
+    error: Optional[str] = None
+
+
+async def agenerate_playlist_docx(
     playlist_url: str,
     output_dir: str = "playlists_docx",
     *,
@@ -28,148 +50,464 @@ def generate_playlist_docx(
     llm_model: str = "gpt-4o-mini",
     include_raw_transcript: bool = False,
     openai_api_key: Optional[str] = None,
-    max_workers: int = 250,
+    llm_base_url: Optional[str] = None,
+    transcript_cache: str = "use",
+    llm_cache: str = "use",
+    manifest: str = "use",
+    metadata_concurrency: int = 16,
+    download_concurrency: int = 32,
+    llm_concurrency: int = 64,
+    chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+    chunk_overlap_tokens: int = DEFAULT_CHUNK_OVERLAP_TOKENS,
+    merge_token_budget: int = 12000,
+    on_event: Optional[EventCallback] = None,
+    metadata_executor: Optional[concurrent.futures.Executor] = None,
 ) -> str:
     """
     Create a DOCX file for the provided playlist URL.
     Writes the playlist title and per-video titles with transcript text.
+    transcript_cache and llm_cache are "use", "refresh" or "off" and control the on-disk
+    transcript and outline caches. llm_base_url targets an OpenAI-compatible server instead
+    of the OpenAI API. The *_concurrency arguments bound the yt-dlp metadata,
+    caption download and LLM stages independently. Transcripts are split into chunks of about
+    chunk_tokens model tokens (overlapping by chunk_overlap_tokens); multi-chunk videos are
+    outlined per chunk in parallel and merged as a tree whose merge prompts stay under
+    merge_token_budget tokens.
+    Progress is checkpointed to a manifest next to the DOCX ("<title>.manifest.jsonl"). With
+    manifest="use" a rerun only outlines new, changed or previously failed videos and reuses
+    the stored outlines for the rest; "refresh" ignores stored outlines but still writes the
+    manifest, and "off" disables it.
+    on_event, if given, receives a VideoEvent as each video starts, has its transcript
+    fetched, is outlined or fails. Document sections are written in playlist order as soon
+    as every earlier video has finished. The outlines are also saved as "<title>.notes.json"
+    for render_notes.
+    metadata_executor, if given, runs the yt-dlp calls instead of a pool of
+    metadata_concurrency threads owned by this call (see jobs.JobManager).
     Returns the saved DOCX file path.
     """
+    check_cache_modes(transcript_cache=transcript_cache, llm_cache=llm_cache, manifest=manifest)
+    os.makedirs(output_dir, exist_ok=True)
+
+    limits = StageLimits(metadata=metadata_concurrency, download=download_concurrency, llm=llm_concurrency)
+    async with VideoPipeline(
+        use_llm=use_llm,
+        llm_model=llm_model,
+        openai_api_key=openai_api_key,
+        llm_base_url=llm_base_url,
+        playlist_mode=True,
+        transcript_cache=transcript_cache,
+        llm_cache=llm_cache,
+        limits=limits,
+        chunk_tokens=chunk_tokens,
+        chunk_overlap_tokens=chunk_overlap_tokens,
+        merge_token_budget=merge_token_budget,
+        on_event=on_event,
+        executor=metadata_executor,
+    ) as pipeline:
+        with span("playlist", url=playlist_url):
+            playlist_info = await pipeline.run_blocking(get_playlist_info, playlist_url)
+            return await _playlist_docx(
+                BatchScheduler(pipeline),
+                playlist_url,
+                playlist_info,
+                playlist_filenames(output_dir, [playlist_info.get('title', 'Playlist')])[0],
+                include_raw_transcript=include_raw_transcript,
+                manifest=manifest,
+            )
+
+
+async def agenerate_playlists_docx(
+    playlist_urls: List[str],
+    output_dir: str = "playlists_docx",
+    *,
+    use_llm: bool = True,
+    llm_model: str = "gpt-4o-mini",
+    include_raw_transcript: bool = False,
+    openai_api_key: Optional[str] = None,
+    llm_base_url: Optional[str] = None,
+    transcript_cache: str = "use",
+    llm_cache: str = "use",
+    manifest: str = "use",
+    metadata_concurrency: int = 16,
+    download_concurrency: int = 32,
+    llm_concurrency: int = 64,
+    chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+    chunk_overlap_tokens: int = DEFAULT_CHUNK_OVERLAP_TOKENS,
+    merge_token_budget: int = 12000,
+    on_event: Optional[EventCallback] = None,
+    metadata_executor: Optional[concurrent.futures.Executor] = None,
+) -> List[PlaylistResult]:
+    """
+    Batch version of agenerate_playlist_docx: one DOCX per playlist URL, produced from a
+    single shared pipeline. All playlists are enumerated concurrently into one work queue,
+    and a video that appears in several playlists is fetched and outlined once, with the
+    result written into every document (and manifest) that lists it.
+    A playlist that fails as a whole is reported in its PlaylistResult instead of aborting
+    the batch. Results are returned in playlist_urls order; a URL given more than once is
+    processed once, and playlists with the same title get numbered file names (see
+    playlist_filenames).
+    """
+    check_cache_modes(transcript_cache=transcript_cache, llm_cache=llm_cache, manifest=manifest)
     os.makedirs(output_dir, exist_ok=True)
 
-    playlist_info = get_playlist_info(playlist_url)
+    limits = StageLimits(metadata=metadata_concurrency, download=download_concurrency, llm=llm_concurrency)
+    async with VideoPipeline(
+        use_llm=use_llm,
+        llm_model=llm_model,
+        openai_api_key=openai_api_key,
+        llm_base_url=llm_base_url,
+        playlist_mode=True,
+        transcript_cache=transcript_cache,
+        llm_cache=llm_cache,
+        limits=limits,
+        chunk_tokens=chunk_tokens,
+        chunk_overlap_tokens=chunk_overlap_tokens,
+        merge_token_budget=merge_token_budget,
+        on_event=on_event,
+        executor=metadata_executor,
+    ) as pipeline:
+        scheduler = BatchScheduler(pipeline)
+        urls = list(dict.fromkeys(playlist_urls))
+
+        async def resolve(url: str) -> Dict:
+            with span("playlist.resolve", url=url):
+                return await pipeline.run_blocking(get_playlist_info, url)
+
+        # Every playlist is resolved before any is written, so output names are assigned in
+        # playlist_urls order and two playlists never stream into the same file.
+        infos = await asyncio.gather(*(resolve(url) for url in urls), return_exceptions=True)
+        filenames = playlist_filenames(
+            output_dir, [None if isinstance(info, BaseException) else info.get('title', 'Playlist') for info in infos]
+        )
+
+        async def run(url: str, info, filename: Optional[str]) -> PlaylistResult:
+            if isinstance(info, BaseException):
+                return PlaylistResult(url, error=str(info))
+            try:
+                with span("playlist", url=url):
+                    path = await _playlist_docx(
+                        scheduler,
+                        url,
+                        info,
+                        filename,
+                        include_raw_transcript=include_raw_transcript,
+                        manifest=manifest,
+                    )
+                return PlaylistResult(url, path=path)
+            except Exception as exc:
+                return PlaylistResult(url, error=str(exc))
+
+        results = dict(zip(urls, await asyncio.gather(*(
+            run(url, info, filename) for url, info, filename in zip(urls, infos, filenames)
+        ))))
+    logger.info(
+        "batch: %d playlist entries, %d unique videos processed",
+        scheduler.submitted, scheduler.unique,
+    )
+    return [results[url] for url in playlist_urls]
+
+
+def playlist_filenames(output_dir: str, titles: Sequence[Optional[str]]) -> List[Optional[str]]:
+    """
+    DOCX paths in output_dir for playlists titled titles (None for a playlist that is not
+    written). The first playlist with a title gets "<title>.docx"; later ones with the same
+    title, compared case-insensitively, get "<title> (2).docx", "<title> (3).docx", ...
+    """
+    taken = set()
+    paths: List[Optional[str]] = []
+    for title in titles:
+        if title is None:
+            paths.append(None)
+            continue
+        name, number = f"{title}.docx", 1
+        while name.casefold() in taken:
+            number += 1
+            name = f"{title} ({number}).docx"
+        taken.add(name.casefold())
+        paths.append(os.path.join(output_dir, name))
+    return paths
+
+
+async def _playlist_docx(
+    scheduler: BatchScheduler,
+    playlist_url: str,
+    playlist_info: Dict,
+    filename: str,
+    *,
+    include_raw_transcript: bool,
+    manifest: str,
+) -> str:
+    pipeline = scheduler.pipeline
     playlist_title = playlist_info.get('title', 'Playlist')
+    run_manifest: Optional[PlaylistManifest] = None
+    if manifest != "off":
+        run_manifest = PlaylistManifest(manifest_path_for(filename), load=manifest == "use")
 
-    document = Document()
-    document.add_heading(playlist_title, level=1)
-
-    entries = [e for e in (playlist_info.get('entries', []) or []) if e]
-
-    def process_entry(entry: Dict) -> Tuple[str, Optional[OutlineResponse], Optional[str]]:
-        video_title = entry.get('title', 'Untitled')
-        video_id = entry.get('id')
-        if not video_id:
-            return (video_title, None, "Missing video id")
-        video_url = f"https://www.youtube.com/watch?v={video_id}"
-        transcript_text = get_video_transcript(video_url)
-        plain = captions_to_plaintext(transcript_text)
-        if not use_llm:
-            return (video_title, OutlineResponse(sections=[]), None)
+    # include_raw_transcript is accepted for compatibility; raw transcripts are intentionally
+    # not written into the notes.
+    sections: ReorderBuffer[VideoNotes] = ReorderBuffer()
+    writers: List[NotesWriter] = []
+    # The event loop would only log an exception raised in a done callback; the first writer
+    # error is kept here and re-raised after gather so the outputs are aborted.
+    write_errors: List[BaseException] = []
+
+    def on_done(index: int, entry: Dict, task: asyncio.Task) -> None:
+        # writers is emptied once the outputs are closed or aborted.
+        if not writers or write_errors or task.cancelled() or task.exception() is not None:
+            return
         try:
-            info = get_video_info(video_url)
-            duration = int(info.get('duration') or 0)
-            if duration > 1800:
-                segments = captions_to_segments(transcript_text, segment_seconds=1800)
-                outlines: List[OutlineResponse] = []
-                for seg_index, start_sec, seg_text in segments:
-                    outline_seg = outline_for_text(
-                        f"{video_title} — Part {seg_index+1}",
-                        seg_text,
-                        model=llm_model,
-                        api_key=openai_api_key,
-                        playlist_mode=True,
-                    )
-                    outlines.append(outline_seg)
-                outline = merge_outlines(video_title, outlines, model=llm_model, api_key=openai_api_key, playlist_mode=True)
-            else:
-                outline = outline_for_text(
-                    video_title,
-                    plain,
-                    model=llm_model,
-                    api_key=openai_api_key,
-                    playlist_mode=True,
-                )
-            return (video_title, outline, None)
+            for _, notes in sections.push(index, _video_notes(entry, task.result())):
+                for writer in writers:
+                    with span(f"write.{writer.name}"):
+                        writer.video(notes)
         except Exception as exc:
-            return (video_title, None, str(exc))
-
-    results: List[Tuple[str, Optional[OutlineResponse], Optional[str]]] = []
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = [executor.submit(process_entry, e) for e in entries]
-        for fut in concurrent.futures.as_completed(futures):
-            results.append(fut.result())
-
-    # Preserve original order by mapping back
-    title_to_result = {title: (outline, err) for title, outline, err in results}
-    for entry in entries:
-        video_title = entry.get('title', 'Untitled')
-        document.add_heading(video_title, level=2)
-        if include_raw_transcript:
-            # Intentionally not writing raw transcript as requested; keep disabled by default
-            pass
-        outline, err = title_to_result.get(video_title, (None, "No result"))
-        if err:
-            document.add_paragraph(f"LLM summarization failed: {err}")
-        elif outline:
-            write_outline_to_docx(document, outline)
-
-    filename = os.path.join(output_dir, f"{playlist_title}.docx")
-    document.save(filename)
+            write_errors.append(exc)
+
+    try:
+        with contextlib.ExitStack() as stack:
+            # The DOCX and the .notes.json intermediate used by render are streamed side by side.
+            writers.append(stack.enter_context(DocxWriter(filename)))
+            writers.append(stack.enter_context(JsonWriter(notes_path_for(filename))))
+            for writer in writers:
+                writer.begin(playlist_title, kind="playlist", source_url=playlist_url)
+
+            # Entries arrive page by page from the flat playlist generator; each one is
+            # scheduled as soon as it is seen, and its section is streamed out once all
+            # earlier entries are done.
+            tasks: List[asyncio.Task] = []
+            async for entry in pipeline.iter_entries(playlist_info):
+                task = scheduler.submit(entry, run_manifest)
+                task.add_done_callback(functools.partial(on_done, len(tasks), entry))
+                tasks.append(task)
+            results: List[VideoResult] = await asyncio.gather(*tasks)
+            if write_errors:
+                raise write_errors[0]
+    finally:
+        writers.clear()
+
+    if run_manifest is not None:
+        # Drop videos that have left the playlist and collapse superseded lines.
+        await asyncio.to_thread(
+            run_manifest.compact, [result.video_id for result in results if result.video_id]
+        )
+        logger.info(
+            "%s: reused %d of %d outlines from %s",
+            playlist_title, run_manifest.reused, len(results), run_manifest.path,
+        )
+
     return filename
 
 
-def write_outline_to_docx(document: Document, outline: OutlineResponse) -> None:
+def _video_notes(entry: Dict, result: VideoResult) -> VideoNotes:
+    return VideoNotes(
+        video_id=result.video_id,
+        title=entry.get('title', 'Untitled'),
+        outline=result.outline,
+        error=result.error,
+    )
+
+
+def generate_playlist_docx(
+    playlist_url: str,
+    output_dir: str = "playlists_docx",
+    *,
+    use_llm: bool = True,
+    llm_model: str = "gpt-4o-mini",
+    include_raw_transcript: bool = False,
+    openai_api_key: Optional[str] = None,
+    llm_base_url: Optional[str] = None,
+    max_workers: Optional[int] = None,
+    transcript_cache: str = "use",
+    llm_cache: str = "use",
+    manifest: str = "use",
+    metadata_concurrency: int = 16,
+    download_concurrency: int = 32,
+    llm_concurrency: int = 64,
+    chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+    chunk_overlap_tokens: int = DEFAULT_CHUNK_OVERLAP_TOKENS,
+    merge_token_budget: int = 12000,
+    on_event: Optional[EventCallback] = None,
+) -> str:
     """
-    Write H2/H3 and bullet content to the DOCX document from outline produced by LLM.
+    Synchronous wrapper around agenerate_playlist_docx.
+    max_workers is kept for backwards compatibility and, when given, sets llm_concurrency.
     """
-    for section in outline.sections:
-        document.add_heading(section.title, level=3)
-        for sub in section.subsections:
-            document.add_heading(sub.title, level=4)
-            for bullet in sub.bullets:
-                document.add_paragraph(bullet, style='List Bullet')
+    return asyncio.run(agenerate_playlist_docx(
+        playlist_url,
+        output_dir,
+        use_llm=use_llm,
+        llm_model=llm_model,
+        include_raw_transcript=include_raw_transcript,
+        openai_api_key=openai_api_key,
+        llm_base_url=llm_base_url,
+        transcript_cache=transcript_cache,
+        llm_cache=llm_cache,
+        manifest=manifest,
+        metadata_concurrency=metadata_concurrency,
+        download_concurrency=download_concurrency,
+        llm_concurrency=max_workers if max_workers is not None else llm_concurrency,
+        chunk_tokens=chunk_tokens,
+        chunk_overlap_tokens=chunk_overlap_tokens,
+        merge_token_budget=merge_token_budget,
+        on_event=on_event,
+    ))
 
 
-def generate_single_video_docx(
+def generate_playlists_docx(
+    playlist_urls: List[str],
+    output_dir: str = "playlists_docx",
+    *,
+    use_llm: bool = True,
+    llm_model: str = "gpt-4o-mini",
+    include_raw_transcript: bool = False,
+    openai_api_key: Optional[str] = None,
+    llm_base_url: Optional[str] = None,
+    transcript_cache: str = "use",
+    llm_cache: str = "use",
+    manifest: str = "use",
+    metadata_concurrency: int = 16,
+    download_concurrency: int = 32,
+    llm_concurrency: int = 64,
+    chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+    chunk_overlap_tokens: int = DEFAULT_CHUNK_OVERLAP_TOKENS,
+    merge_token_budget: int = 12000,
+    on_event: Optional[EventCallback] = None,
+) -> List[PlaylistResult]:
+    """
+    Synchronous wrapper around agenerate_playlists_docx.
+    """
+    return asyncio.run(agenerate_playlists_docx(
+        playlist_urls,
+        output_dir,
+        use_llm=use_llm,
+        llm_model=llm_model,
+        include_raw_transcript=include_raw_transcript,
+        openai_api_key=openai_api_key,
+        llm_base_url=llm_base_url,
+        transcript_cache=transcript_cache,
+        llm_cache=llm_cache,
+        manifest=manifest,
+        metadata_concurrency=metadata_concurrency,
+        download_concurrency=download_concurrency,
+        llm_concurrency=llm_concurrency,
+        chunk_tokens=chunk_tokens,
+        chunk_overlap_tokens=chunk_overlap_tokens,
+        merge_token_budget=merge_token_budget,
+        on_event=on_event,
+    ))
+
+
+async def agenerate_single_video_docx(
     video_url: str,
     output_dir: str = "playlists_docx",
     *,
     use_llm: bool = True,
     llm_model: str = "gpt-4o-mini",
     openai_api_key: Optional[str] = None,
+    llm_base_url: Optional[str] = None,
+    transcript_cache: str = "use",
+    llm_cache: str = "use",
+    chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+    chunk_overlap_tokens: int = DEFAULT_CHUNK_OVERLAP_TOKENS,
+    merge_token_budget: int = 12000,
+    metadata_executor: Optional[concurrent.futures.Executor] = None,
 ) -> str:
     """
     Create a DOCX for a single video. File name and Heading 1 are the video title.
     Heading 2/3 carry the content outline from the LLM, aligned to the video's flow.
-    Transcript is not written into the final document.
+    Transcript is not written into the final document. The outline is also saved as
+    "<title>.notes.json" for render_notes.
     """
+    check_cache_modes(transcript_cache=transcript_cache, llm_cache=llm_cache)
     os.makedirs(output_dir, exist_ok=True)
-    info = get_video_info(video_url)
-    video_title = info.get('title', 'Video')
-
-    document = Document()
-    document.add_heading(video_title, level=1)
-
-    transcript_text = get_video_transcript(video_url)
-    plain = captions_to_plaintext(transcript_text)
-
-    if use_llm:
-        duration = int(info.get('duration') or 0)
-        if duration > 1800:
-            segments = captions_to_segments(transcript_text, segment_seconds=1800)
-            outlines: List[OutlineResponse] = []
-            for seg_index, start_sec, seg_text in segments:
-                outline_seg = outline_for_text(
-                    f"{video_title} — Part {seg_index+1}",
-                    seg_text,
-                    model=llm_model,
-                    api_key=openai_api_key,
-                    playlist_mode=False,
-                )
-                outlines.append(outline_seg)
-            outline = merge_outlines(video_title, outlines, model=llm_model, api_key=openai_api_key, playlist_mode=False)
-        else:
-            outline = outline_for_text(
-                video_title,
-                plain,
-                model=llm_model,
-                api_key=openai_api_key,
-                playlist_mode=False,
-            )
-        write_outline_to_docx(document, outline)
+    async with VideoPipeline(
+        use_llm=use_llm,
+        llm_model=llm_model,
+        openai_api_key=openai_api_key,
+        llm_base_url=llm_base_url,
+        playlist_mode=False,
+        transcript_cache=transcript_cache,
+        llm_cache=llm_cache,
+        chunk_tokens=chunk_tokens,
+        chunk_overlap_tokens=chunk_overlap_tokens,
+        merge_token_budget=merge_token_budget,
+        executor=metadata_executor,
+    ) as pipeline:
+        info = await pipeline.video_info(video_url)
+        video_title = info.get('title', 'Video')
+        outline: Optional[OutlineResponse] = None
+        if use_llm:
+            cues, _, _ = pipeline.normalize(info.get('id'), await pipeline.transcript(info))
+            outline = await pipeline.outline(video_title, cues)
 
     filename = os.path.join(output_dir, f"{video_title}.docx")
-    document.save(filename)
+    document = NotesDocument(
+        title=video_title,
+        kind="video",
+        source_url=video_url,
+        videos=[VideoNotes(video_id=info.get('id'), title=video_title, outline=outline)],
+    )
+    with span("write.docx"):
+        render_notes_document(document, DocxWriter(filename))
+    with span("write.json"):
+        render_notes_document(document, JsonWriter(notes_path_for(filename)))
     return filename
 
 
+def generate_single_video_docx(
+    video_url: str,
+    output_dir: str = "playlists_docx",
+    *,
+    use_llm: bool = True,
+    llm_model: str = "gpt-4o-mini",
+    openai_api_key: Optional[str] = None,
+    llm_base_url: Optional[str] = None,
+    transcript_cache: str = "use",
+    llm_cache: str = "use",
+    chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+    chunk_overlap_tokens: int = DEFAULT_CHUNK_OVERLAP_TOKENS,
+    merge_token_budget: int = 12000,
+) -> str:
+    """
+    Synchronous wrapper around agenerate_single_video_docx.
+    """
+    return asyncio.run(agenerate_single_video_docx(
+        video_url,
+        output_dir,
+        use_llm=use_llm,
+        llm_model=llm_model,
+        openai_api_key=openai_api_key,
+        llm_base_url=llm_base_url,
+        transcript_cache=transcript_cache,
+        llm_cache=llm_cache,
+        chunk_tokens=chunk_tokens,
+        chunk_overlap_tokens=chunk_overlap_tokens,
+        merge_token_budget=merge_token_budget,
+    ))
+
+
+def render_notes(
+    notes_path: str,
+    formats: Sequence[str] = ("docx",),
+    output_dir: Optional[str] = None,
+) -> List[str]:
+    """
+    Render a saved .notes.json (written next to every generated DOCX) into the given
+    formats ("docx", "markdown", "html", "json" or any registered writer) without network
+    access. Output files are named after notes_path without its ".notes.json" suffix, so
+    "Course (2).notes.json" renders "Course (2).docx", and saved in output_dir, defaulting
+    to the directory of notes_path. Returns the written paths.
+    """
+    with open(notes_path, "r", encoding="utf-8") as fh:
+        document = NotesDocument.model_validate_json(fh.read())
+    writer_classes = [get_writer(name) for name in formats]
+    output_dir = output_dir or os.path.dirname(notes_path) or "."
+    name = os.path.basename(notes_path)
+    stem = name[: -len(".notes.json")] if name.endswith(".notes.json") else os.path.splitext(name)[0]
+    os.makedirs(output_dir, exist_ok=True)
+    paths: List[str] = []
+    for writer_class in writer_classes:
+        path = os.path.join(output_dir, f"{stem}{writer_class.extension}")
+        render_notes_document(document, writer_class(path))
+        paths.append(path)
+    return paths
@@ -0,0 +1,490 @@
+import asyncio
+import concurrent.futures
+import logging
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Dict, Generic, List, Optional, Sequence, Tuple, TypeVar
+
+from .chunking import DEFAULT_CHUNK_OVERLAP_TOKENS, DEFAULT_CHUNK_TOKENS, chunk_cues, count_tokens
+from .clients import release_loop_clients, retain_loop_clients, use_http2
+from .llm_cache import prompt_version
+from .manifest import ManifestRecord, PlaylistManifest, transcript_hash
+from .metrics import get_metrics, incr, span
+from .schemas import OutlineResponse
+from .transcript_utils import CueTable, aget_video_cues, get_video_info, merge_rolling_cues
+
+if TYPE_CHECKING:
+    import httpx
+
+
+"""
+Asyncio engine behind the DOCX generators.
+Each video moves through three stages with their own concurrency limits: yt-dlp metadata
+extraction (synchronous, run on a bounded thread pool), caption download (async HTTP) and
+LLM outlining (ChatOpenAI.ainvoke). Thousands of videos can be in flight on one event loop
+while only the metadata stage holds OS threads. BatchScheduler spreads one pipeline over
+several playlists and processes each video id once. Per-video progress is reported as
+VideoEvent callbacks. The HTTP and LLM client libraries are only imported once a video
+actually needs a caption download or an LLM call, so runs without the LLM start quickly.
+"""
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StageLimits:
+    """
+    Maximum number of concurrent operations per pipeline stage.
+    """
+
+    metadata: int = 16
+    download: int = 32
+    llm: int = 64
+
+
+@dataclass
+class VideoResult:
+    video_id: Optional[str]
+    title: str
+    outline: Optional[OutlineResponse] = None
+    error: Optional[str] = None
+    transcript_tokens: int = 0
+    raw_transcript_tokens: int = 0
+    transcript_sha256: Optional[str] = None
+
+
+@dataclass
+class VideoEvent:
+    """
+    Progress notification for one video, keyed by video id.
+    kind is "started", "transcript_fetched", "outlined" or "failed". elapsed is the time since
+    the video started; stage_seconds is the time spent in the stage that just finished.
+    reused is set on "outlined" events whose outline came from a run manifest.
+    """
+
+    kind: str
+    video_id: Optional[str]
+    title: str
+    elapsed: float = 0.0
+    stage_seconds: float = 0.0
+    transcript_tokens: int = 0
+    reused: bool = False
+    error: Optional[str] = None
+
+
+EventCallback = Callable[[VideoEvent], None]
+
+T = TypeVar("T")
+
+
+class ReorderBuffer(Generic[T]):
+    """
+    Releases items pushed in any order as contiguous runs in index order.
+    """
+
+    def __init__(self) -> None:
+        self._next = 0
+        self._pending: Dict[int, T] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def push(self, index: int, item: T) -> List[Tuple[int, T]]:
+        """
+        Store item at index and return every item that is now ready, lowest index first.
+        """
+        self._pending[index] = item
+        ready: List[Tuple[int, T]] = []
+        while self._next in self._pending:
+            ready.append((self._next, self._pending.pop(self._next)))
+            self._next += 1
+        return ready
+
+
+def video_url_for(video_id: str) -> str:
+    return f"https://www.youtube.com/watch?v={video_id}"
+
+
+class VideoPipeline:
+    """
+    Shared per-run resources (thread pool, HTTP client, stage semaphores) and the
+    per-video processing steps. Use as an async context manager.
+    executor, if given, replaces the pipeline's own metadata thread pool and is left running
+    on exit, so several pipelines in one process can share a bounded pool.
+    """
+
+    def __init__(
+        self,
+        *,
+        use_llm: bool = True,
+        llm_model: str = "gpt-4o-mini",
+        openai_api_key: Optional[str] = None,
+        llm_base_url: Optional[str] = None,
+        playlist_mode: bool = True,
+        transcript_cache: str = "use",
+        llm_cache: str = "use",
+        limits: Optional[StageLimits] = None,
+        chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+        chunk_overlap_tokens: int = DEFAULT_CHUNK_OVERLAP_TOKENS,
+        merge_token_budget: int = 12000,
+        merge_fan_in: int = 4,
+        on_event: Optional[EventCallback] = None,
+        executor: Optional[concurrent.futures.Executor] = None,
+    ) -> None:
+        self.use_llm = use_llm
+        self.llm_model = llm_model
+        self.openai_api_key = openai_api_key
+        self.llm_base_url = llm_base_url
+        self.playlist_mode = playlist_mode
+        self.transcript_cache = transcript_cache
+        self.llm_cache = llm_cache
+        self.limits = limits or StageLimits()
+        self.chunk_tokens = chunk_tokens
+        self.chunk_overlap_tokens = chunk_overlap_tokens
+        self.merge_token_budget = merge_token_budget
+        self.merge_fan_in = merge_fan_in
+        self.on_event = on_event
+        self._executor: Optional[concurrent.futures.Executor] = executor
+        self._owns_executor = executor is None
+        self._http: Optional["httpx.AsyncClient"] = None
+        self._download_sem: Optional[asyncio.Semaphore] = None
+        self._llm_sem: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self) -> "VideoPipeline":
+        if self._owns_executor:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.limits.metadata, thread_name_prefix="yt-metadata"
+            )
+        self._download_sem = asyncio.Semaphore(self.limits.download)
+        self._llm_sem = asyncio.Semaphore(self.limits.llm)
+        retain_loop_clients()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+        await release_loop_clients()
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def emit(self, event: VideoEvent) -> None:
+        """
+        Deliver event to on_event. Callback errors are logged and never fail the video.
+        """
+        if self.on_event is None:
+            return
+        try:
+            self.on_event(event)
+        except Exception:
+            logger.exception("progress callback failed for %s event of %s", event.kind, event.video_id)
+
+    async def run_blocking(self, func, *args):
+        """
+        Run a synchronous yt-dlp call on the bounded metadata pool.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def iter_entries(self, playlist_info: Dict) -> AsyncIterator[Dict]:
+        """
+        Iterate the lazy entries generator from get_playlist_info without blocking the loop
+        while yt-dlp fetches the next page.
+        """
+        entries = iter(playlist_info.get('entries') or [])
+        while True:
+            entry = await asyncio.to_thread(next, entries, None)
+            if entry is None:
+                return
+            yield entry
+
+    async def video_info(self, video_url: str) -> Dict:
+        return await self.run_blocking(get_video_info, video_url)
+
+    def caption_client(self) -> "httpx.AsyncClient":
+        """
+        Keep-alive client for caption downloads, created on first use and closed with the pipeline.
+        """
+        if self._http is None:
+            import httpx
+
+            self._http = httpx.AsyncClient(
+                follow_redirects=True,
+                timeout=30,
+                limits=httpx.Limits(max_connections=self.limits.download, max_keepalive_connections=self.limits.download),
+                http2=use_http2(),
+            )
+        return self._http
+
+    async def transcript(self, info: Dict) -> CueTable:
+        async with self._download_sem:
+            return await aget_video_cues(info, self.caption_client(), cache_mode=self.transcript_cache)
+
+    def normalize(self, video_id: Optional[str], raw: CueTable) -> Tuple[CueTable, int, int]:
+        """
+        Merge rolling auto-caption duplicates before prompting.
+        Returns the normalized cues with the transcript token counts before and after.
+        """
+        with span("transcript.normalize", video_id=video_id):
+            cues = merge_rolling_cues(raw)
+            raw_tokens = count_tokens(raw.plaintext(), self.llm_model)
+            tokens = raw_tokens if cues is raw else count_tokens(cues.plaintext(), self.llm_model)
+        if tokens < raw_tokens:
+            logger.info(
+                "%s: merged rolling captions, %d -> %d transcript tokens (-%.0f%%)",
+                video_id, raw_tokens, tokens, 100.0 * (raw_tokens - tokens) / raw_tokens,
+            )
+        return (cues, raw_tokens, tokens)
+
+    async def outline_text(self, title: str, text: str) -> OutlineResponse:
+        from .llm_utils import aoutline_for_text
+
+        async with self._llm_sem:
+            return await aoutline_for_text(
+                title,
+                text,
+                model=self.llm_model,
+                api_key=self.openai_api_key,
+                playlist_mode=self.playlist_mode,
+                cache_mode=self.llm_cache,
+                base_url=self.llm_base_url,
+            )
+
+    async def merge(self, title: str, outlines: List[OutlineResponse]) -> OutlineResponse:
+        """
+        Merge outlines as a tree: each level merges groups of adjacent outlines in parallel,
+        with no single merge prompt above merge_token_budget, until one outline remains.
+        """
+        from .llm_utils import plan_merge_groups
+
+        if not outlines:
+            return OutlineResponse(sections=[])
+        while len(outlines) > 1:
+            groups = plan_merge_groups(
+                outlines, max_tokens=self.merge_token_budget, fan_in=self.merge_fan_in, model=self.llm_model
+            )
+            outlines = list(await asyncio.gather(*(self._merge_group(title, group) for group in groups)))
+        return outlines[0]
+
+    async def _merge_group(self, title: str, group: List[OutlineResponse]) -> OutlineResponse:
+        from .llm_utils import amerge_outlines
+
+        if len(group) == 1:
+            return group[0]
+        async with self._llm_sem:
+            return await amerge_outlines(
+                title,
+                group,
+                model=self.llm_model,
+                api_key=self.openai_api_key,
+                playlist_mode=self.playlist_mode,
+                cache_mode=self.llm_cache,
+                base_url=self.llm_base_url,
+            )
+
+    def outline_prompts(self, title: str, cues: CueTable) -> List[Tuple[str, str]]:
+        """
+        The (title, text) pairs to outline for a transcript: one per token-budgeted chunk for
+        the configured model, or a single placeholder when there is no transcript.
+        """
+        chunks = chunk_cues(
+            cues,
+            max_tokens=self.chunk_tokens,
+            overlap_tokens=self.chunk_overlap_tokens,
+            model=self.llm_model,
+        )
+        if not chunks:
+            return [(title, "Transcript not available.")]
+        if len(chunks) == 1:
+            return [(title, chunks[0].text)]
+        return [(f"{title} — Part {chunk.index+1}", chunk.text) for chunk in chunks]
+
+    async def outline(self, title: str, cues: CueTable) -> OutlineResponse:
+        """
+        Outline a transcript. A transcript that fits in one chunk takes a single LLM call,
+        longer ones are outlined chunk by chunk in parallel and merged.
+        """
+        prompts = self.outline_prompts(title, cues)
+        outlines = await asyncio.gather(*(self.outline_text(part, text) for part, text in prompts))
+        if len(outlines) == 1:
+            return outlines[0]
+        return await self.merge(title, list(outlines))
+
+    def manifest_settings(self) -> Dict[str, int]:
+        """
+        Settings besides model and prompts that shape an outline; stored in run manifests.
+        """
+        return {
+            'playlist_mode': int(self.playlist_mode),
+            'chunk_tokens': self.chunk_tokens,
+            'chunk_overlap_tokens': self.chunk_overlap_tokens,
+            'merge_token_budget': self.merge_token_budget,
+            'merge_fan_in': self.merge_fan_in,
+        }
+
+    async def process_entry(self, entry: Dict, manifest: Optional[PlaylistManifest] = None) -> VideoResult:
+        """
+        Produce the outline for one flat playlist entry. Failures are captured in the result.
+        With a manifest, an outline stored for the same transcript, model, prompt version and
+        settings is reused without calling the LLM, and every fresh result (including
+        failures) is checkpointed to the manifest as soon as it is known.
+        """
+        result = await self.process_video(entry, [manifest] if manifest is not None else [])
+        if manifest is not None:
+            await self.checkpoint(manifest, result)
+        return result
+
+    async def process_video(self, entry: Dict, manifests: Sequence[PlaylistManifest] = ()) -> VideoResult:
+        """
+        Fetch, normalize and outline one entry, reusing a matching outline from any of
+        manifests. manifests is read when the transcript hash is known, so callers may keep
+        appending to it while the video is in flight. Nothing is written to the manifests.
+        """
+        video_title = entry.get('title', 'Untitled')
+        video_id = entry.get('id')
+        started = time.perf_counter()
+        self.emit(VideoEvent("started", video_id, video_title))
+        if not video_id:
+            return self._finish(started, VideoResult(video_id, video_title, error="Missing video id"))
+        if not self.use_llm:
+            return self._finish(started, VideoResult(video_id, video_title, outline=OutlineResponse(sections=[])))
+        digest: Optional[str] = None
+        try:
+            info = await self.video_info(video_url_for(video_id))
+            raw = await self.transcript(info)
+            fetched = time.perf_counter()
+            self.emit(VideoEvent(
+                "transcript_fetched",
+                video_id,
+                video_title,
+                elapsed=fetched - started,
+                stage_seconds=fetched - started,
+            ))
+            digest = transcript_hash(raw)
+            for manifest in list(manifests):
+                outline = manifest.lookup(
+                    video_id,
+                    transcript_sha256=digest,
+                    model=self.llm_model,
+                    prompt_version=prompt_version(),
+                    settings=self.manifest_settings(),
+                )
+                if outline is not None:
+                    stored = manifest.get(video_id)
+                    return self._finish(started, VideoResult(
+                        video_id,
+                        video_title,
+                        outline=outline,
+                        transcript_tokens=stored.transcript_tokens,
+                        raw_transcript_tokens=stored.raw_transcript_tokens,
+                        transcript_sha256=digest,
+                    ), stage_started=fetched, reused=True)
+            cues, raw_tokens, tokens = self.normalize(video_id, raw)
+            outline = await self.outline(video_title, cues)
+            return self._finish(started, VideoResult(
+                video_id,
+                video_title,
+                outline=outline,
+                transcript_tokens=tokens,
+                raw_transcript_tokens=raw_tokens,
+                transcript_sha256=digest,
+            ), stage_started=fetched)
+        except Exception as exc:
+            return self._finish(started, VideoResult(video_id, video_title, error=str(exc), transcript_sha256=digest))
+
+    def _finish(
+        self,
+        started: float,
+        result: VideoResult,
+        *,
+        stage_started: Optional[float] = None,
+        reused: bool = False,
+    ) -> VideoResult:
+        now = time.perf_counter()
+        get_metrics().record("video", started, now, video_id=result.video_id)
+        incr("videos", outcome="failed" if result.error else ("reused" if reused else "outlined"))
+        self.emit(VideoEvent(
+            "failed" if result.error else "outlined",
+            result.video_id,
+            result.title,
+            elapsed=now - started,
+            stage_seconds=now - (stage_started if stage_started is not None else started),
+            transcript_tokens=result.transcript_tokens,
+            reused=reused,
+            error=result.error,
+        ))
+        return result
+
+    async def checkpoint(self, manifest: PlaylistManifest, result: VideoResult) -> None:
+        """
+        Append result to manifest unless the manifest already holds the same outcome.
+        """
+        if not result.video_id or not self.use_llm:
+            return
+        settings = self.manifest_settings()
+        existing = manifest.get(result.video_id)
+        if (
+            existing is not None
+            and result.error is None
+            and existing.matches(
+                transcript_sha256=result.transcript_sha256,
+                model=self.llm_model,
+                prompt_version=prompt_version(),
+                settings=settings,
+            )
+        ):
+            return
+        await asyncio.to_thread(manifest.record, ManifestRecord(
+            video_id=result.video_id,
+            title=result.title,
+            transcript_sha256=result.transcript_sha256,
+            model=self.llm_model,
+            prompt_version=prompt_version(),
+            settings=settings,
+            outline=result.outline.model_dump() if result.outline is not None else None,
+            error=result.error,
+            transcript_tokens=result.transcript_tokens,
+            raw_transcript_tokens=result.raw_transcript_tokens,
+        ))
+
+
+class BatchScheduler:
+    """
+    Cross-playlist work queue on top of one VideoPipeline.
+    Each unique video id is processed once however many playlists contain it; every
+    playlist that submits it awaits the same task and checkpoints the shared result into
+    its own manifest.
+    """
+
+    def __init__(self, pipeline: VideoPipeline) -> None:
+        self.pipeline = pipeline
+        self.submitted = 0
+        self._tasks: Dict[str, "asyncio.Task[VideoResult]"] = {}
+        self._manifests: Dict[str, List[PlaylistManifest]] = {}
+
+    @property
+    def unique(self) -> int:
+        return len(self._tasks)
+
+    def submit(self, entry: Dict, manifest: Optional[PlaylistManifest] = None) -> "asyncio.Task[VideoResult]":
+        """
+        Schedule entry and return a task resolving to its result for this playlist.
+        """
+        self.submitted += 1
+        video_id = entry.get('id')
+        if not video_id:
+            return asyncio.create_task(self.pipeline.process_entry(entry, manifest))
+        manifests = self._manifests.setdefault(video_id, [])
+        if manifest is not None and manifest not in manifests:
+            manifests.append(manifest)
+        shared = self._tasks.get(video_id)
+        if shared is None:
+            shared = asyncio.create_task(self.pipeline.process_video(entry, manifests))
+            self._tasks[video_id] = shared
+        return asyncio.create_task(self._deliver(shared, manifest))
+
+    async def _deliver(self, shared: "asyncio.Task[VideoResult]", manifest: Optional[PlaylistManifest]) -> VideoResult:
+        result = await asyncio.shield(shared)
+        if manifest is not None:
+            await self.pipeline.checkpoint(manifest, result)
+        return result
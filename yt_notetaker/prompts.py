@@ -15,6 +15,13 @@ SINGLE_VIDEO_NOTE_TAKER_SYSTEM = (
 )
 
 
+MERGE_OUTLINES_SYSTEM = (
+    "You are a master note merger. Merge multiple JSON note outlines into one coherent outline. "
+    "Preserve the original order of topics as much as possible and avoid duplication. "
+    "Return the same JSON schema with consolidated sections."
+)
+
+
 JSON_SCHEMA_INSTRUCTIONS = (
     "Return JSON only, no prose. Schema:\n"
     "{\n  \"sections\": [\n    {\n      \"title\": \"string\",\n      \"subsections\": [\n        {\n          \"title\": \"string\",\n          \"bullets\": [\"string\"]\n        }\n      ]\n    }\n  ]\n}\n"
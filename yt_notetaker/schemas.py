@@ -1,6 +1,6 @@
-from typing import List
+from typing import Any, Dict, List, Optional, Type
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 
 class BulletSubsection(BaseModel):
@@ -15,6 +15,47 @@ class Section(BaseModel):
 
 class OutlineResponse(BaseModel):
     sections: List[Section] = Field(default_factory=list)
+    # Set when the outline was salvaged from a reply cut off at the completion limit.
+    _truncated: bool = PrivateAttr(default=False)
+
+
+def strict_json_schema(model: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    JSON schema of model in the form OpenAI's strict structured outputs accept: every
+    property required, no additional properties, no defaults or titles.
+    """
+
+    def strict(node: Any) -> Any:
+        if isinstance(node, list):
+            return [strict(item) for item in node]
+        if not isinstance(node, dict):
+            return node
+        result = {}
+        for key, value in node.items():
+            if key in ('default', 'title'):
+                continue
+            if key in ('properties', '$defs'):
+                # Maps of names to schemas: the names are data, not keywords.
+                result[key] = {name: strict(sub) for name, sub in value.items()}
+            else:
+                result[key] = strict(value)
+        if 'properties' in result:
+            result['required'] = list(result['properties'])
+            result['additionalProperties'] = False
+        return result
+
+    return strict(model.model_json_schema())
+
+
+class VideoNotes(BaseModel):
+    video_id: Optional[str] = None
+    title: str = Field(default_factory=str)
+    outline: Optional[OutlineResponse] = None
+    error: Optional[str] = None
 
 
-
+class NotesDocument(BaseModel):
+    title: str = Field(default_factory=str)
+    kind: str = "playlist"
+    source_url: Optional[str] = None
+    videos: List[VideoNotes] = Field(default_factory=list)
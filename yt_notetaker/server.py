@@ -0,0 +1,149 @@
+import json
+import os
+import re
+import shutil
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict
+from urllib.parse import parse_qs, quote, urlsplit
+
+from .metrics import get_metrics
+from .work_queue import LeaseLost, WorkQueue
+from .writers import notes_path_for
+
+
+"""
+Small JSON-over-HTTP API in front of a WorkQueue.
+Clients submit jobs and fetch their status and files; remote workers claim, heartbeat,
+complete and fail tasks (see RemoteQueue). Render tasks are not handed out here: the
+serving process renders, so finished files end up in its output directory, where
+GET /jobs/<id>/result can serve them. /metrics exposes the Prometheus text format.
+
+    POST /jobs                   {"url": ..., "kind": "playlist" | "video", "options": {...}}
+    GET  /jobs                   recent jobs
+    GET  /jobs/<id>              status, title, output path and video task counts
+    GET  /jobs/<id>/result       the DOCX (?format=json for the .notes.json)
+    POST /tasks/claim            {"worker": ..., "kinds": [...]} -> task, or 204 when idle
+    POST /tasks/<id>/heartbeat   {"worker": ...}
+    POST /tasks/<id>/complete    {"worker": ..., "result": {...}}
+    POST /tasks/<id>/fail        {"worker": ..., "error": "..."}
+"""
+
+
+_JOB_RE = re.compile(r"^/jobs/([0-9a-f]+)(/result)?$")
+_TASK_RE = re.compile(r"^/tasks/(\d+)/(heartbeat|complete|fail)$")
+REMOTE_TASK_KINDS = ("playlist", "video")
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+def start_queue_server(
+    queue: WorkQueue,
+    port: int = 8765,
+    host: str = "127.0.0.1",
+    *,
+    output_dir: str = "playlists_docx",
+) -> ThreadingHTTPServer:
+    """
+    Serve the API for queue at http://host:port from a daemon thread; submitted jobs write
+    into output_dir. Call shutdown() on the returned server to stop it.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args) -> None:
+            pass
+
+        def _send_json(self, status: int, body: Any) -> None:
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("content-type", "application/json")
+            self.send_header("content-length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _read_json(self) -> Dict[str, Any]:
+            length = int(self.headers.get("content-length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(body, dict):
+                raise ValueError("request body must be a JSON object")
+            return body
+
+        def do_GET(self) -> None:
+            url = urlsplit(self.path)
+            if url.path == "/metrics":
+                data = get_metrics().prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("content-type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("content-length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+                return
+            if url.path == "/jobs":
+                self._send_json(200, {'jobs': queue.jobs()})
+                return
+            match = _JOB_RE.match(url.path)
+            job = queue.job(match.group(1)) if match else None
+            if job is None:
+                self._send_json(404, {'error': "not found"})
+            elif not match.group(2):
+                self._send_json(200, job)
+            else:
+                self._send_result(job, parse_qs(url.query).get('format', ["docx"])[0])
+
+        def _send_result(self, job: Dict[str, Any], fmt: str) -> None:
+            if job['status'] != "done" or not job['path']:
+                self._send_json(409, {'error': f"job is {job['status']}", 'job': job})
+                return
+            path = job['path'] if fmt == "docx" else notes_path_for(job['path'])
+            if fmt not in ("docx", "json") or not os.path.exists(path):
+                self._send_json(404, {'error': f"no {fmt} result"})
+                return
+            self.send_response(200)
+            self.send_header("content-type", DOCX_MIME if fmt == "docx" else "application/json")
+            self.send_header("content-length", str(os.path.getsize(path)))
+            self.send_header("content-disposition", f"attachment; filename*=UTF-8''{quote(os.path.basename(path))}")
+            self.end_headers()
+            with open(path, "rb") as fh:
+                shutil.copyfileobj(fh, self.wfile)
+
+        def do_POST(self) -> None:
+            path = urlsplit(self.path).path
+            try:
+                body = self._read_json()
+                if path == "/jobs":
+                    job_id = queue.submit(
+                        str(body.get('url') or ""),
+                        kind=body.get('kind', "playlist"),
+                        output_dir=output_dir,
+                        options=body.get('options'),
+                    )
+                    self._send_json(201, queue.job(job_id))
+                elif path == "/tasks/claim":
+                    kinds = [k for k in body.get('kinds') or REMOTE_TASK_KINDS if k in REMOTE_TASK_KINDS]
+                    task = queue.claim(str(body['worker']), kinds)
+                    if task is None:
+                        self.send_response(204)
+                        self.end_headers()
+                    else:
+                        self._send_json(200, task.to_dict())
+                else:
+                    match = _TASK_RE.match(path)
+                    if match is None:
+                        self._send_json(404, {'error': "not found"})
+                        return
+                    task_id, action, worker = int(match.group(1)), match.group(2), str(body['worker'])
+                    if action == "heartbeat":
+                        queue.heartbeat(task_id, worker)
+                    elif action == "complete":
+                        queue.complete(task_id, worker, body.get('result') or {})
+                    else:
+                        queue.fail(task_id, worker, str(body.get('error') or "unknown error"))
+                    self._send_json(200, {'ok': True})
+            except LeaseLost as exc:
+                self._send_json(409, {'error': str(exc)})
+            except (KeyError, ValueError) as exc:
+                self._send_json(400, {'error': str(exc)})
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="queue-server", daemon=True).start()
+    return server
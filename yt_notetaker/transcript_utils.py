@@ -1,8 +1,25 @@
+import asyncio
+import hashlib
+import html
+import json
+import os
 import re
-from typing import Dict, List, Optional, Tuple
+import struct
+import sys
+import tempfile
+import threading
+import zlib
+from array import array
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple
+from xml.etree import ElementTree
 
-import requests
-from yt_dlp import YoutubeDL
+from .clients import get_http_session
+from .metrics import incr, span
+
+if TYPE_CHECKING:
+    import httpx
+    from yt_dlp import YoutubeDL
 
 
 YDL_BASE_OPTS = {
@@ -11,74 +28,197 @@ YDL_BASE_OPTS = {
     'writesubtitles': True,
     'writeautomaticsub': True,
     'subtitleslangs': ['en'],
+    'subtitlesformat': 'json3/srv3/vtt/best',
     'ignoreerrors': True,
 }
 
 
+# Flat playlist enumeration: entries are only id/title/url stubs and pages are
+# fetched on demand while the entries generator is consumed.
+YDL_FLAT_OPTS = {
+    'quiet': True,
+    'skip_download': True,
+    'extract_flat': 'in_playlist',
+    'lazy_playlist': True,
+}
+
+
 def get_playlist_info(playlist_url: str) -> Dict:
-    with YoutubeDL({'quiet': True}) as ydl:
-        playlist_info = ydl.extract_info(playlist_url, download=False)
+    """
+    Extract playlist metadata without resolving the individual videos.
+    The returned 'entries' is a generator yielding flat entries (id, title, url, duration)
+    as yt-dlp pages through the playlist, so callers can start work on the first page
+    before the last one has been fetched.
+    """
+    # yt-dlp is imported on first use: it is not needed for render-only work.
+    from yt_dlp import YoutubeDL
+
+    ydl = YoutubeDL(YDL_FLAT_OPTS)
+    try:
+        with span("yt_dlp.playlist"):
+            info = ydl.extract_info(playlist_url, download=False, process=False) or {}
+            # Some URLs (e.g. watch?v=...&list=...) resolve to a redirect to the playlist page.
+            for _ in range(3):
+                if info.get('_type') not in ('url', 'url_transparent') or not info.get('url'):
+                    break
+                info = ydl.extract_info(info['url'], download=False, process=False) or {}
+    except BaseException:
+        ydl.close()
+        raise
+
+    playlist_info = dict(info)
+    if info.get('_type') in ('playlist', 'multi_video') or 'entries' in info:
+        playlist_info['entries'] = _iter_flat_entries(ydl, info.get('entries'))
+    else:
+        # A single video URL: treat it as a one-entry playlist.
+        ydl.close()
+        playlist_info['entries'] = iter([info] if info.get('id') else [])
     return playlist_info
 
 
+def _iter_flat_entries(ydl: "YoutubeDL", entries: Optional[Iterable[Dict]]) -> Iterator[Dict]:
+    # The YoutubeDL instance must stay open while the extractor pages through the playlist.
+    try:
+        for entry in entries or []:
+            if entry:
+                yield entry
+    finally:
+        ydl.close()
+
+
 def get_video_info(video_url: str) -> Dict:
-    with YoutubeDL({'quiet': True}) as ydl:
+    """
+    Single yt-dlp extraction for a video.
+    The result carries the title, duration and caption tracks (requested_subtitles /
+    automatic_captions), so it can be passed on to get_video_transcript.
+    Raises when the video cannot be extracted (private, removed, unavailable, network error),
+    so the caller reports the video as failed instead of outlining an empty transcript.
+    """
+    from yt_dlp import YoutubeDL
+
+    # ignoreerrors would turn every extraction error into a None result.
+    with span("yt_dlp.video"), YoutubeDL({**YDL_BASE_OPTS, 'ignoreerrors': False}) as ydl:
         info = ydl.extract_info(video_url, download=False)
+    if not info:
+        raise RuntimeError(f"could not extract video info for {video_url}")
     return info
 
 
-def get_video_transcript(video_url: str) -> str:
-    with YoutubeDL(YDL_BASE_OPTS) as ydl:
-        info = ydl.extract_info(video_url, download=False)
-
+def caption_tracks(info: Dict) -> List[Tuple[str, str, str]]:
+    """
+    English caption tracks from an extracted video info as (kind, lang, url), manual subtitles first.
+    kind is "manual" for uploaded subtitles and "auto" for YouTube's automatic captions.
+    Automatic captions prefer the json3 and srv3 formats, which parse_captions reads directly.
+    """
+    tracks: List[Tuple[str, str, str]] = []
     requested_subtitles = info.get('requested_subtitles') or {}
     en_sub = requested_subtitles.get('en') if isinstance(requested_subtitles, dict) else None
     if en_sub and en_sub.get('url'):
-        response = requests.get(en_sub['url'], timeout=30)
-        if response.ok:
-            return response.text
+        subtitles = info.get('subtitles') or {}
+        kind = "manual" if isinstance(subtitles, dict) and subtitles.get('en') else "auto"
+        tracks.append((kind, 'en', en_sub['url']))
 
     automatic_captions = info.get('automatic_captions') or {}
     en_auto_list = automatic_captions.get('en') if isinstance(automatic_captions, dict) else None
     if en_auto_list and isinstance(en_auto_list, list) and len(en_auto_list) > 0:
-        sub_url = en_auto_list[0].get('url')
-        if sub_url:
-            response = requests.get(sub_url, timeout=30)
-            if response.ok:
-                return response.text
+        preferred = sorted(
+            en_auto_list,
+            key=lambda f: CAPTION_FORMAT_PREFERENCE.index(f.get('ext')) if f.get('ext') in CAPTION_FORMAT_PREFERENCE else len(CAPTION_FORMAT_PREFERENCE),
+        )
+        sub_url = preferred[0].get('url')
+        if sub_url and all(sub_url != url for _, _, url in tracks):
+            tracks.append(("auto", 'en', sub_url))
+    return tracks
+
+
+def get_video_transcript(video_url: str, info: Optional[Dict] = None, *, cache_mode: str = "use") -> str:
+    """
+    Download the captions for a video and return them as WebVTT.
+    Whatever the source format (json3, srv3, VTT or SRT), the file is parsed into cues and
+    re-serialized, so the result is the same whether or not it came from the cache.
+    Pass the result of get_video_info as `info` to avoid a second yt-dlp extraction.
+    cache_mode controls the on-disk transcript cache: "use" reads and writes it,
+    "refresh" always downloads and overwrites the cached entry, "off" bypasses it.
+    """
+    if cache_mode not in CACHE_MODES:
+        raise ValueError(f"cache_mode must be one of {', '.join(CACHE_MODES)}, got {cache_mode!r}")
+    if info is None:
+        info = get_video_info(video_url)
+
+    video_id = info.get('id')
+    cache = get_transcript_cache() if (cache_mode != "off" and video_id) else None
+
+    for kind, lang, sub_url in caption_tracks(info):
+        if cache is not None and cache_mode == "use":
+            table = cache.get(video_id, lang, kind)
+            if table is not None:
+                return table.to_vtt()
+        with span("captions.download", video_id=video_id):
+            response = get_http_session().get(sub_url, timeout=30)
+        _count_download(response.status_code, len(response.content))
+        if response.ok:
+            with span("captions.parse", video_id=video_id):
+                table = parse_captions(response.text)
+            if cache is not None:
+                cache.put(video_id, lang, kind, table)
+            return table.to_vtt()
 
     return "Transcript not available."
 
 
+async def aget_video_cues(info: Dict, client: "httpx.AsyncClient", *, cache_mode: str = "use") -> "CueTable":
+    """
+    Async caption fetch for an already extracted video info, returning the parsed cue table.
+    Caption files are downloaded with the given httpx client and parsed once; cache reads
+    and writes run in worker threads so the event loop is never blocked on disk.
+    An empty table means the video has no usable English captions.
+    """
+    if cache_mode not in CACHE_MODES:
+        raise ValueError(f"cache_mode must be one of {', '.join(CACHE_MODES)}, got {cache_mode!r}")
+
+    video_id = info.get('id')
+    cache = get_transcript_cache() if (cache_mode != "off" and video_id) else None
+
+    for kind, lang, sub_url in caption_tracks(info):
+        if cache is not None and cache_mode == "use":
+            table = await asyncio.to_thread(cache.get, video_id, lang, kind)
+            if table is not None:
+                return table
+        with span("captions.download", video_id=video_id):
+            response = await client.get(sub_url)
+        _count_download(response.status_code, len(response.content))
+        if response.is_success:
+            with span("captions.parse", video_id=video_id):
+                table = parse_captions(response.text)
+            if cache is not None:
+                await asyncio.to_thread(cache.put, video_id, lang, kind, table)
+            return table
+
+    return CueTable.empty()
+
+
+def _count_download(status_code: int, size: int) -> None:
+    incr("caption_downloads", status=str(status_code))
+    incr("caption_bytes_downloaded", size)
+
+
 def captions_to_plaintext(captions_text: str) -> str:
     if not captions_text:
         return ""
-    text = captions_text
-    text = re.sub(r"^WEBVTT.*$", "", text, flags=re.MULTILINE)
-    text = re.sub(r"^\s*\d+\s*$", "", text, flags=re.MULTILINE)
-    text = re.sub(r"^\s*\d{1,2}:\d{2}:\d{2}[\.,]\d{1,3}\s+-->.*$", "", text, flags=re.MULTILINE)
-    text = re.sub(r"^\s*\d{1,2}:\d{2}[\.,]\d{1,3}\s+-->.*$", "", text, flags=re.MULTILINE)  # hh:mm.mmm -->
-    text = re.sub(r"^\s*NOTE.*$", "", text, flags=re.MULTILINE)
-    text = re.sub(r"<[^>]+>", "", text)
-    text = re.sub(r"\s+", " ", text).strip()
-    return text
+    table = parse_captions(captions_text)
+    if table:
+        return table.plaintext()
+    if captions_text.lstrip().startswith("WEBVTT"):
+        return ""
+    # Not a caption file (e.g. "Transcript not available."): just normalise it.
+    return _WS_RE.sub(" ", _TAG_RE.sub("", captions_text)).strip()
 
 
 def _parse_timestamp_to_seconds(ts: str) -> Optional[float]:
-    ts = ts.strip()
-    m = re.match(r"^(\d{2}):(\d{2}):(\d{2})[\.,](\d{1,3})$", ts)
-    if m:
-        h, mnt, s, ms = m.groups()
-        return int(h) * 3600 + int(mnt) * 60 + int(s) + int(ms) / 1000.0
-    m = re.match(r"^(\d{2}):(\d{2})[\.,](\d{1,3})$", ts)
-    if m:
-        mnt, s, ms = m.groups()
-        return int(mnt) * 60 + int(s) + int(ms) / 1000.0
-    m = re.match(r"^(\d{2}):(\d{2}):(\d{2})$", ts)
-    if m:
-        h, mnt, s = m.groups()
-        return int(h) * 3600 + int(mnt) * 60 + int(s)
-    return None
+    m = _TIMESTAMP_RE.match(ts.strip())
+    if not m:
+        return None
+    return _timestamp_groups_to_seconds(*m.groups())
 
 
 def captions_to_segments(captions_text: str, segment_seconds: int = 1800) -> List[Tuple[int, int, str]]:
@@ -88,38 +228,492 @@ def captions_to_segments(captions_text: str, segment_seconds: int = 1800) -> Lis
     """
     if not captions_text:
         return []
+    return parse_captions(captions_text).segments(segment_seconds)
+
+
+Cue = Tuple[float, float, str]
+
+
+# Caption formats in order of preference: json3/srv3 carry clean per-event text and
+# millisecond timings, VTT/SRT need tag stripping.
+CAPTION_FORMAT_PREFERENCE = ('json3', 'srv3', 'vtt', 'srv2', 'srv1', 'ttml')
+
+_TS = r"(?:(\d+):)?(\d{1,2}):(\d{2})(?:[.,](\d{1,3}))?"
+_TIMESTAMP_RE = re.compile(r"^" + _TS + r"$")
+_TIMING_LINE_RE = re.compile(r"^\s*" + _TS + r"\s*-->\s*" + _TS)
+_TAG_RE = re.compile(r"<[^>]*>")
+_WS_RE = re.compile(r"\s+")
+
+
+def _timestamp_groups_to_seconds(h: Optional[str], m: str, s: str, frac: Optional[str]) -> float:
+    seconds = (int(h) * 3600 if h else 0) + int(m) * 60 + int(s)
+    if frac:
+        seconds += int(frac.ljust(3, "0")) / 1000.0
+    return seconds
+
+
+class CueTable:
+    """
+    Compact, immutable table of caption cues.
+    Start and end times live in parallel float arrays; cue texts are stored once in a single
+    string buffer, separated by single spaces, with offsets[i]:offsets[i+1]-1 delimiting cue i.
+    Plaintext, time segments and chunk texts are therefore slices of the same buffer.
+    Iterating yields (start, end, text) cues.
+    """
+
+    __slots__ = ("starts", "ends", "offsets", "text")
+
+    MAGIC = b"CUE2"
+
+    def __init__(self, starts: array, ends: array, offsets: array, text: str) -> None:
+        self.starts = starts
+        self.ends = ends
+        self.offsets = offsets
+        self.text = text
+
+    @classmethod
+    def empty(cls) -> "CueTable":
+        return cls(array('d'), array('d'), array('q', [0]), "")
+
+    @classmethod
+    def from_cues(cls, cues: Iterable[Cue]) -> "CueTable":
+        builder = _CueTableBuilder()
+        for start, end, text in cues:
+            builder.add(start, end, text)
+        return builder.build()
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __iter__(self) -> Iterator[Cue]:
+        starts, ends, offsets, text = self.starts, self.ends, self.offsets, self.text
+        for i in range(len(starts)):
+            yield (starts[i], ends[i], text[offsets[i]:offsets[i + 1] - 1])
+
+    def __getitem__(self, i: int) -> Cue:
+        if i < 0:
+            i += len(self)
+        return (self.starts[i], self.ends[i], self.text[self.offsets[i]:self.offsets[i + 1] - 1])
+
+    def cue_text(self, i: int) -> str:
+        return self.text[self.offsets[i]:self.offsets[i + 1] - 1]
+
+    def text_range(self, start: int, end: int) -> str:
+        """
+        Text of cues start..end-1 joined by spaces (a single slice of the buffer).
+        """
+        if end <= start:
+            return ""
+        return self.text[self.offsets[start]:self.offsets[end] - 1]
+
+    def plaintext(self) -> str:
+        return self.text[:-1] if self.text else ""
+
+    def segments(self, segment_seconds: int = 1800) -> List[Tuple[int, int, str]]:
+        """
+        Bucket cues by start time into segment_seconds windows, as (index, start_seconds, text).
+        Consecutive cues of one bucket are emitted as buffer slices.
+        """
+        buckets: Dict[int, List[str]] = {}
+        n = len(self.starts)
+        i = 0
+        while i < n:
+            seg_index = int(self.starts[i] // segment_seconds)
+            j = i + 1
+            while j < n and int(self.starts[j] // segment_seconds) == seg_index:
+                j += 1
+            buckets.setdefault(seg_index, []).append(self.text_range(i, j))
+            i = j
+        return [(idx, idx * segment_seconds, " ".join(buckets[idx])) for idx in sorted(buckets)]
+
+    def to_vtt(self) -> str:
+        parts = ["WEBVTT", ""]
+        for start, end, text in self:
+            parts.append(f"{_format_vtt_timestamp(start)} --> {_format_vtt_timestamp(end)}")
+            parts.append(text)
+            parts.append("")
+        return "\n".join(parts)
 
-    lines = captions_text.splitlines()
-    current_start: Optional[float] = None
-    buckets: Dict[int, List[str]] = {}
+    def to_bytes(self) -> bytes:
+        """
+        Serialize as magic, cue count, little-endian int32 millisecond starts/ends, int64
+        text offsets and the UTF-8 text buffer.
+        """
+        starts = array('i', (int(round(s * 1000)) for s in self.starts))
+        ends = array('i', (int(round(e * 1000)) for e in self.ends))
+        offsets = array('q', self.offsets)
+        if sys.byteorder == "big":
+            for arr in (starts, ends, offsets):
+                arr.byteswap()
+        return b"".join((
+            self.MAGIC,
+            struct.pack("<I", len(starts)),
+            starts.tobytes(),
+            ends.tobytes(),
+            offsets.tobytes(),
+            self.text.encode("utf-8"),
+        ))
 
-    for line in lines:
-        line = line.strip()
-        if not line:
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CueTable":
+        if data[:4] != cls.MAGIC:
+            raise ValueError("not a cue table")
+        (n,) = struct.unpack_from("<I", data, 4)
+        pos = 8
+        starts_ms = array('i')
+        starts_ms.frombytes(data[pos:pos + 4 * n])
+        pos += 4 * n
+        ends_ms = array('i')
+        ends_ms.frombytes(data[pos:pos + 4 * n])
+        pos += 4 * n
+        offsets = array('q')
+        offsets.frombytes(data[pos:pos + 8 * (n + 1)])
+        pos += 8 * (n + 1)
+        if sys.byteorder == "big":
+            for arr in (starts_ms, ends_ms, offsets):
+                arr.byteswap()
+        if len(starts_ms) != n or len(ends_ms) != n or len(offsets) != n + 1:
+            raise ValueError("truncated cue table")
+        text = data[pos:].decode("utf-8")
+        return cls(
+            array('d', (v / 1000.0 for v in starts_ms)),
+            array('d', (v / 1000.0 for v in ends_ms)),
+            offsets,
+            text,
+        )
+
+
+class _CueTableBuilder:
+    __slots__ = ("starts", "ends", "offsets", "parts", "length")
+
+    def __init__(self) -> None:
+        self.starts = array('d')
+        self.ends = array('d')
+        self.offsets = array('q', [0])
+        self.parts: List[str] = []
+        self.length = 0
+
+    def add(self, start: float, end: float, text: str) -> None:
+        if not text:
+            return
+        self.starts.append(start)
+        self.ends.append(end)
+        self.parts.append(text)
+        self.length += len(text) + 1
+        self.offsets.append(self.length)
+
+    def build(self) -> CueTable:
+        text = " ".join(self.parts) + " " if self.parts else ""
+        return CueTable(self.starts, self.ends, self.offsets, text)
+
+
+def parse_captions(captions_text: str) -> CueTable:
+    """
+    Parse caption text into a CueTable in a single pass.
+    Understands WebVTT, SRT and YouTube's json3 and srv3 formats (detected from the content).
+    Inline tags and entities are removed, cue identifiers, NOTE/STYLE blocks and headers skipped.
+    """
+    if not captions_text:
+        return CueTable.empty()
+    head = captions_text.lstrip()[:64]
+    if head.startswith("{"):
+        return _parse_json3(captions_text)
+    if head.startswith("<") and "<timedtext" in captions_text[:512]:
+        return _parse_srv3(captions_text)
+    return _parse_vtt_srt(captions_text)
+
+
+def _clean_cue_text(lines: List[str]) -> str:
+    text = " ".join(lines)
+    if "<" in text:
+        text = _TAG_RE.sub("", text)
+    if "&" in text:
+        text = html.unescape(text)
+    return _WS_RE.sub(" ", text).strip()
+
+
+def _parse_vtt_srt(captions_text: str) -> CueTable:
+    builder = _CueTableBuilder()
+    timing_match = _TIMING_LINE_RE.match
+    start = end = 0.0
+    in_cue = False
+    after_timing = False
+    lines: List[str] = []
+    source = captions_text.splitlines()
+    for i, line in enumerate(source):
+        if "-->" in line:
+            m = timing_match(line)
+            if m:
+                if in_cue and lines:
+                    builder.add(start, end, _clean_cue_text(lines))
+                g = m.groups()
+                start = _timestamp_groups_to_seconds(g[0], g[1], g[2], g[3])
+                end = _timestamp_groups_to_seconds(g[4], g[5], g[6], g[7])
+                in_cue = True
+                after_timing = True
+                lines = []
+                continue
+        if not in_cue:
+            continue
+        if not line.strip():
+            # A blank line closes the cue, and a cue without text is dropped; anything
+            # before the next timing line is noise. YouTube's auto captions open cues with
+            # a whitespace-only line right after the timing line, which keeps the cue open.
+            if lines:
+                builder.add(start, end, _clean_cue_text(lines))
+            if lines or not (line and after_timing):
+                in_cue = False
+                lines = []
+            after_timing = False
             continue
-        # Match VTT/SRT timestamp lines
-        if '-->' in line:
-            parts = [p.strip() for p in line.split('-->')]
-            if len(parts) >= 1:
-                start_s = _parse_timestamp_to_seconds(parts[0])
-                if start_s is not None:
-                    current_start = start_s
-                    continue
-        # If caption text line
-        if current_start is None:
-            # Skip header / noise
+        after_timing = False
+        if line.strip().isdigit() and i + 1 < len(source) and timing_match(source[i + 1]):
+            # The identifier of the next cue, after a cue that was not closed by a blank line.
+            continue
+        lines.append(line)
+    if in_cue and lines:
+        builder.add(start, end, _clean_cue_text(lines))
+    return builder.build()
+
+
+def _parse_json3(captions_text: str) -> CueTable:
+    builder = _CueTableBuilder()
+    try:
+        events = json.loads(captions_text).get('events') or []
+    except (ValueError, AttributeError):
+        return builder.build()
+    for event in events:
+        segs = event.get('segs')
+        if not segs or event.get('aAppend'):
+            continue
+        text = "".join(seg.get('utf8', "") for seg in segs)
+        text = _WS_RE.sub(" ", text).strip()
+        if not text:
+            continue
+        start = event.get('tStartMs', 0) / 1000.0
+        builder.add(start, start + event.get('dDurationMs', 0) / 1000.0, text)
+    return builder.build()
+
+
+def _parse_srv3(captions_text: str) -> CueTable:
+    builder = _CueTableBuilder()
+    try:
+        root = ElementTree.fromstring(captions_text)
+    except ElementTree.ParseError:
+        return builder.build()
+    for p in root.iter('p'):
+        text = _WS_RE.sub(" ", "".join(p.itertext())).strip()
+        if not text:
+            continue
+        start = int(p.get('t', 0)) / 1000.0
+        builder.add(start, start + int(p.get('d', 0)) / 1000.0, html.unescape(text) if "&" in text else text)
+    return builder.build()
+
+
+def is_rolling_captions(table: CueTable, *, sample: int = 200, min_ratio: float = 0.5) -> bool:
+    """
+    Detect YouTube's rolling auto-caption layout, where each cue repeats the previous
+    caption line before adding new words. Looks at the first `sample` cues.
+    """
+    n = min(len(table), sample)
+    if n < 4:
+        return False
+    overlapping = 0
+    prev_words = table.cue_text(0).split()
+    for i in range(1, n):
+        words = table.cue_text(i).split()
+        if words and prev_words and _overlap_length(prev_words, words, 64) >= min(2, len(words)):
+            overlapping += 1
+        prev_words = words
+    return overlapping / (n - 1) >= min_ratio
+
+
+def _overlap_length(tail: List[str], words: List[str], max_words: int) -> int:
+    # Longest k such that words[:k] == tail[-k:].
+    for k in range(min(len(tail), len(words), max_words), 0, -1):
+        if words[:k] == tail[-k:]:
+            return k
+    return 0
+
+
+def merge_rolling_cues(table: CueTable, *, max_overlap_words: int = 64) -> CueTable:
+    """
+    Collapse rolling auto-caption duplicates.
+    Each cue loses the leading words it repeats from the text already emitted; cues with no
+    new words are dropped. Remaining cues keep their own start/end times, so time-based
+    segmenting and chunking still line up with the video. Tables that do not look like rolling
+    captions (see is_rolling_captions) are returned unchanged.
+    """
+    if not is_rolling_captions(table):
+        return table
+    builder = _CueTableBuilder()
+    tail: List[str] = []
+    for start, end, text in table:
+        words = text.split()
+        k = _overlap_length(tail, words, max_overlap_words)
+        if k < 2 and k < len(words):
+            # A single shared word is more likely real speech than a repeated caption line.
+            k = 0
+        new_words = words[k:]
+        if not new_words:
             continue
-        seg_index = int(current_start // segment_seconds)
-        # Strip tags
-        clean = re.sub(r"<[^>]+>", "", line)
-        buckets.setdefault(seg_index, []).append(clean)
+        builder.add(start, end, " ".join(new_words))
+        tail.extend(new_words)
+        if len(tail) > max_overlap_words:
+            del tail[:-max_overlap_words]
+    return builder.build()
+
+
+def _format_vtt_timestamp(seconds: float) -> str:
+    millis = int(round(seconds * 1000))
+    h, rem = divmod(millis, 3600000)
+    m, rem = divmod(rem, 60000)
+    s, ms = divmod(rem, 1000)
+    return f"{h:02d}:{m:02d}:{s:02d}.{ms:03d}"
+
+
+CACHE_MODES = ("use", "refresh", "off")
+
+
+def check_cache_modes(**modes: str) -> None:
+    """
+    Raise ValueError for the first keyword argument that is not one of CACHE_MODES, so a run
+    fails once at entry instead of once per video.
+    """
+    for name, mode in modes.items():
+        if mode not in CACHE_MODES:
+            raise ValueError(f"{name} must be one of {', '.join(CACHE_MODES)}, got {mode!r}")
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "yt-notetaker")
+
+
+class TranscriptCache:
+    """
+    On-disk store of parsed caption cues keyed by (video id, language, caption kind).
+    Entries are zlib-compressed CueTable bytes, the directory is bounded to max_bytes with
+    least-recently-used eviction, and all methods are safe to call from many worker threads
+    at once. Entries written in an older format read as misses and are replaced.
+    """
+
+    SUFFIX = ".cues"
+
+    def __init__(self, directory: str, max_bytes: int = 512 * 1024 * 1024) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self) -> None:
+        found = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(self.SUFFIX):
+                continue
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            found.append((st.st_mtime, name, st.st_size))
+        for _, name, size in sorted(found):
+            self._entries[name] = size
+            self._total_bytes += size
+
+    @staticmethod
+    def key(video_id: str, lang: str, kind: str) -> str:
+        digest = hashlib.sha256(f"{video_id}\0{lang}\0{kind}".encode("utf-8")).hexdigest()
+        return digest + TranscriptCache.SUFFIX
+
+    def get(self, video_id: str, lang: str, kind: str) -> Optional[CueTable]:
+        name = self.key(video_id, lang, kind)
+        path = os.path.join(self.directory, name)
+        try:
+            with open(path, "rb") as fh:
+                table = CueTable.from_bytes(zlib.decompress(fh.read()))
+        except (OSError, ValueError, zlib.error):
+            with self._lock:
+                self.misses += 1
+            incr("transcript_cache_lookups", result="miss")
+            return None
+
+        incr("transcript_cache_lookups", result="hit")
+        with self._lock:
+            self.hits += 1
+            if name in self._entries:
+                self._entries.move_to_end(name)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return table
+
+    def put(self, video_id: str, lang: str, kind: str, table: CueTable) -> None:
+        name = self.key(video_id, lang, kind)
+        data = zlib.compress(table.to_bytes())
+        if len(data) > self.max_bytes:
+            return
 
-    # Convert to list in order of segment index
-    results: List[Tuple[int, int, str]] = []
-    for seg_index in sorted(buckets.keys()):
-        start_sec = seg_index * segment_seconds
-        text = re.sub(r"\s+", " ", " ".join(buckets[seg_index])).strip()
-        results.append((seg_index, start_sec, text))
-    return results
+        # Write to a private temp file and rename so readers never see a partial entry.
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp_path, os.path.join(self.directory, name))
+        except OSError:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            return
 
+        with self._lock:
+            self._total_bytes -= self._entries.pop(name, 0)
+            self._entries[name] = len(data)
+            self._total_bytes += len(data)
+            evicted = []
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                old_name, old_size = self._entries.popitem(last=False)
+                self._total_bytes -= old_size
+                evicted.append(old_name)
+        for old_name in evicted:
+            try:
+                os.unlink(os.path.join(self.directory, old_name))
+            except OSError:
+                pass
 
+    def clear(self) -> None:
+        with self._lock:
+            names = list(self._entries)
+            self._entries.clear()
+            self._total_bytes = 0
+        for name in names:
+            try:
+                os.unlink(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+
+_transcript_cache: Optional[TranscriptCache] = None
+_transcript_cache_lock = threading.Lock()
+
+
+def get_transcript_cache() -> TranscriptCache:
+    """
+    Process-wide transcript cache.
+    Location and size come from YT_NOTETAKER_CACHE_DIR (default ~/.cache/yt-notetaker)
+    and YT_NOTETAKER_TRANSCRIPT_CACHE_MB (default 512).
+    """
+    global _transcript_cache
+    with _transcript_cache_lock:
+        if _transcript_cache is None:
+            base_dir = os.environ.get("YT_NOTETAKER_CACHE_DIR") or DEFAULT_CACHE_DIR
+            max_mb = int(os.environ.get("YT_NOTETAKER_TRANSCRIPT_CACHE_MB") or 512)
+            _transcript_cache = TranscriptCache(os.path.join(base_dir, "transcripts"), max_bytes=max_mb * 1024 * 1024)
+        return _transcript_cache
@@ -0,0 +1,378 @@
+import contextlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from .metrics import incr
+
+
+"""
+Durable work queue for multi-process and multi-machine runs.
+A job is one playlist or video URL. It is split into leased tasks: a "playlist" task
+enumerates the playlist and enqueues one "video" task per entry, and once every video task
+has settled a "render" task writes the DOCX and .notes.json from the stored outlines.
+Workers claim a task for lease_seconds and extend the lease with heartbeats; a task whose
+lease runs out (its worker died or hung) is handed to the next claimant, and a task that
+fails or is abandoned max_attempts times is recorded as failed. State lives in one SQLite
+file in WAL mode, so workers on the same machine can share it directly; workers elsewhere
+go through the HTTP API in server.py, for which RemoteQueue is the client.
+"""
+
+
+TASK_KINDS = ("render", "playlist", "video")
+JOB_KINDS = ("playlist", "video")
+# Job options a submitter may set; everything else (API keys, base URL, concurrency) is
+# worker configuration.
+JOB_OPTIONS = (
+    "use_llm",
+    "llm_model",
+    "transcript_cache",
+    "llm_cache",
+    "chunk_tokens",
+    "chunk_overlap_tokens",
+    "merge_token_budget",
+)
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS jobs ("
+    " id TEXT PRIMARY KEY, kind TEXT NOT NULL, url TEXT NOT NULL, output_dir TEXT NOT NULL,"
+    " options TEXT NOT NULL, status TEXT NOT NULL, title TEXT, path TEXT, error TEXT,"
+    " created REAL NOT NULL, updated REAL NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS tasks ("
+    " id INTEGER PRIMARY KEY AUTOINCREMENT, job_id TEXT NOT NULL, kind TEXT NOT NULL,"
+    " priority INTEGER NOT NULL, position INTEGER NOT NULL, payload TEXT NOT NULL,"
+    " status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, lease_owner TEXT,"
+    " lease_expires REAL, result TEXT, error TEXT, updated REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS tasks_claim ON tasks(status, priority, id)",
+    "CREATE INDEX IF NOT EXISTS tasks_job ON tasks(job_id, kind, position)",
+)
+
+
+@dataclass
+class Task:
+    """
+    A claimed task. job_kind and options come from the task's job; lease_seconds tells the
+    worker how often to heartbeat.
+    """
+
+    id: int
+    job_id: str
+    kind: str
+    payload: Dict[str, Any]
+    job_kind: str = "playlist"
+    options: Dict[str, Any] = field(default_factory=dict)
+    attempt: int = 1
+    lease_seconds: float = 60.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Task":
+        return cls(**data)
+
+
+class LeaseLost(Exception):
+    """
+    The task's lease expired and was taken over, or the task no longer exists.
+    """
+
+
+class WorkQueue:
+    """
+    SQLite-backed queue shared by any number of threads and processes on one machine.
+    Claims run in IMMEDIATE transactions, so two workers never lease the same task.
+    """
+
+    def __init__(self, path: str, *, lease_seconds: float = 60.0, max_attempts: int = 3) -> None:
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            for statement in _SCHEMA:
+                self._conn.execute(statement)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    @contextlib.contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def submit(
+        self,
+        url: str,
+        *,
+        kind: str = "playlist",
+        output_dir: str = "playlists_docx",
+        options: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """
+        Add a job and return its id.
+        """
+        if not url:
+            raise ValueError("url is required")
+        if kind not in JOB_KINDS:
+            raise ValueError(f"kind must be one of {', '.join(JOB_KINDS)}, got {kind!r}")
+        options = dict(options or {})
+        unknown = sorted(set(options) - set(JOB_OPTIONS))
+        if unknown:
+            raise ValueError(f"unknown job options {', '.join(unknown)}; allowed: {', '.join(JOB_OPTIONS)}")
+        job_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, url, output_dir, options, status, created, updated)"
+                " VALUES (?, ?, ?, ?, ?, 'queued', ?, ?)",
+                (job_id, kind, url, output_dir, json.dumps(options), now, now),
+            )
+            self._add_task(conn, job_id, kind, 0, {'url': url})
+        incr("queue_jobs_submitted", kind=kind)
+        return job_id
+
+    def _add_task(self, conn: sqlite3.Connection, job_id: str, kind: str, position: int, payload: Dict) -> None:
+        conn.execute(
+            "INSERT INTO tasks (job_id, kind, priority, position, payload, status, updated)"
+            " VALUES (?, ?, ?, ?, ?, 'pending', ?)",
+            (job_id, kind, TASK_KINDS.index(kind), position, json.dumps(payload), time.time()),
+        )
+
+    def claim(self, worker: str, kinds: Sequence[str] = TASK_KINDS) -> Optional[Task]:
+        """
+        Lease the next pending or abandoned task of one of kinds, renders first and then
+        playlists, so finished jobs complete and new playlists fan out before queued videos.
+        """
+        kinds = [k for k in kinds if k in TASK_KINDS]
+        if not kinds:
+            return None
+        marks = ",".join("?" * len(kinds))
+        with self._transaction() as conn:
+            while True:
+                now = time.time()
+                row = conn.execute(
+                    f"SELECT * FROM tasks WHERE kind IN ({marks})"
+                    " AND (status = 'pending' OR (status = 'leased' AND lease_expires < ?))"
+                    " ORDER BY priority, id LIMIT 1",
+                    (*kinds, now),
+                ).fetchone()
+                if row is None:
+                    return None
+                if row['attempts'] >= self.max_attempts:
+                    # Leased max_attempts times and never settled: the task keeps killing
+                    # or hanging its workers.
+                    self._settle_failed(conn, row, row['error'] or f"abandoned after {row['attempts']} attempts")
+                    incr("queue_tasks", kind=row['kind'], outcome="abandoned")
+                    continue
+                if row['status'] == "leased":
+                    incr("queue_tasks", kind=row['kind'], outcome="expired")
+                conn.execute(
+                    "UPDATE tasks SET status = 'leased', attempts = attempts + 1, lease_owner = ?,"
+                    " lease_expires = ?, updated = ? WHERE id = ?",
+                    (worker, now + self.lease_seconds, now, row['id']),
+                )
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', updated = ? WHERE id = ? AND status = 'queued'",
+                    (now, row['job_id']),
+                )
+                job = conn.execute("SELECT kind, options FROM jobs WHERE id = ?", (row['job_id'],)).fetchone()
+                incr("queue_tasks", kind=row['kind'], outcome="claimed")
+                return Task(
+                    id=row['id'],
+                    job_id=row['job_id'],
+                    kind=row['kind'],
+                    payload=json.loads(row['payload']),
+                    job_kind=job['kind'],
+                    options=json.loads(job['options']),
+                    attempt=row['attempts'] + 1,
+                    lease_seconds=self.lease_seconds,
+                )
+
+    def _owned(self, conn: sqlite3.Connection, task_id: int, worker: str) -> sqlite3.Row:
+        row = conn.execute(
+            "SELECT * FROM tasks WHERE id = ? AND status = 'leased' AND lease_owner = ?", (task_id, worker)
+        ).fetchone()
+        if row is None:
+            raise LeaseLost(f"task {task_id} is not leased by {worker}")
+        return row
+
+    def heartbeat(self, task_id: int, worker: str) -> None:
+        """
+        Extend the lease; raises LeaseLost if another worker has taken the task over.
+        """
+        with self._transaction() as conn:
+            self._owned(conn, task_id, worker)
+            conn.execute(
+                "UPDATE tasks SET lease_expires = ?, updated = ? WHERE id = ?",
+                (time.time() + self.lease_seconds, time.time(), task_id),
+            )
+
+    def complete(self, task_id: int, worker: str, result: Dict[str, Any]) -> None:
+        """
+        Store a task's result and enqueue the work it unlocks.
+        A playlist result is {'title', 'entries': [{'id', 'title'}, ...]}, a video result
+        {'video_id', 'title', 'outline', 'error'}, a render result {'path'}.
+        """
+        with self._transaction() as conn:
+            row = self._owned(conn, task_id, worker)
+            now = time.time()
+            conn.execute(
+                "UPDATE tasks SET status = 'done', result = ?, updated = ? WHERE id = ?",
+                (json.dumps(result), now, task_id),
+            )
+            job_id = row['job_id']
+            if row['kind'] == "playlist":
+                conn.execute("UPDATE jobs SET title = ?, updated = ? WHERE id = ?", (result.get('title'), now, job_id))
+                for position, entry in enumerate(result.get('entries') or []):
+                    self._add_task(conn, job_id, "video", position, entry)
+                self._maybe_render(conn, job_id)
+            elif row['kind'] == "video":
+                job = conn.execute("SELECT kind FROM jobs WHERE id = ?", (job_id,)).fetchone()
+                if job['kind'] == "video":
+                    conn.execute("UPDATE jobs SET title = ?, updated = ? WHERE id = ?", (result.get('title'), now, job_id))
+                self._maybe_render(conn, job_id)
+            else:
+                conn.execute(
+                    "UPDATE jobs SET status = 'done', path = ?, updated = ? WHERE id = ?",
+                    (result.get('path'), now, job_id),
+                )
+        incr("queue_tasks", kind=row['kind'], outcome="done")
+
+    def fail(self, task_id: int, worker: str, error: str) -> None:
+        """
+        Give a task back after an error: it is retried until max_attempts, then recorded
+        as failed (a failed video still appears in the document with its error).
+        """
+        with self._transaction() as conn:
+            row = self._owned(conn, task_id, worker)
+            if row['attempts'] < self.max_attempts:
+                conn.execute(
+                    "UPDATE tasks SET status = 'pending', lease_owner = NULL, lease_expires = NULL,"
+                    " error = ?, updated = ? WHERE id = ?",
+                    (error, time.time(), task_id),
+                )
+                outcome = "retried"
+            else:
+                self._settle_failed(conn, row, error)
+                outcome = "failed"
+        incr("queue_tasks", kind=row['kind'], outcome=outcome)
+
+    def _settle_failed(self, conn: sqlite3.Connection, row: sqlite3.Row, error: str) -> None:
+        now = time.time()
+        conn.execute(
+            "UPDATE tasks SET status = 'failed', error = ?, lease_owner = NULL, updated = ? WHERE id = ?",
+            (error, now, row['id']),
+        )
+        job = conn.execute("SELECT kind FROM jobs WHERE id = ?", (row['job_id'],)).fetchone()
+        if row['kind'] == "video" and job['kind'] == "playlist":
+            self._maybe_render(conn, row['job_id'])
+        else:
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, updated = ? WHERE id = ?",
+                (f"{row['kind']} task failed: {error}", now, row['job_id']),
+            )
+
+    def _maybe_render(self, conn: sqlite3.Connection, job_id: str) -> None:
+        unsettled = conn.execute(
+            "SELECT COUNT(*) FROM tasks WHERE job_id = ? AND kind != 'render' AND status IN ('pending', 'leased')",
+            (job_id,),
+        ).fetchone()[0]
+        if unsettled:
+            return
+        rendering = conn.execute(
+            "SELECT COUNT(*) FROM tasks WHERE job_id = ? AND kind = 'render'", (job_id,)
+        ).fetchone()[0]
+        if not rendering:
+            self._add_task(conn, job_id, "render", 0, {})
+
+    def job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Job row with per-status counts of its video tasks, or None.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            counts = self._conn.execute(
+                "SELECT status, COUNT(*) FROM tasks WHERE job_id = ? AND kind = 'video' GROUP BY status", (job_id,)
+            ).fetchall()
+        job = dict(row)
+        job['options'] = json.loads(job['options'])
+        job['videos'] = {status: count for status, count in counts}
+        return job
+
+    def jobs(self, limit: int = 100) -> List[Dict[str, Any]]:
+        with self._lock:
+            ids = [r[0] for r in self._conn.execute("SELECT id FROM jobs ORDER BY created DESC LIMIT ?", (limit,))]
+        return [job for job in (self.job(job_id) for job_id in ids) if job is not None]
+
+    def video_results(self, job_id: str) -> List[Dict[str, Any]]:
+        """
+        Settled video tasks of a job in playlist order, each as {'entry', 'result', 'error'}.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT payload, result, error, status FROM tasks WHERE job_id = ? AND kind = 'video'"
+                " ORDER BY position, id",
+                (job_id,),
+            ).fetchall()
+        return [
+            {
+                'entry': json.loads(row['payload']),
+                'result': json.loads(row['result']) if row['status'] == "done" and row['result'] else None,
+                'error': row['error'] if row['status'] == "failed" else None,
+            }
+            for row in rows
+        ]
+
+
+class RemoteQueue:
+    """
+    Worker-side client for the task endpoints of server.py, with the same claim /
+    heartbeat / complete / fail interface as WorkQueue.
+    """
+
+    def __init__(self, base_url: str, *, timeout: float = 30.0) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def _post(self, path: str, body: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        from .clients import get_http_session
+
+        response = get_http_session().post(f"{self.base_url}{path}", json=body, timeout=self.timeout)
+        if response.status_code == 409:
+            raise LeaseLost(response.text)
+        response.raise_for_status()
+        return response.json() if response.status_code != 204 else None
+
+    def claim(self, worker: str, kinds: Sequence[str] = TASK_KINDS) -> Optional[Task]:
+        data = self._post("/tasks/claim", {'worker': worker, 'kinds': list(kinds)})
+        return Task.from_dict(data) if data else None
+
+    def heartbeat(self, task_id: int, worker: str) -> None:
+        self._post(f"/tasks/{task_id}/heartbeat", {'worker': worker})
+
+    def complete(self, task_id: int, worker: str, result: Dict[str, Any]) -> None:
+        self._post(f"/tasks/{task_id}/complete", {'worker': worker, 'result': result})
+
+    def fail(self, task_id: int, worker: str, error: str) -> None:
+        self._post(f"/tasks/{task_id}/fail", {'worker': worker, 'error': error})
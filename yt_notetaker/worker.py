@@ -0,0 +1,267 @@
+import asyncio
+import concurrent.futures
+import contextlib
+import importlib
+import json
+import logging
+import os
+import socket
+import uuid
+from typing import Any, Dict, Optional, Sequence, Set, Tuple, Union
+
+from .metrics import span
+from .pipeline import StageLimits, VideoPipeline
+from .schemas import NotesDocument, OutlineResponse, VideoNotes
+from .transcript_utils import get_playlist_info
+from .work_queue import JOB_OPTIONS, TASK_KINDS, LeaseLost, RemoteQueue, Task, WorkQueue
+from .writers import DocxWriter, JsonWriter, notes_path_for, render_notes_document
+
+
+"""
+Queue worker: claims tasks from a WorkQueue (same machine) or RemoteQueue (over HTTP),
+runs them on the same VideoPipeline stages as the generate_* functions and reports the
+results. Up to concurrency tasks run at once on one event loop with a shared yt-dlp thread
+pool; one pipeline is kept per distinct set of job options. A heartbeat loop extends the
+lease of every task in flight and abandons a task whose lease was taken over.
+"""
+
+
+logger = logging.getLogger(__name__)
+
+QueueBackend = Union[WorkQueue, RemoteQueue]
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+class Worker:
+    """
+    Processes tasks of the given kinds until stopped. "render" tasks write files into the
+    job's output directory and read the stored outlines, so they need a local WorkQueue.
+    openai_api_key and llm_base_url apply to every task this worker runs.
+    """
+
+    def __init__(
+        self,
+        queue: QueueBackend,
+        *,
+        worker_id: Optional[str] = None,
+        concurrency: int = 8,
+        kinds: Sequence[str] = TASK_KINDS,
+        poll_interval: float = 1.0,
+        openai_api_key: Optional[str] = None,
+        llm_base_url: Optional[str] = None,
+        limits: Optional[StageLimits] = None,
+    ) -> None:
+        if isinstance(queue, RemoteQueue) and "render" in kinds:
+            kinds = [k for k in kinds if k != "render"]
+        self.queue = queue
+        self.worker_id = worker_id or default_worker_id()
+        self.concurrency = concurrency
+        self.kinds = tuple(kinds)
+        self.poll_interval = poll_interval
+        self.openai_api_key = openai_api_key
+        self.llm_base_url = llm_base_url
+        self.limits = limits or StageLimits()
+        self.processed = 0
+        self._busy = 0
+        self._stopping = False
+        self._leases: Dict[int, Tuple[Task, asyncio.Task]] = {}
+        self._lost: Set[int] = set()
+        self._pipelines: Dict[str, VideoPipeline] = {}
+        self._stack: Optional[contextlib.AsyncExitStack] = None
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+
+    def stop(self) -> None:
+        """
+        Finish the tasks in flight and return from run().
+        """
+        self._stopping = True
+
+    async def run(self, *, exit_when_idle: bool = False) -> int:
+        """
+        Claim and run tasks; with exit_when_idle, return once the queue has nothing this
+        worker can claim and none of its own tasks are running. Returns the number of
+        tasks processed.
+        """
+        async with contextlib.AsyncExitStack() as stack:
+            self._stack = stack
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.limits.metadata, thread_name_prefix="yt-worker-metadata"
+            )
+            stack.callback(self._executor.shutdown, wait=False, cancel_futures=True)
+            if "video" in self.kinds:
+                # Import the LLM stack up front, off the loop: importing it lazily on the first
+                # outline stalls the loop for seconds while leases are held.
+                await asyncio.to_thread(importlib.import_module, "yt_notetaker.llm_utils")
+            heartbeats = asyncio.create_task(self._heartbeats())
+            try:
+                await asyncio.gather(*(self._slot(exit_when_idle) for _ in range(self.concurrency)))
+            finally:
+                heartbeats.cancel()
+        return self.processed
+
+    async def _slot(self, exit_when_idle: bool) -> None:
+        while not self._stopping:
+            # Counted as busy while claiming too, so an idle slot does not exit while another
+            # is about to start a playlist task that fans out into more work.
+            self._busy += 1
+            try:
+                task = await asyncio.to_thread(self.queue.claim, self.worker_id, self.kinds)
+            except Exception as exc:
+                self._busy -= 1
+                logger.warning("claim failed: %s", exc)
+                await asyncio.sleep(self.poll_interval)
+                continue
+            if task is None:
+                self._busy -= 1
+                if exit_when_idle and self._busy == 0:
+                    return
+                await asyncio.sleep(self.poll_interval)
+                continue
+            try:
+                await self._execute(task)
+            finally:
+                self._busy -= 1
+
+    async def _execute(self, task: Task) -> None:
+        runner = asyncio.create_task(self._handle(task))
+        self._leases[task.id] = (task, runner)
+        try:
+            with span(f"queue.{task.kind}", task_id=task.id, attempt=task.attempt):
+                result = await runner
+        except asyncio.CancelledError:
+            if task.id not in self._lost:
+                raise
+            logger.warning("task %s (%s) abandoned: its lease was taken over", task.id, task.kind)
+            return
+        except Exception as exc:
+            logger.warning("task %s (%s) attempt %d failed: %s", task.id, task.kind, task.attempt, exc)
+            await self._report(self.queue.fail, task, str(exc))
+            return
+        finally:
+            self._leases.pop(task.id, None)
+            self._lost.discard(task.id)
+        await self._report(self.queue.complete, task, result)
+        self.processed += 1
+
+    async def _report(self, method, task: Task, value: Any) -> None:
+        try:
+            await asyncio.to_thread(method, task.id, self.worker_id, value)
+        except LeaseLost:
+            logger.warning("task %s (%s) result dropped: its lease was taken over", task.id, task.kind)
+
+    async def _heartbeats(self) -> None:
+        while True:
+            # A third of the shortest lease, so one late heartbeat does not lose a task; while
+            # idle, wake as often as a slot polls, since a new lease may start at any moment.
+            leases = self._leases.values()
+            if leases:
+                await asyncio.sleep(min(task.lease_seconds / 3 for task, _ in leases))
+            else:
+                await asyncio.sleep(self.poll_interval)
+            leases = list(self._leases.items())
+            for task_id, (task, runner) in leases:
+                if task_id not in self._leases:
+                    continue
+                try:
+                    await asyncio.to_thread(self.queue.heartbeat, task_id, self.worker_id)
+                except LeaseLost:
+                    self._lost.add(task_id)
+                    runner.cancel()
+                except Exception as exc:
+                    # Transient; the task is only lost if the lease actually runs out.
+                    logger.warning("heartbeat for task %s failed: %s", task_id, exc)
+
+    async def _pipeline(self, task: Task) -> VideoPipeline:
+        options = {name: value for name, value in task.options.items() if name in JOB_OPTIONS}
+        key = json.dumps([task.job_kind, options], sort_keys=True)
+        pipeline = self._pipelines.get(key)
+        if pipeline is None:
+            pipeline = VideoPipeline(
+                openai_api_key=self.openai_api_key,
+                llm_base_url=self.llm_base_url,
+                playlist_mode=task.job_kind == "playlist",
+                limits=self.limits,
+                executor=self._executor,
+                **options,
+            )
+            await self._stack.enter_async_context(pipeline)
+            self._pipelines[key] = pipeline
+        return pipeline
+
+    async def _handle(self, task: Task) -> Dict[str, Any]:
+        if task.kind == "render":
+            return await asyncio.to_thread(self._render, task)
+        pipeline = await self._pipeline(task)
+        if task.kind == "playlist":
+            info = await pipeline.run_blocking(get_playlist_info, task.payload['url'])
+            entries = [
+                {'id': entry.get('id'), 'title': entry.get('title', 'Untitled')}
+                async for entry in pipeline.iter_entries(info)
+            ]
+            return {'title': info.get('title', 'Playlist'), 'entries': entries}
+        if 'url' in task.payload:
+            return await self._single_video(pipeline, task.payload['url'])
+        result = await pipeline.process_video(task.payload)
+        if result.error:
+            # Raised so the queue retries it; the last attempt's error goes into the document.
+            raise RuntimeError(result.error)
+        return {
+            'video_id': result.video_id,
+            'title': task.payload.get('title', 'Untitled'),
+            'outline': result.outline.model_dump() if result.outline is not None else None,
+            'error': None,
+        }
+
+    async def _single_video(self, pipeline: VideoPipeline, video_url: str) -> Dict[str, Any]:
+        # Mirrors agenerate_single_video_docx up to the point where the document is written.
+        info = await pipeline.video_info(video_url)
+        video_title = info.get('title', 'Video')
+        outline: Optional[OutlineResponse] = None
+        if pipeline.use_llm:
+            cues, _, _ = pipeline.normalize(info.get('id'), await pipeline.transcript(info))
+            outline = await pipeline.outline(video_title, cues)
+        return {
+            'video_id': info.get('id'),
+            'title': video_title,
+            'outline': outline.model_dump() if outline is not None else None,
+            'error': None,
+        }
+
+    def _render(self, task: Task) -> Dict[str, Any]:
+        if not isinstance(self.queue, WorkQueue):
+            raise RuntimeError("render tasks need direct access to the queue database")
+        return render_job(self.queue, task.job_id)
+
+
+def render_job(queue: WorkQueue, job_id: str) -> Dict[str, Any]:
+    """
+    Write a job's DOCX and .notes.json from its stored video results; returns {'path'}.
+    Files are named "<title> (<job id>).docx", so jobs with the same title never share one.
+    """
+    job = queue.job(job_id)
+    if job is None:
+        raise LeaseLost(f"job {job_id} no longer exists")
+    videos = []
+    for item in queue.video_results(job_id):
+        entry, result = item['entry'], item['result']
+        if result is not None:
+            outline = result.get('outline')
+            videos.append(VideoNotes(
+                video_id=result.get('video_id'),
+                title=result.get('title') or entry.get('title', 'Untitled'),
+                outline=OutlineResponse.model_validate(outline) if outline is not None else None,
+            ))
+        else:
+            videos.append(VideoNotes(video_id=entry.get('id'), title=entry.get('title', 'Untitled'), error=item['error']))
+    title = job['title'] or ("Playlist" if job['kind'] == "playlist" else "Video")
+    document = NotesDocument(title=title, kind=job['kind'], source_url=job['url'], videos=videos)
+    os.makedirs(job['output_dir'], exist_ok=True)
+    filename = os.path.join(job['output_dir'], f"{title} ({job_id}).docx")
+    with span("write.docx"):
+        render_notes_document(document, DocxWriter(filename))
+    with span("write.json"):
+        render_notes_document(document, JsonWriter(notes_path_for(filename)))
+    return {'path': filename}
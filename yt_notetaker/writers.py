@@ -0,0 +1,261 @@
+import html
+import json
+import os
+import uuid
+from typing import TYPE_CHECKING, Dict, List, Optional, TextIO, Type
+
+from .docx_stream import DocxStreamWriter
+from .schemas import NotesDocument, OutlineResponse, VideoNotes
+
+if TYPE_CHECKING:
+    from docx.document import Document
+
+
+"""
+Output writers for notes documents.
+A writer receives the document title once and then each video's notes in order, so the
+same interface serves streaming output during a pipeline run and render-only output from a
+saved NotesDocument. Writers register themselves by format name; register_writer adds new
+formats. The JSON writer produces the .notes.json intermediate that render reads back.
+"""
+
+
+FAILED_PREFIX = "LLM summarization failed: "
+
+
+def notes_path_for(output_path: str) -> str:
+    """
+    NotesDocument JSON stored alongside the given output path.
+    """
+    root, _ = os.path.splitext(output_path)
+    return root + ".notes.json"
+
+
+def write_outline_to_docx(document: "Document", outline: OutlineResponse) -> None:
+    """
+    Write H2/H3 and bullet content to the DOCX document from outline produced by LLM.
+    DocxWriter streams the same layout through DocxStreamWriter.outline; this python-docx
+    version remains for callers that build their own Document.
+    """
+    for section in outline.sections:
+        document.add_heading(section.title, level=3)
+        for sub in section.subsections:
+            document.add_heading(sub.title, level=4)
+            for bullet in sub.bullets:
+                document.add_paragraph(bullet, style='List Bullet')
+
+
+class NotesWriter:
+    """
+    Base class for output formats.
+    Call begin() once, video() for each video in document order, then close(); used as a
+    context manager, an exception calls abort() instead of close(). For kind "video" the
+    single video's outline follows the title directly, without a per-video heading.
+    """
+
+    name = ""
+    extension = ""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.kind = "playlist"
+
+    def __enter__(self) -> "NotesWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def begin(self, title: str, *, kind: str = "playlist", source_url: Optional[str] = None) -> None:
+        raise NotImplementedError
+
+    def video(self, notes: VideoNotes) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        raise NotImplementedError
+
+    def abort(self) -> None:
+        raise NotImplementedError
+
+
+_WRITERS: Dict[str, Type[NotesWriter]] = {}
+
+
+def register_writer(cls: Type[NotesWriter]) -> Type[NotesWriter]:
+    """
+    Class decorator that makes a NotesWriter subclass available under cls.name.
+    """
+    _WRITERS[cls.name] = cls
+    return cls
+
+
+def writer_names() -> List[str]:
+    return sorted(_WRITERS)
+
+
+def get_writer(name: str) -> Type[NotesWriter]:
+    try:
+        return _WRITERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown output format {name!r}; expected one of {', '.join(writer_names())}") from None
+
+
+def render_notes_document(document: NotesDocument, writer: NotesWriter) -> None:
+    """
+    Write a complete NotesDocument through writer and close it.
+    """
+    with writer:
+        writer.begin(document.title, kind=document.kind, source_url=document.source_url)
+        for notes in document.videos:
+            writer.video(notes)
+
+
+@register_writer
+class DocxWriter(NotesWriter):
+    name = "docx"
+    extension = ".docx"
+
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+        self._docx = DocxStreamWriter(path)
+
+    def begin(self, title: str, *, kind: str = "playlist", source_url: Optional[str] = None) -> None:
+        self.kind = kind
+        self._docx.heading(title, 1)
+
+    def video(self, notes: VideoNotes) -> None:
+        if self.kind == "playlist":
+            self._docx.heading(notes.title, 2)
+        if notes.error:
+            self._docx.paragraph(FAILED_PREFIX + notes.error)
+        elif notes.outline:
+            self._docx.outline(notes.outline)
+
+    def close(self) -> None:
+        self._docx.close()
+
+    def abort(self) -> None:
+        self._docx.abort()
+
+
+class _TextFileWriter(NotesWriter):
+    # Text formats are written under a temporary name and moved into place on close.
+
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+        # Unique per writer, like DocxStreamWriter's, so writers for one path cannot collide.
+        self._tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        self._fh: TextIO = open(self._tmp_path, "w", encoding="utf-8")
+
+    def close(self) -> None:
+        if self._fh.closed:
+            return
+        self._finish()
+        self._fh.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self) -> None:
+        if self._fh.closed:
+            return
+        self._fh.close()
+        try:
+            os.unlink(self._tmp_path)
+        except OSError:
+            pass
+
+    def _finish(self) -> None:
+        pass
+
+
+@register_writer
+class MarkdownWriter(_TextFileWriter):
+    name = "markdown"
+    extension = ".md"
+
+    def begin(self, title: str, *, kind: str = "playlist", source_url: Optional[str] = None) -> None:
+        self.kind = kind
+        self._fh.write(f"# {title}\n\n")
+        if source_url:
+            self._fh.write(f"<{source_url}>\n\n")
+
+    def video(self, notes: VideoNotes) -> None:
+        out = []
+        if self.kind == "playlist":
+            out.append(f"## {notes.title}\n\n")
+        if notes.error:
+            out.append(f"_{FAILED_PREFIX}{notes.error}_\n\n")
+        elif notes.outline:
+            for section in notes.outline.sections:
+                out.append(f"### {section.title}\n\n")
+                for sub in section.subsections:
+                    out.append(f"#### {sub.title}\n\n")
+                    out.extend(f"- {bullet}\n" for bullet in sub.bullets)
+                    if sub.bullets:
+                        out.append("\n")
+        self._fh.write("".join(out))
+
+
+@register_writer
+class HtmlWriter(_TextFileWriter):
+    name = "html"
+    extension = ".html"
+
+    def begin(self, title: str, *, kind: str = "playlist", source_url: Optional[str] = None) -> None:
+        self.kind = kind
+        escaped = html.escape(title)
+        self._fh.write(
+            "<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n"
+            f"<title>{escaped}</title>\n</head>\n<body>\n<h1>{escaped}</h1>\n"
+        )
+        if source_url:
+            self._fh.write(f"<p><a href=\"{html.escape(source_url)}\">{html.escape(source_url)}</a></p>\n")
+
+    def video(self, notes: VideoNotes) -> None:
+        out = []
+        if self.kind == "playlist":
+            out.append(f"<h2>{html.escape(notes.title)}</h2>\n")
+        if notes.error:
+            out.append(f"<p class=\"error\">{html.escape(FAILED_PREFIX + notes.error)}</p>\n")
+        elif notes.outline:
+            for section in notes.outline.sections:
+                out.append(f"<h3>{html.escape(section.title)}</h3>\n")
+                for sub in section.subsections:
+                    out.append(f"<h4>{html.escape(sub.title)}</h4>\n")
+                    if sub.bullets:
+                        out.append("<ul>\n")
+                        out.extend(f"<li>{html.escape(bullet)}</li>\n" for bullet in sub.bullets)
+                        out.append("</ul>\n")
+        self._fh.write("".join(out))
+
+    def _finish(self) -> None:
+        self._fh.write("</body>\n</html>\n")
+
+
+@register_writer
+class JsonWriter(_TextFileWriter):
+    """
+    Streams a NotesDocument as JSON: the header fields first, then one video per line.
+    """
+
+    name = "json"
+    extension = ".json"
+
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+        self._count = 0
+
+    def begin(self, title: str, *, kind: str = "playlist", source_url: Optional[str] = None) -> None:
+        self.kind = kind
+        header = json.dumps({'title': title, 'kind': kind, 'source_url': source_url}, ensure_ascii=False)
+        self._fh.write(header[:-1] + ', "videos": [')
+
+    def video(self, notes: VideoNotes) -> None:
+        self._fh.write(("," if self._count else "") + "\n" + notes.model_dump_json())
+        self._count += 1
+
+    def _finish(self) -> None:
+        self._fh.write("\n]}\n")